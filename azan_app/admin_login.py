@@ -0,0 +1,23 @@
+# ============= ADMIN LOGIN =============
+# Kept apart from the admin panels so the applicant path never imports
+# pandas or the GitHub admin stack.
+
+import streamlit as st
+import os
+from config import *
+
+def show_admin_login():
+    """Display admin login in sidebar"""
+    with st.sidebar:
+        if os.path.exists("assets/umoor.png"):
+            st.image("assets/umoor.png", width=180)
+        
+        st.subheader("🔐 Admin Login")
+        
+        if not st.session_state.admin_ok:
+            pwd = st.text_input("Password", type="password", key="admin_pwd")
+            if pwd == ADMIN_PASSWORD:
+                st.session_state.admin_ok = True
+                st.success("✓ Admin access granted")
+        else:
+            st.success("✓ Logged in")
@@ -6,23 +6,19 @@ import os
 import time
 from config import *
 from utils import *
+from search_index import show_submission_search
+from admin_login import show_admin_login
+from wav_info import read_local, describe_format, format_duration
 
-def show_admin_login():
-    """Display admin login in sidebar"""
-    with st.sidebar:
-        if os.path.exists("assets/umoor.png"):
-            st.image("assets/umoor.png", width=180)
-        
-        st.subheader("🔐 Admin Login")
-        
-        if not st.session_state.admin_ok:
-            pwd = st.text_input("Password", type="password", key="admin_pwd")
-            if pwd == ADMIN_PASSWORD:
-                st.session_state.admin_ok = True
-                st.success("✓ Admin access granted")
-        else:
-            st.success("✓ Logged in")
 
+def local_recording_info(path):
+    """WavInfo of a local recording (header only), None if missing or unreadable"""
+    if not isinstance(path, str) or not os.path.exists(path):
+        return None
+    try:
+        return read_local(path)
+    except (OSError, ValueError):
+        return None
 
 def show_admin_panel():
     """Display main admin panel"""
@@ -102,12 +98,24 @@ def show_admin_panel():
                 # Use Streamlit bar chart
                 st.bar_chart(stats_df, color=('green','yellow'),horizontal=True)
         
+        with st.expander("🗂️ Submission List"):
+            durations = {
+                column: display_df[column].map(
+                    lambda p: format_duration(info.duration) if (info := local_recording_info(p)) else "")
+                for column in ("azan_file", "takbirah_file")
+            }
+            st.dataframe(pd.DataFrame({
+                "ITS": display_df["its"].astype(str),
+                "Name": display_df["name"],
+                "Masjid": display_df["masjid"],
+                "Azan": durations["azan_file"],
+                "Takbirah": durations["takbirah_file"],
+            }), hide_index=True, use_container_width=True)
+
         st.divider()
 
-        selected_its = st.sidebar.selectbox(
-            "Select Submission (ITS)",
-            display_df["its"].astype(str).tolist(),
-            key="select_its"
+        selected_its = show_submission_search(
+            display_df, (os.path.getmtime(DATA_FILE), masjid)
         )
         
         if not selected_its:
@@ -155,6 +163,9 @@ def show_admin_panel():
                 st.write("🎙️ Azan")
                 with open(row["azan_file"], "rb") as f:
                     st.audio(f.read(), format="audio/wav")
+                info = local_recording_info(row["azan_file"])
+                if info:
+                    st.caption(describe_format(info))
             else:
                 st.caption("No Azan recording")
         
@@ -163,6 +174,9 @@ def show_admin_panel():
                 st.write("🎙️ Takbirah")
                 with open(row["takbirah_file"], "rb") as f:
                     st.audio(f.read(), format="audio/wav")
+                info = local_recording_info(row["takbirah_file"])
+                if info:
+                    st.caption(describe_format(info))
             else:
                 st.caption("No Takbirah recording")
         
@@ -0,0 +1,215 @@
+# ============= RAMADAN ALLOTMENT =============
+# Assigns Approved reciters to the Azan and Takbirah duties of every prayer
+# of the month at their own masjid:
+#
+#   * only the roles named in the applicant's interests
+#   * DUTY_COVERAGE reciters per role, prayer and masjid (unfilled slots are
+#     reported, never over-filled)
+#   * at most ALLOTMENT_MAX_DUTIES duties per reciter and
+#     ALLOTMENT_MAX_PER_DAY per day
+#   * fairness: every slot goes to the eligible reciter with the fewest
+#     duties so far, then the one who served least recently
+#
+# Slots are filled day by day from one heap per (masjid, role), so solving
+# is O(slots x log reciters). When a reciter drops out only their remaining
+# slots are freed and refilled; everyone else keeps their duties.
+#
+#     python azan_app/allotment.py --out schedule.csv
+#     python azan_app/allotment.py --unavailable 30439531:12   # away from day 12
+
+import heapq
+import zlib
+from datetime import date, timedelta
+from config import *
+
+ROLES = list(DUTY_COVERAGE)
+
+
+def approved_reciters(submissions, reviews):
+    """its, name, masjid and roles (tuple) of submissions whose review is Approved"""
+    import pandas as pd
+
+    columns = ["its", "name", "masjid", "roles"]
+    if submissions.empty or reviews.empty:
+        return pd.DataFrame(columns=columns)
+    status = reviews.assign(its=reviews["its"].astype(str)).drop_duplicates("its", keep="last")
+    status = status.set_index("its")["status"]
+    rows = submissions.assign(its=submissions["its"].astype(str)).drop_duplicates("its", keep="last")
+    rows = rows[rows["its"].map(status) == "Approved"]
+    interests = rows["interests"].fillna("").str.lower()
+    roles = interests.map(lambda text: tuple(role for role in ROLES if role.lower() in text))
+    return rows.assign(roles=roles)[roles.map(len) > 0].reindex(columns=columns).reset_index(drop=True)
+
+
+class Allotment:
+    """A month's schedule; mark_unavailable() re-solves it incrementally"""
+
+    def __init__(self, reciters, days=RAMADAN_DAYS, max_duties=ALLOTMENT_MAX_DUTIES,
+                 max_per_day=ALLOTMENT_MAX_PER_DAY, start=RAMADAN_START):
+        self.reciters = {r.its: r for r in reciters.itertuples(index=False)}
+        self.days = days
+        self.max_duties = max_duties
+        self.max_per_day = max_per_day
+        self.start = date.fromisoformat(start)
+        self.masjids = MASJID_LIST[1:] + sorted({r.masjid for r in self.reciters.values()} - set(MASJID_LIST))
+
+        self.assigned = {}  # (day, masjid, prayer, role, seat) -> its, None when nobody is eligible
+        self.load = dict.fromkeys(self.reciters, 0)
+        self.last = dict.fromkeys(self.reciters, 0)  # last day served
+        self.per_day = {}  # (its, day) -> duties
+        self.away = {}  # its -> first day unavailable
+        # Stable tie-break that does not favour low ITS numbers
+        self.rank = {its: zlib.crc32(its.encode()) for its in self.reciters}
+
+        self.pools = {}
+        for its, reciter in self.reciters.items():
+            for role in reciter.roles:
+                self.pools.setdefault((reciter.masjid, role), []).append(self._key(its))
+        for heap in self.pools.values():
+            heapq.heapify(heap)
+
+    def _key(self, its):
+        return (self.load[its], self.last[its], self.rank[its], its)
+
+    def _pick(self, masjid, role, day):
+        """Least loaded eligible reciter for a slot, None when there is none"""
+        heap = self.pools.get((masjid, role))
+        if not heap:
+            return None
+        skipped, chosen = [], None
+        while heap:
+            key = heapq.heappop(heap)
+            its = key[-1]
+            if key != self._key(its):
+                heapq.heappush(heap, self._key(its))  # load changed through the other role's pool
+            elif self.load[its] >= self.max_duties:
+                continue  # full for the month: leaves the pool
+            elif self.away.get(its, self.days + 1) <= day or self.per_day.get((its, day), 0) >= self.max_per_day:
+                skipped.append(key)
+            else:
+                chosen = its
+                break
+        for key in skipped:
+            heapq.heappush(heap, key)
+        if chosen is not None:
+            self.load[chosen] += 1
+            self.last[chosen] = day
+            self.per_day[chosen, day] = self.per_day.get((chosen, day), 0) + 1
+            heapq.heappush(heap, self._key(chosen))
+        return chosen
+
+    def slots(self, from_day=1):
+        for day in range(from_day, self.days + 1):
+            for masjid in self.masjids:
+                for prayer in PRAYERS:
+                    for role, seats in DUTY_COVERAGE.items():
+                        for seat in range(seats):
+                            yield day, masjid, prayer, role, seat
+
+    def solve(self, from_day=1):
+        """Fill every open slot from from_day on, returns {slot: its} of the slots filled"""
+        filled = {}
+        for slot in self.slots(from_day):
+            if self.assigned.get(slot) is None:
+                day, masjid, _, role, _ = slot
+                self.assigned[slot] = its = self._pick(masjid, role, day)
+                if its is not None:
+                    filled[slot] = its
+        return filled
+
+    def mark_unavailable(self, its, from_day=1):
+        """Free a reciter's duties from from_day on and refill only those slots"""
+        its = str(its)
+        if its not in self.reciters:
+            raise KeyError(f"{its} is not an Approved reciter")
+        self.away[its] = min(from_day, self.away.get(its, from_day))
+        for slot, assigned in self.assigned.items():
+            if assigned == its and slot[0] >= from_day:
+                self.assigned[slot] = None
+                self.load[its] -= 1
+                self.per_day[its, slot[0]] -= 1
+        return self.solve(from_day)
+
+    def schedule(self):
+        """DataFrame: day, date, prayer, masjid, role, its, name (its "" for unfilled slots)"""
+        import pandas as pd
+
+        rows = []
+        for (day, masjid, prayer, role, _), its in self.assigned.items():
+            reciter = self.reciters.get(its)
+            rows.append({
+                "day": day,
+                "date": (self.start + timedelta(days=day - 1)).isoformat(),
+                "prayer": prayer,
+                "masjid": masjid,
+                "role": role,
+                "its": its or "",
+                "name": reciter.name if reciter else "",
+            })
+        return pd.DataFrame(rows, columns=["day", "date", "prayer", "masjid", "role", "its", "name"])
+
+    def duties(self):
+        """Duties per reciter, most loaded first"""
+        import pandas as pd
+
+        rows = [
+            {"its": its, "name": r.name, "masjid": r.masjid, "roles": ", ".join(r.roles),
+             "duties": self.load[its], "away_from_day": self.away.get(its, "")}
+            for its, r in self.reciters.items()
+        ]
+        return pd.DataFrame(rows).sort_values(["duties", "its"], ascending=[False, True], ignore_index=True)
+
+    def coverage(self):
+        """Filled and total slots per masjid and role"""
+        schedule = self.schedule()
+        grouped = schedule.assign(filled=schedule["its"] != "").groupby(["masjid", "role"], sort=False)
+        return grouped.agg(filled=("filled", "sum"), slots=("filled", "size")).reset_index()
+
+
+def allot(submissions, reviews, **options):
+    """Solved Allotment of the Approved reciters"""
+    allotment = Allotment(approved_reciters(submissions, reviews), **options)
+    allotment.solve()
+    return allotment
+
+
+# ============= COMMAND LINE =============
+
+def main():
+    import argparse
+    import time
+    import streamlit as st
+    from github_client import GitHubRepo
+    from shards import load_shards
+
+    parser = argparse.ArgumentParser(description="Ramadan allotment of Approved reciters")
+    parser.add_argument("--max-duties", type=int, default=ALLOTMENT_MAX_DUTIES)
+    parser.add_argument("--max-per-day", type=int, default=ALLOTMENT_MAX_PER_DAY)
+    parser.add_argument("--unavailable", nargs="*", default=[], metavar="ITS[:DAY]",
+                        help="reciters away from DAY (default day 1) on, re-solved incrementally")
+    parser.add_argument("--out", help="write the schedule to this CSV")
+    args = parser.parse_args()
+
+    # [github] credentials from .streamlit/secrets.toml, like the app
+    client = GitHubRepo.from_secrets(st.secrets)
+    submissions, _ = load_shards(client, "submissions")
+    reviews, _ = load_shards(client, "reviews")
+
+    started = time.perf_counter()
+    allotment = allot(submissions, reviews, max_duties=args.max_duties, max_per_day=args.max_per_day)
+    print(f"{len(allotment.reciters)} Approved reciters allotted in {(time.perf_counter() - started) * 1000:.0f} ms")
+    for item in args.unavailable:
+        its, _, day = item.partition(":")
+        started = time.perf_counter()
+        filled = allotment.mark_unavailable(its, int(day or 1))
+        print(f"{its} away from day {day or 1}: {len(filled)} slots reassigned "
+              f"in {(time.perf_counter() - started) * 1000:.1f} ms")
+
+    print(allotment.coverage().to_string(index=False))
+    print(allotment.duties().to_string(index=False, max_rows=40))
+    if args.out:
+        allotment.schedule().to_csv(args.out, index=False)
+
+
+if __name__ == "__main__":
+    main()
@@ -6,9 +6,12 @@ Main Application Entry Point
 import streamlit as st
 from config import *
 from utils import *
-from admin_panel import show_admin_login, show_admin_panel
-from github_admin import show_admin_panel_github
+from admin_login import show_admin_login
 from user_form import show_form, show_review_screen, show_thank_you_screen
+from assets import inject_assets
+from metrics import track_rerun
+from sidecar import start_sidecar
+import webhooks  # registers /github/webhook on the sidecar
 
 # ============= PAGE CONFIG =============
 st.set_page_config(
@@ -23,63 +26,43 @@ st.markdown("""
     <meta name="viewport" content="width=device-width, initial-scale=1.0">
 """, unsafe_allow_html=True)
 
-# ============= STYLING =============
-st.markdown(CSS_STYLES, unsafe_allow_html=True)
+# ============= STYLING & BACKGROUND =============
+# Minified, fingerprinted stylesheet (with per-viewport background variants)
+# served as a static file, built once per process
+inject_assets()
 
 # ============= SESSION STATE =============
 init_session_state()
 
-# ============= BACKGROUND IMAGE - OPTIMIZED CACHING =============
-@st.cache_data(ttl=3600)  # Cache for 1 hour
-def get_background():
-    """Load background image with caching"""
-    import base64
-    import os
-    if not os.path.exists("assets/ramadan-bg.jpg"):
-        return None
-    try:
-        with open("assets/ramadan-bg.jpg", "rb") as img:
-            return base64.b64encode(img.read()).decode()
-    except Exception:
-        return None
-
-bg = get_background()
-if bg:
-    st.markdown(
-        f"""
-        <style>
-        .stApp {{
-            background-image: url("data:image/jpg;base64,{bg}");
-            background-size: cover;
-            background-position: center;
-            background-repeat: repeat;
-            background-attachment: fixed;
-        }}
-        </style>
-        """,
-        unsafe_allow_html=True
-    )
+# ============= METRICS & WEBHOOKS =============
+# Prometheus / JSON and GitHub webhook endpoints on the sidecar port, started once per process
+start_sidecar()
 
 # ============= MAIN CONTENT =============
+# Timed as one rerun; the spans opened below are attached to it
 
-# Admin Login (in sidebar)
-show_admin_login()
+with track_rerun("admin" if st.session_state.admin_ok else "applicant"):
+    # Admin Login (in sidebar)
+    show_admin_login()
 
-# Admin Panel (if logged in)
-if st.session_state.admin_ok:
-    st.sidebar.divider()
-    show_admin_panel_github()
+    # Admin Panel (if logged in)
+    if st.session_state.admin_ok:
+        # Lazy import: the admin stack (pandas, GitHub client, refresher) is only
+        # loaded once someone has logged in, never on the applicant path
+        from github_admin import show_admin_panel_github
+        st.sidebar.divider()
+        show_admin_panel_github()
 
-st.divider()
-st.title("🕌 Azan & Takbirah Registration")
+    st.divider()
+    st.title("🕌 Azan & Takbirah Registration")
 
-# Thank You Screen (if submitted)
-if st.session_state.submitted:
-    show_thank_you_screen()
+    # Thank You Screen (if submitted)
+    if st.session_state.submitted:
+        show_thank_you_screen()
 
-# Main Form
-form_data = show_form()
+    # Main Form
+    form_data = show_form()
 
-# Review Screen (if review mode)
-if st.session_state.review:
-    show_review_screen(form_data)
+    # Review Screen (if review mode)
+    if st.session_state.review:
+        show_review_screen(form_data)
@@ -0,0 +1,137 @@
+# ============= STATIC ASSET PIPELINE =============
+# Built once per process: the background image is resized per viewport width,
+# recompressed (WebP + progressive JPEG) and written under static/ with
+# content-fingerprinted names; CSS_STYLES is minified and sent inline with
+# mobile-first rules pointing at those images. Each rerun then carries a few
+# KB of CSS instead of ~240 KB of base64.
+#
+# The CSS stays inline on purpose: Streamlit's static handler serves only
+# SAFE_APP_STATIC_FILE_EXTENSIONS (images, fonts, ...) with their real type,
+# a .css file comes back as text/plain + nosniff and browsers drop it.
+
+import base64
+import hashlib
+import io
+import os
+import re
+import streamlit as st
+from config import *
+
+STATIC_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "static")
+STATIC_URL = "app/static"
+
+BG_LAYOUT_CSS = (
+    ".stApp{background-size:cover;background-position:center;"
+    "background-repeat:repeat;background-attachment:fixed}"
+)
+
+
+def fingerprint(data):
+    return hashlib.sha256(data).hexdigest()[:10]
+
+
+def minify_css(css):
+    """Strip <style> tags, comments and redundant whitespace"""
+    css = re.sub(r"</?style>", "", css)
+    css = re.sub(r"/\*.*?\*/", "", css, flags=re.S)
+    css = re.sub(r"\s+", " ", css)
+    css = re.sub(r"\s*([{};:,>])\s*", r"\1", css)
+    css = css.replace(";}", "}")
+    return css.strip()
+
+
+def _write_static(name, data):
+    """Write a fingerprinted file once (same name means same content)"""
+    path = os.path.join(STATIC_DIR, name)
+    if not os.path.exists(path):
+        os.makedirs(STATIC_DIR, exist_ok=True)
+        tmp = f"{path}.tmp{os.getpid()}"
+        with open(tmp, "wb") as f:
+            f.write(data)
+        os.replace(tmp, path)
+    return name
+
+
+def build_background_variants(image_path=BG_IMAGE, widths=BG_WIDTHS):
+    """Return [(width, webp name, jpeg name)] for every viewport width"""
+    from PIL import Image
+
+    with open(image_path, "rb") as f:
+        source = f.read()
+    stem = os.path.splitext(os.path.basename(image_path))[0]
+    variants = []
+
+    with Image.open(io.BytesIO(source)) as image:
+        image = image.convert("RGB")
+        for width in sorted(set(min(w, image.width) for w in widths)):
+            key = fingerprint(source + f"{width}:{BG_WEBP_QUALITY}:{BG_JPEG_QUALITY}".encode())
+            webp_name = f"{stem}.{width}.{key}.webp"
+            jpeg_name = f"{stem}.{width}.{key}.jpg"
+            if not (os.path.exists(os.path.join(STATIC_DIR, webp_name))
+                    and os.path.exists(os.path.join(STATIC_DIR, jpeg_name))):
+                height = round(image.height * width / image.width)
+                resized = image.resize((width, height), Image.LANCZOS)
+                webp, jpeg = io.BytesIO(), io.BytesIO()
+                resized.save(webp, "WEBP", quality=BG_WEBP_QUALITY, method=6)
+                resized.save(jpeg, "JPEG", quality=BG_JPEG_QUALITY, progressive=True, optimize=True)
+                _write_static(webp_name, webp.getvalue())
+                _write_static(jpeg_name, jpeg.getvalue())
+            variants.append((width, webp_name, jpeg_name))
+    return variants
+
+
+def background_css(variants):
+    """Mobile-first background rules, one media query per larger variant"""
+    rules = []
+    previous = None
+    for width, webp_name, jpeg_name in variants:
+        webp_url, jpeg_url = f"{STATIC_URL}/{webp_name}", f"{STATIC_URL}/{jpeg_name}"
+        rule = (
+            f'.stApp{{background-image:url("{jpeg_url}");'
+            f'background-image:image-set(url("{webp_url}") type("image/webp"),'
+            f'url("{jpeg_url}") type("image/jpeg"))}}'
+        )
+        # Each variant serves viewports wider than the previous variant
+        rules.append(rule if previous is None else f"@media (min-width:{previous + 1}px){{{rule}}}")
+        previous = width
+    rules.append(BG_LAYOUT_CSS)
+    return "".join(rules)
+
+
+@st.cache_resource
+def build_assets():
+    """
+    Run the pipeline once per process.
+    Returns the markup to inject on every rerun and a size report.
+    """
+    css = minify_css(CSS_STYLES)
+    report = {"css_source_bytes": len(CSS_STYLES.encode()), "css_min_bytes": len(css.encode())}
+
+    try:
+        variants = build_background_variants()
+    except Exception:
+        variants = []
+    report["variants"] = {
+        w: os.path.getsize(os.path.join(STATIC_DIR, webp)) for w, webp, _ in variants
+    }
+
+    if st.get_option("server.enableStaticServing") and variants:
+        # Images from app/static/ (served as image/webp, image/jpeg), CSS inline
+        markup = f"<style>{css}{background_css(variants)}</style>"
+    else:
+        # No static serving: inline the minified CSS and the mid-size WebP only
+        markup = f"<style>{css}</style>"
+        if variants:
+            _, webp_name, _ = variants[len(variants) // 2]
+            with open(os.path.join(STATIC_DIR, webp_name), "rb") as f:
+                data_uri = f"data:image/webp;base64,{base64.b64encode(f.read()).decode()}"
+            markup += f'<style>.stApp{{background-image:url("{data_uri}")}}{BG_LAYOUT_CSS}</style>'
+
+    report["markup_bytes"] = len(markup.encode())
+    return markup, report
+
+
+def inject_assets():
+    """Inject the (cached) style markup for this rerun"""
+    markup, _ = build_assets()
+    st.markdown(markup, unsafe_allow_html=True)
@@ -0,0 +1,199 @@
+# ============= AUDIO INTEGRITY AND GARBAGE COLLECTION =============
+# Reconciles the recordings in the repo with the submissions that point at
+# them. Everything is read from one recursive tree listing of the head
+# commit (CSV blobs are fetched by the shas in that listing), so the index
+# is a consistent picture of a single commit:
+#
+#   * ok       a loose or packed recording referenced by a submission row
+#   * orphan   a loose recording no row references (an upload whose
+#              save_submission failed, or the old file of a re-record)
+#   * missing  a row whose azan_file / takbirah_file is in neither the
+#              audio tree nor a pack index
+#
+# Submissions of every season count as references: live shards, archived
+# seasons and a not yet migrated submissions.csv. Only loose orphans older
+# than --min-age-hours (from the upload timestamp in the file name) are
+# deleted, so an upload whose submission is still being saved is left alone.
+# Packed orphans are reported only; packs are never rewritten.
+#
+#     python azan_app/audio_gc.py                      # report
+#     python azan_app/audio_gc.py --index audio_index.csv
+#     python azan_app/audio_gc.py --delete [--min-age-hours 24]
+
+import gzip
+import io
+import re
+from datetime import datetime, timedelta
+from config import *
+from shards import ARCHIVE_ROOT, LEGACY_PATHS, parse_shard_path
+from audio_packs import AUDIO_COLUMNS, is_index_path, is_packed_path
+
+AUDIO_ROOT = "audio/"
+ARCHIVE_PATH = re.compile(rf"^{ARCHIVE_ROOT}/(\d+)/([a-z0-9-]+)/submissions\.csv\.gz$")
+UPLOAD_STAMP = re.compile(r"_(\d{8}_\d{6})\.wav$")
+INDEX_COLUMNS = ["path", "state", "location", "size", "sha", "its", "column", "masjid", "season", "uploaded_at"]
+
+
+def submission_sources(tree):
+    """{path: (season, gzipped)} of every CSV holding submission rows"""
+    sources = {}
+    for path in tree:
+        parsed = parse_shard_path(path)
+        if parsed and parsed[2] == "submissions":
+            sources[path] = (parsed[0], False)
+        elif ARCHIVE_PATH.match(path):
+            sources[path] = (ARCHIVE_PATH.match(path).group(1), True)
+        elif path == LEGACY_PATHS["submissions"]:
+            sources[path] = ("", False)
+    return sources
+
+
+def load_references(client, tree):
+    """DataFrame (path, its, column, masjid, season) of every recording a submission names"""
+    import pandas as pd
+
+    frames = []
+    for path, (season, gzipped) in sorted(submission_sources(tree).items()):
+        content = client.get_blob(tree[path]["sha"])
+        if gzipped:
+            content = gzip.decompress(content)
+        rows = pd.read_csv(io.BytesIO(content), dtype=str, keep_default_na=False)
+        for column in AUDIO_COLUMNS:
+            if column in rows.columns:
+                frames.append(pd.DataFrame({
+                    "path": rows[column], "its": rows["its"], "column": column,
+                    "masjid": rows.get("masjid", ""), "season": season,
+                }))
+    if not frames:
+        return pd.DataFrame(columns=["path", "its", "column", "masjid", "season"])
+    references = pd.concat(frames, ignore_index=True)
+    return references[references["path"] != ""]
+
+
+def load_packed(client, tree, ref=None):
+    """{recording path: pack entry} of every pack index in the listing (of commit ref)"""
+    from audio_packs import read_indexes
+
+    packed = {}
+    for path, entry in read_indexes(client, [p for p in tree if is_index_path(p)], ref).items():
+        if entry["pack_path"] in tree:  # an index entry whose pack is gone is as good as missing
+            packed[path] = entry
+    return packed
+
+
+def upload_time(path):
+    """Upload timestamp from the file name (audio/<type>/<type>_<its>_<YYYYmmdd_HHMMSS>.wav)"""
+    match = UPLOAD_STAMP.search(path)
+    if not match:
+        return None
+    try:
+        return datetime.strptime(match.group(1), "%Y%m%d_%H%M%S")
+    except ValueError:
+        return None
+
+
+def build_index(tree, references, packed):
+    """One row per recording or dangling reference, see INDEX_COLUMNS"""
+    import pandas as pd
+
+    stored = {
+        path: ("loose", item["size"], item["sha"])
+        for path, item in tree.items()
+        if path.startswith(AUDIO_ROOT) and not is_packed_path(path)
+    }
+    stored.update({path: ("packed", e["size"], e["sha"]) for path, e in packed.items()})
+
+    rows = []
+    referenced = set()
+    for ref in references.itertuples(index=False):
+        referenced.add(ref.path)
+        location, size, sha = stored.get(ref.path, ("", None, ""))
+        rows.append({
+            "path": ref.path, "state": "ok" if location else "missing",
+            "location": location, "size": size, "sha": sha,
+            "its": ref.its, "column": ref.column, "masjid": ref.masjid, "season": ref.season,
+        })
+    for path, (location, size, sha) in stored.items():
+        if path not in referenced:
+            rows.append({"path": path, "state": "orphan", "location": location, "size": size, "sha": sha})
+
+    index = pd.DataFrame(rows).reindex(columns=INDEX_COLUMNS)
+    index["uploaded_at"] = pd.to_datetime(index["path"].map(upload_time))
+    return index.sort_values(["state", "path"], ignore_index=True)
+
+
+def reconcile(client):
+    """(head commit, index DataFrame) from one tree listing of the head commit"""
+    head, _ = client.get_head()
+    tree = client.list_tree("", ref=head)
+    if tree is None:
+        raise RuntimeError("GitHub truncated the tree listing")
+    return head, build_index(tree, load_references(client, tree), load_packed(client, tree, head))
+
+
+def deletable(index, min_age_hours=24, now=None):
+    """Loose orphans uploaded more than min_age_hours ago"""
+    now = now or datetime.now()
+    orphans = index[(index["state"] == "orphan") & (index["location"] == "loose")]
+    return orphans[orphans["uploaded_at"] <= now - timedelta(hours=min_age_hours)]
+
+
+def delete_orphans(client, head, orphans):
+    """Delete the orphan paths in one commit on top of head, returns the commit sha"""
+    if orphans.empty:
+        return None
+    commit = client.commit_tree(
+        {path: None for path in orphans["path"]},
+        f"Remove {len(orphans)} orphaned recordings",
+        head,
+    )
+    if commit is None:
+        raise RuntimeError("Branch moved during the reconciliation, run it again")
+    return commit
+
+
+def summary(index):
+    """Counts and bytes per state and location"""
+    grouped = index.fillna({"size": 0}).groupby(["state", "location"], dropna=False)
+    return grouped.agg(files=("path", "count"), bytes=("size", "sum")).reset_index().astype({"bytes": int})
+
+
+# ============= COMMAND LINE =============
+
+def main():
+    import argparse
+    import streamlit as st
+    from github_client import GitHubRepo
+
+    parser = argparse.ArgumentParser(description="Audio integrity report and orphan clean-up")
+    parser.add_argument("--index", help="write the full index to this CSV")
+    parser.add_argument("--delete", action="store_true", help="delete loose orphans in one commit")
+    parser.add_argument("--min-age-hours", type=float, default=24,
+                        help="only delete orphans uploaded at least this long ago (default 24)")
+    args = parser.parse_args()
+
+    # [github] credentials from .streamlit/secrets.toml, like the app
+    client = GitHubRepo.from_secrets(st.secrets)
+    head, index = reconcile(client)
+    print(f"Audio index at {head[:7]}:")
+    print(summary(index).to_string(index=False))
+    if args.index:
+        index.to_csv(args.index, index=False)
+
+    missing = index[index["state"] == "missing"]
+    if not missing.empty:
+        print(f"\n{len(missing)} rows point at recordings that do not exist:")
+        print(missing[["its", "masjid", "season", "column", "path"]].to_string(index=False))
+
+    orphans = deletable(index, args.min_age_hours)
+    print(f"\n{len(orphans)} loose orphans older than {args.min_age_hours:g}h "
+          f"({orphans['size'].sum() / 1e6:.1f} MB)")
+    if args.delete and not orphans.empty:
+        commit = delete_orphans(client, head, orphans)
+        print(f"Deleted them in {commit[:7]}")
+    elif not orphans.empty:
+        print(orphans[["path", "size", "uploaded_at"]].to_string(index=False, max_rows=50))
+
+
+if __name__ == "__main__":
+    main()
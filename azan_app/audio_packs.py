@@ -0,0 +1,295 @@
+# ============= PACKED AUDIO ARCHIVES =============
+# Once a submission is reviewed its recordings are only ever played back, so
+# they are moved out of the loose audio/ folders into per masjid and season
+# pack files:
+#
+#     audio/packs/<season>/<masjid-slug>/pack-0001.bin
+#     audio/packs/<season>/<masjid-slug>/index.json
+#
+# Each recording is compressed on its own and appended to the pack; the index
+# maps its original path (the one stored in azan_file / takbirah_file) to the
+# pack, byte offset and length, so one recording is read back with a single
+# ranged download whatever the size of the pack. Packs are never rewritten:
+# every run adds a new pack and rewrites only the small index.
+#
+# 16-bit PCM WAVs are stored as per-channel sample differences split into
+# low/high byte planes before zlib, which compresses recitation to about 38%
+# of its size where plain zlib gets about 59%. Both are lossless; anything
+# that is not 16-bit PCM is stored with plain zlib.
+#
+#     python azan_app/audio_packs.py status
+#     python azan_app/audio_packs.py pack [--masjid "Najmi Masjid"] [--dry-run]
+
+import json
+import re
+import struct
+import zlib
+from config import *
+from shards import slug, masjid_for_slug, load_shards
+from wav_info import PCM, IncompleteHeader, parse_header
+
+PACK_ROOT = "audio/packs"
+INDEX_NAME = "index.json"
+PACK_MAX_BYTES = 40 * 1024 * 1024  # well under GitHub's 100 MB file limit
+AUDIO_COLUMNS = ("azan_file", "takbirah_file")
+
+INDEX_PATH = re.compile(rf"^{PACK_ROOT}/(\d+)/([a-z0-9-]+)/{INDEX_NAME}$")
+
+
+def pack_dir(masjid, season=SEASON):
+    return f"{PACK_ROOT}/{season}/{slug(masjid)}"
+
+
+def index_path(masjid, season=SEASON):
+    return f"{pack_dir(masjid, season)}/{INDEX_NAME}"
+
+
+def is_index_path(path):
+    return INDEX_PATH.match(path) is not None
+
+
+def is_packed_path(path):
+    """True for pack files and indexes (as opposed to loose recordings)"""
+    return path.startswith(f"{PACK_ROOT}/")
+
+
+# ============= CODEC =============
+
+def _pcm16_layout(data):
+    """(data offset, data length, channels) of a 16-bit PCM WAV, None otherwise"""
+    try:
+        info = parse_header(memoryview(data))
+    except (ValueError, IncompleteHeader):
+        return None
+    if info.format != PCM or info.bits != 16 or not info.channels:
+        return None
+    return info.data_offset, info.data_bytes - info.data_bytes % (2 * info.channels), info.channels
+
+
+def encode(data):
+    """(codec, compressed bytes) of one recording"""
+    import numpy as np
+
+    layout = _pcm16_layout(data)
+    if layout is None:
+        return "zlib", zlib.compress(data, 9)
+    start, length, channels = layout
+    samples = np.frombuffer(data, dtype="<i2", count=length // 2, offset=start).reshape(-1, channels)
+    deltas = np.diff(samples, axis=0, prepend=np.zeros((1, channels), dtype="<i2"))
+    planes = deltas.reshape(-1).view(np.uint8).reshape(-1, 2).T.tobytes()  # all low bytes, then all high
+    head, tail = data[:start], data[start + length:]
+    payload = struct.pack("<IIH", len(head), len(tail), channels) + head + tail + planes
+    return "pcm16-delta", zlib.compress(payload, 9)
+
+
+def decode(codec, blob):
+    """Original bytes of a recording stored by encode()"""
+    import numpy as np
+
+    payload = zlib.decompress(blob)
+    if codec == "zlib":
+        return payload
+    if codec != "pcm16-delta":
+        raise ValueError(f"Unknown audio codec {codec!r}")
+    head_len, tail_len, channels = struct.unpack_from("<IIH", payload)
+    pos = struct.calcsize("<IIH")
+    head, tail = payload[pos:pos + head_len], payload[pos + head_len:pos + head_len + tail_len]
+    planes = np.frombuffer(payload, dtype=np.uint8, offset=pos + head_len + tail_len).reshape(2, -1)
+    deltas = planes.T.copy().view("<i2").reshape(-1, channels)
+    samples = np.cumsum(deltas, axis=0, dtype="<i2")  # int16 wrap-around undoes the diff exactly
+    return head + samples.tobytes() + tail
+
+
+# ============= READING =============
+
+def read_indexes(client, paths, ref=None):
+    """
+    {recording path: member entry + "pack_path" and "ref"} out of the given
+    index.json files at commit ref (the branch head when None). Members are
+    read from the packs at that same commit.
+    """
+    if ref is None and paths:
+        ref, _ = client.get_head()
+    members = {}
+    for path in paths:
+        content, _, _ = client.get_file(path, ref=ref)
+        if not content:
+            continue
+        directory = path.rsplit("/", 1)[0]
+        for member, entry in json.loads(content)["members"].items():
+            members[member] = {**entry, "pack_path": f"{directory}/{entry['pack']}", "ref": ref}
+    return members
+
+
+def read_member(client, entry):
+    """Bytes of one packed recording (a single ranged read), checked against its blob sha"""
+    from delta_sync import git_blob_sha
+
+    raw = client.get_range(entry["pack_path"], entry["offset"], entry["length"], entry.get("ref"))
+    data = decode(entry["codec"], raw)
+    if git_blob_sha(data) != entry["sha"]:
+        raise ValueError(f"Packed copy of {entry['pack_path']} @ {entry['offset']} is corrupt")
+    return data
+
+
+def read_member_header(client, entry, length):
+    """
+    Up to the first length bytes of a packed recording, decompressing only
+    the start of its compressed stream (enough for the WAV header)
+    """
+    preamble = struct.calcsize("<IIH")
+    probe = min(entry["length"], 1024)
+    while True:
+        raw = client.get_range(entry["pack_path"], entry["offset"], probe, entry.get("ref"))
+        payload = zlib.decompressobj().decompress(raw, preamble + length)
+        if entry["codec"] == "zlib":
+            if len(payload) >= length or probe == entry["length"]:
+                return payload[:length]
+        elif len(payload) >= preamble:
+            head_len = struct.unpack_from("<I", payload)[0]
+            # The raw WAV header is stored first; samples are not needed
+            if len(payload) >= preamble + min(head_len, length) or probe == entry["length"]:
+                return payload[preamble:preamble + min(head_len, length)]
+        if probe == entry["length"]:
+            return payload
+        probe = min(entry["length"], probe * 4)
+
+
+def read_recording(client, path, tree, packed):
+    """Bytes of a recording wherever it lives: tree and packed as from list_tree / read_indexes"""
+    if path in packed:
+        return read_member(client, packed[path])
+    if path in tree:
+        return client.get_blob(tree[path]["sha"])
+    return None
+
+
+# ============= PACKING =============
+
+def packable(tree, submissions, reviews, masjid=None):
+    """{masjid: [loose recording paths]} of reviewed submissions"""
+    if submissions.empty or reviews.empty:
+        return {}
+    reviewed = set(reviews["its"].astype(str))
+    rows = submissions[submissions["its"].astype(str).isin(reviewed)]
+    if masjid is not None:
+        rows = rows[rows["masjid"] == masjid]
+    groups = {}
+    for row in rows.itertuples(index=False):
+        for column in AUDIO_COLUMNS:
+            path = getattr(row, column, None)
+            if isinstance(path, str) and path in tree and not is_packed_path(path):
+                groups.setdefault(row.masjid, [])
+                if path not in groups[row.masjid]:
+                    groups[row.masjid].append(path)
+    return groups
+
+
+def _next_pack(index):
+    return f"pack-{len(index['packs']) + 1:04d}.bin"
+
+
+def pack_recordings(client, season=SEASON, masjid=None, dry_run=False):
+    """
+    Move the loose recordings of reviewed submissions of a season into packs,
+    in one commit. Returns {masjid: {"files", "bytes", "packed_bytes"}}.
+    """
+    import hashlib
+
+    head, _ = client.get_head()
+    tree = client.list_tree("audio/", ref=head)
+    if tree is None:
+        raise RuntimeError("GitHub truncated the audio listing")
+    submissions, _ = load_shards(client, "submissions", season=season)
+    reviews, _ = load_shards(client, "reviews", season=season)
+    groups = packable(tree, submissions, reviews, masjid)
+
+    report, files = {}, {}
+    for name, paths in sorted(groups.items()):
+        report[name] = {"files": len(paths), "bytes": sum(tree[p]["size"] for p in paths), "packed_bytes": 0}
+        if dry_run:
+            continue
+        path = index_path(name, season)
+        content, _, _ = client.get_file(path, ref=head) if path in tree else (None, None, None)
+        index = json.loads(content) if content else {"version": 1, "season": season, "packs": {}, "members": {}}
+
+        pack, pack_name = bytearray(), _next_pack(index)
+
+        def flush():
+            if pack:
+                files[f"{pack_dir(name, season)}/{pack_name}"] = client.create_blob(bytes(pack))
+                index["packs"][pack_name] = {"bytes": len(pack), "sha256": hashlib.sha256(pack).hexdigest()}
+
+        for member in paths:
+            data = client.get_blob(tree[member]["sha"])
+            codec, blob = encode(data)
+            if pack and len(pack) + len(blob) > PACK_MAX_BYTES:
+                flush()
+                pack, pack_name = bytearray(), _next_pack(index)
+            index["members"][member] = {
+                "pack": pack_name, "offset": len(pack), "length": len(blob),
+                "size": len(data), "sha": tree[member]["sha"], "codec": codec,
+            }
+            pack += blob
+            files[member] = None
+            report[name]["packed_bytes"] += len(blob)
+        flush()
+        files[path] = client.create_blob((json.dumps(index, indent=1, sort_keys=True) + "\n").encode())
+
+    if not files:
+        return report
+    count = sum(r["files"] for r in report.values())
+    commit = client.commit_tree(files, f"Pack {count} reviewed recordings ({season})", head)
+    if commit is None:
+        raise RuntimeError("Branch moved while packing, run it again")
+    return report
+
+
+def pack_status(client, season=SEASON):
+    """{masjid: {"packs", "files", "bytes", "packed_bytes"}} from the season's indexes"""
+    tree = client.list_tree(f"{PACK_ROOT}/{season}/") or {}
+    status = {}
+    for path in sorted(p for p in tree if is_index_path(p)):
+        content, _, _ = client.get_file(path)
+        index = json.loads(content)
+        status[masjid_for_slug(INDEX_PATH.match(path).group(2))] = {
+            "packs": len(index["packs"]),
+            "files": len(index["members"]),
+            "bytes": sum(m["size"] for m in index["members"].values()),
+            "packed_bytes": sum(p["bytes"] for p in index["packs"].values()),
+        }
+    return status
+
+
+# ============= COMMAND LINE =============
+
+def main():
+    import argparse
+    import streamlit as st
+    from github_client import GitHubRepo
+
+    parser = argparse.ArgumentParser(description="Packed audio archives")
+    sub = parser.add_subparsers(dest="command", required=True)
+    pack = sub.add_parser("pack", help="pack the recordings of reviewed submissions")
+    pack.add_argument("--season", default=SEASON)
+    pack.add_argument("--masjid", help="only this masjid (MASJID_LIST spelling)")
+    pack.add_argument("--dry-run", action="store_true", help="list what would be packed")
+    status = sub.add_parser("status", help="packs and members per masjid")
+    status.add_argument("--season", default=SEASON)
+    args = parser.parse_args()
+
+    # [github] credentials from .streamlit/secrets.toml, like the app
+    client = GitHubRepo.from_secrets(st.secrets)
+    if args.command == "pack":
+        report = pack_recordings(client, args.season, args.masjid, args.dry_run)
+    else:
+        report = pack_status(client, args.season)
+    if not report:
+        print("Nothing to pack" if args.command == "pack" else "No packs")
+    for name, row in report.items():
+        ratio = f"{row['packed_bytes'] / row['bytes']:.0%}" if row["bytes"] and row["packed_bytes"] else "-"
+        print(f"{name:30} {row['files']:5} files  {row['bytes'] / 1e6:8.1f} MB  packed {ratio}")
+
+
+if __name__ == "__main__":
+    main()
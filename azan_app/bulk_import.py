@@ -0,0 +1,319 @@
+# ============= BULK OFFLINE IMPORT =============
+# Registrations collected on paper or in spreadsheets are imported in one go:
+# the sheet is validated column-wise with the compiled VALIDATION_RULES, ITS
+# numbers are checked against existing submissions with a set join, and every
+# valid row plus its audio lands in its masjid's submissions shard (see
+# shards.py), all shards in a single commit.
+#
+#     python azan_app/bulk_import.py registrations.xlsx --audio-dir recordings/ [--dry-run]
+#
+# Audio files are matched by the sheet's azan_file / takbirah_file columns
+# (file names inside the folder) or, when those are empty, by the name
+# "<type>_<its>.wav", e.g. azan_30439531.wav. The folder is optional: without
+# it rows are imported with the interests from the sheet and no recordings.
+
+import io
+import os
+import random
+import time
+from datetime import datetime
+import pandas as pd
+from config import *
+from validation import SCHEMA
+from shards import shard_path, list_shards, parse_shard_path, load_shards
+
+SUBMISSION_COLUMNS = [
+    "name", "its", "whatsapp", "masjid", "interests",
+    "azan_file", "takbirah_file", "remarks", "submitted_at",
+]
+
+AUDIO_TYPES = {"azan": "Azan", "takbirah": "Takbirah"}
+
+# Spreadsheet headers (normalised to lower_snake_case) accepted for each column
+HEADER_ALIASES = {
+    "full_name": "name",
+    "its_number": "its",
+    "its_no": "its",
+    "whatsapp_number": "whatsapp",
+    "mobile": "whatsapp",
+    "comments": "remarks",
+}
+
+
+class ImportPlan:
+    """Validated rows ready to commit, plus a per-row error report"""
+
+    def __init__(self, rows, report, audio, total):
+        self.rows = rows  # DataFrame in SUBMISSION_COLUMNS order (audio paths filled in on commit)
+        self.report = report  # DataFrame: row, its, name, errors
+        self.audio = audio  # {row index: {audio type: loader}}
+        self.total = total
+
+    @property
+    def valid_count(self):
+        return len(self.rows)
+
+    @property
+    def error_count(self):
+        return len(self.report)
+
+
+# ============= READING =============
+
+def read_sheet(source, filename=None, aliases=HEADER_ALIASES):
+    """
+    Read a CSV or XLSX (path or file-like) as strings with normalised headers.
+    filename decides the format for file-like sources.
+    """
+    name = (filename or str(source)).lower()
+    if name.endswith((".xlsx", ".xlsm")):
+        try:
+            df = pd.read_excel(source, dtype=str, engine="openpyxl")
+        except ImportError:
+            raise ValueError("Reading .xlsx files needs openpyxl (pip install openpyxl)")
+    elif name.endswith(".csv"):
+        df = pd.read_csv(source, dtype=str, keep_default_na=False)
+    else:
+        raise ValueError("Expected a .csv or .xlsx file")
+
+    df.columns = [
+        aliases.get(c, c)
+        for c in df.columns.astype(str).str.strip().str.lower().str.replace(r"[\s\-]+", "_", regex=True)
+    ]
+    df = df.fillna("").astype(str)
+    for column in df.columns:
+        df[column] = df[column].str.strip()
+    # Numbers typed into spreadsheet cells come back as "30439531.0"
+    for column in ("its", "whatsapp"):
+        if column in df.columns:
+            df[column] = df[column].str.replace(r"\.0$", "", regex=True)
+    return df
+
+
+def folder_audio(directory):
+    """{lower-case file name: loader} for every .wav in a folder"""
+    files = {}
+    for name in os.listdir(directory):
+        path = os.path.join(directory, name)
+        if name.lower().endswith(".wav") and os.path.isfile(path):
+            files[name.lower()] = lambda path=path: open(path, "rb").read()
+    return files
+
+
+def uploaded_audio(uploads):
+    """{lower-case file name: loader} for st.file_uploader files"""
+    return {upload.name.lower(): upload.getvalue for upload in uploads}
+
+
+# ============= VALIDATION =============
+
+def _interests(df, audio_files=None):
+    """
+    Boolean column per audio type: from the interests column, else from the
+    recordings the sheet names or (with audio_files) the ones found
+    """
+    if "interests" in df.columns and (df["interests"] != "").any():
+        lowered = df["interests"].str.lower()
+        return {t: lowered.str.contains(t, regex=False) for t in AUDIO_TYPES}
+    interests = {}
+    for audio_type in AUDIO_TYPES:
+        found = pd.Series(False, index=df.index)
+        if audio_files is not None:
+            found |= (audio_type + "_" + df["its"] + ".wav").str.lower().isin(audio_files)
+        if f"{audio_type}_file" in df.columns:
+            found |= df[f"{audio_type}_file"] != ""
+        interests[audio_type] = found
+    return interests
+
+
+def prepare_import(df, existing_its, audio_files=None):
+    """
+    Validate a sheet read by read_sheet.
+    existing_its: set of ITS numbers already registered.
+    audio_files: {lower-case file name: loader} (folder_audio / uploaded_audio),
+    None when no recordings come with the sheet: rows are then imported
+    without audio instead of failing with "recording not found".
+    """
+    df = df.copy()
+    for column in SCHEMA.fields:
+        if column not in df.columns:
+            df[column] = ""
+
+    errors = SCHEMA.validate_frame(df)
+
+    # Uniqueness: against existing submissions, then within the sheet itself
+    its = df["its"]
+    ok = errors["its"] == ""
+    errors.loc[ok & its.isin(existing_its), "its"] = "ITS already registered"
+    ok = errors["its"] == ""
+    errors.loc[ok & its.duplicated(keep="first"), "its"] = "Duplicate ITS in this file"
+
+    interests = _interests(df, audio_files)
+    no_interest = ~(interests["azan"] | interests["takbirah"])
+    errors["interests"] = no_interest.map({True: "Select at least one recording interest", False: ""})
+
+    # Audio: only rows that asked for it, dictionary lookups by file name
+    audio = {}
+    for audio_type, label in AUDIO_TYPES.items():
+        errors[f"{audio_type}_audio"] = ""
+        if audio_files is None:
+            continue
+        wanted = interests[audio_type].to_numpy(dtype=bool)
+        default = (audio_type + "_" + its[wanted] + ".wav").str.lower()
+        if f"{audio_type}_file" in df.columns:
+            named = df.loc[wanted, f"{audio_type}_file"].str.lower().map(os.path.basename)
+            default = named.where(named != "", default)
+        missing = []
+        for index, name in zip(df.index[wanted], default.to_numpy()):
+            loader = audio_files.get(name)
+            if loader is None:
+                missing.append(index)
+            else:
+                audio.setdefault(index, {})[audio_type] = loader
+        errors.loc[missing, f"{audio_type}_audio"] = f"{label} recording not found"
+
+    invalid = (errors != "").any(axis=1)
+    messages = [
+        "; ".join(f"{field}: {message}" for field, message in zip(errors.columns, row) if message)
+        for row in errors[invalid].to_numpy()
+    ]
+    report = pd.DataFrame({
+        "row": df.index[invalid] + 2,  # spreadsheet line (header is line 1)
+        "its": its[invalid].to_numpy(),
+        "name": df.loc[invalid, "name"].to_numpy(),
+        "errors": messages,
+    })
+
+    valid = df[~invalid]
+    chosen = pd.DataFrame({label: interests[t] for t, label in AUDIO_TYPES.items()})[~invalid]
+    now = datetime.now().isoformat()
+    rows = pd.DataFrame({
+        "name": valid["name"],
+        "its": valid["its"],
+        "whatsapp": valid["whatsapp"],
+        "masjid": valid["masjid"],
+        "interests": chosen.dot(chosen.columns + ", ").str.rstrip(", "),
+        "azan_file": "",
+        "takbirah_file": "",
+        "remarks": valid["remarks"].replace("", "No comments") if "remarks" in valid else "No comments",
+        "submitted_at": valid["submitted_at"].replace("", now) if "submitted_at" in valid else now,
+    }, index=valid.index)[SUBMISSION_COLUMNS]
+
+    return ImportPlan(rows, report, {i: a for i, a in audio.items() if i in rows.index}, len(df))
+
+
+# ============= COMMIT =============
+
+def _append_rows(content, rows):
+    """Existing CSV bytes with rows appended (existing lines are left untouched)"""
+    if not content:
+        return rows.to_csv(index=False).encode()
+    header = pd.read_csv(io.BytesIO(content), nrows=0).columns.tolist()
+    extra = [c for c in rows.columns if c not in header]
+    if extra:
+        # New columns: rewrite the file once with the union of columns
+        existing = pd.read_csv(io.BytesIO(content), dtype=str, keep_default_na=False)
+        return pd.concat([existing, rows], ignore_index=True).to_csv(index=False).encode()
+    if not content.endswith(b"\n"):
+        content += b"\n"
+    return content + rows.reindex(columns=header, fill_value="").to_csv(index=False, header=False).encode()
+
+
+def commit_import(client, plan, message=None, max_attempts=5, backoff=0.5):
+    """
+    Upload the plan's audio and append its rows to their masjid shards in one commit.
+    Rows whose ITS got registered in the meantime are dropped into the report.
+    Returns (committed rows, commit sha); the sha is None when nothing was committed.
+    """
+    stamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    rows = plan.rows.copy()
+    audio_blobs = {}
+    for index, recordings in plan.audio.items():
+        for audio_type, loader in recordings.items():
+            path = f"audio/{audio_type}/{audio_type}_{rows.at[index, 'its']}_{stamp}.wav"
+            audio_blobs[(index, audio_type)] = (path, client.create_blob(loader()))
+            rows.at[index, f"{audio_type}_file"] = path
+
+    message = message or f"Bulk import of {len(rows)} submissions - {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}"
+    for attempt in range(max_attempts):
+        head, _ = client.get_head()
+        shards = {}
+        for path in list_shards(client, ref=head):
+            if parse_shard_path(path)[2] == "submissions":
+                shards[path], _, _ = client.get_file(path, ref=head)
+
+        # Someone may have registered one of these ITS since validation (in any masjid)
+        current = set()
+        for content in shards.values():
+            if content:
+                current.update(pd.read_csv(io.BytesIO(content), dtype=str, usecols=["its"])["its"].dropna())
+        taken = rows["its"].isin(current)
+        if taken.any():
+            plan.report = pd.concat([plan.report, pd.DataFrame({
+                "row": rows.index[taken] + 2,
+                "its": rows.loc[taken, "its"].to_numpy(),
+                "name": rows.loc[taken, "name"].to_numpy(),
+                "errors": "its: ITS already registered",
+            })], ignore_index=True)
+            rows = rows[~taken]
+        if rows.empty:
+            return rows, None
+
+        # One appended blob per masjid shard touched
+        files = {}
+        for masjid, group in rows.groupby("masjid", sort=False):
+            path = shard_path("submissions", masjid)
+            files[path] = client.create_blob(_append_rows(shards.get(path), group))
+        files.update({path: sha for (index, _), (path, sha) in audio_blobs.items() if index in rows.index})
+        commit = client.commit_tree(files, message, head)
+        if commit is not None:
+            return rows, commit
+
+        # Branch moved (another submission landed), rebase on the new head
+        if attempt < max_attempts - 1:
+            time.sleep(backoff * (2 ** attempt) * random.uniform(0.5, 1.5))
+    raise RuntimeError(f"Branch kept moving, gave up after {max_attempts} attempts")
+
+
+# ============= COMMAND LINE =============
+
+def main():
+    import argparse
+    import streamlit as st
+    from github_client import GitHubRepo
+
+    parser = argparse.ArgumentParser(description="Bulk import offline registrations")
+    parser.add_argument("sheet", help=".csv or .xlsx with name, its, whatsapp, masjid columns")
+    parser.add_argument("--audio-dir", help="folder with the recordings")
+    parser.add_argument("--dry-run", action="store_true", help="validate and report only")
+    parser.add_argument("--report", help="write the per-row error report to this CSV")
+    args = parser.parse_args()
+
+    # [github] credentials from .streamlit/secrets.toml, like the app
+    client = GitHubRepo.from_secrets(st.secrets)
+    existing, _ = load_shards(client, "submissions")
+    existing_its = set(existing["its"].astype(str)) if "its" in existing.columns else set()
+
+    started = time.perf_counter()
+    plan = prepare_import(
+        read_sheet(args.sheet),
+        existing_its,
+        folder_audio(args.audio_dir) if args.audio_dir else None,
+    )
+    elapsed = time.perf_counter() - started
+    print(f"{plan.total} rows validated in {elapsed * 1000:.0f} ms: "
+          f"{plan.valid_count} valid, {plan.error_count} with errors")
+
+    if not args.dry_run and plan.valid_count:
+        rows, commit = commit_import(client, plan)
+        if commit:
+            print(f"Committed {len(rows)} submissions as {commit[:7]}")
+
+    if args.report:
+        plan.report.to_csv(args.report, index=False)
+    elif not plan.report.empty:
+        print(plan.report.to_string(index=False, max_rows=50))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,143 @@
+# ============= BULK REVIEW =============
+# Decisions scored offline (a sheet with its, status, comments) are checked
+# against the registered submissions, diffed against the current reviews and
+# applied in one commit. Rows are built with review_change() and merged with
+# the same row merge as save_review_to_github, so a concurrent review from
+# the admin panel is merged rather than overwritten.
+#
+#     python azan_app/bulk_review.py decisions.xlsx --dry-run
+#     python azan_app/bulk_review.py decisions.csv [--reviewer "Shaikh Ali"]
+
+import pandas as pd
+from config import *
+from bulk_import import read_sheet
+from review_writer import review_change, commit_tree_row_changes
+from shards import shard_path, load_shards
+
+# Spreadsheet headers (normalised to lower_snake_case) accepted for each column
+REVIEW_HEADER_ALIASES = {
+    "its_number": "its",
+    "its_no": "its",
+    "decision": "status",
+    "assessment_status": "status",
+    "remarks": "comments",
+    "feedback": "comments",
+}
+
+
+class ReviewPlan:
+    """Changes to apply, unchanged rows and a per-row error report"""
+
+    def __init__(self, changes, unchanged, report, total):
+        self.changes = changes  # DataFrame: its, masjid, name, old/new status and comments
+        self.unchanged = unchanged
+        self.report = report  # DataFrame: row, its, errors
+        self.total = total
+
+
+def prepare_reviews(sheet, submissions, reviews):
+    """Validate sheet rows and diff them against the current reviews"""
+    missing = [c for c in ("its", "status") if c not in sheet.columns]
+    if missing:
+        raise ValueError(f"Missing column(s): {', '.join(missing)}")
+    sheet = sheet.reindex(columns=["its", "status", "comments"], fill_value="")
+
+    statuses = {s.lower(): s for s in REVIEW_STATUSES}
+    known = submissions.assign(its=submissions["its"].astype(str)).drop_duplicates("its", keep="last")
+    known = known.set_index("its")
+
+    errors = pd.Series("", index=sheet.index)
+    errors[~sheet["its"].isin(known.index)] += "its: no submission with this ITS; "
+    errors[sheet["its"].duplicated(keep=False)] += "its: listed more than once; "
+    canonical = sheet["status"].str.lower().map(statuses)
+    errors[canonical.isna()] += f"status: must be one of {', '.join(REVIEW_STATUSES)}; "
+
+    report = pd.DataFrame({
+        "row": sheet.index[errors != ""] + 2,  # spreadsheet row (header is row 1)
+        "its": sheet.loc[errors != "", "its"],
+        "errors": errors[errors != ""].str.rstrip("; "),
+    })
+
+    valid = sheet[errors == ""].assign(status=canonical[errors == ""])
+    current = reviews.fillna("").astype(str).drop_duplicates("its", keep="last").set_index("its") \
+        if not reviews.empty and "its" in reviews.columns else pd.DataFrame(columns=["status", "comments"])
+    diff = pd.DataFrame({
+        "its": valid["its"],
+        "masjid": valid["its"].map(known["masjid"]),
+        "name": valid["its"].map(known["name"]),
+        "old_status": valid["its"].map(current["status"]),
+        "old_comments": valid["its"].map(current["comments"]).fillna(""),
+        "status": valid["status"],
+        "comments": valid["comments"],
+    })
+    same = (diff["old_status"] == diff["status"]) & (diff["old_comments"] == diff["comments"])
+    return ReviewPlan(diff[~same], int(same.sum()), report, len(sheet))
+
+
+def format_diff(changes):
+    """One line per change: + new review, ~ changed review"""
+    lines = []
+    for row in changes.itertuples(index=False):
+        if pd.isna(row.old_status):
+            lines.append(f"+ {row.its}  {row.name}  [{row.masjid}]  {row.status}: {row.comments}")
+        else:
+            lines.append(f"~ {row.its}  {row.name}  [{row.masjid}]  {row.old_status} -> {row.status}")
+            if row.old_comments != row.comments:
+                lines.append(f"      comments: {row.old_comments!r} -> {row.comments!r}")
+    return "\n".join(lines)
+
+
+def apply_reviews(client, plan, message=None):
+    """Write every change to its masjid's reviews shard in one commit, returns the commit sha"""
+    changes = {}
+    for row in plan.changes.itertuples(index=False):
+        changes.setdefault(shard_path("reviews", row.masjid), {}).update(
+            review_change(row.its, row.status, row.comments)
+        )
+    message = message or f"Bulk review of {len(plan.changes)} submissions"
+    result = commit_tree_row_changes(client, changes, message)
+    if result is None:
+        raise RuntimeError("Could not commit the reviews, the branch kept moving")
+    return result[1]
+
+
+# ============= COMMAND LINE =============
+
+def main():
+    import argparse
+    import streamlit as st
+    from github_client import GitHubRepo
+
+    parser = argparse.ArgumentParser(description="Apply review decisions from a spreadsheet")
+    parser.add_argument("sheet", help=".csv or .xlsx with its, status, comments columns")
+    parser.add_argument("--dry-run", action="store_true", help="print the diff only")
+    parser.add_argument("--reviewer", help="added to the commit message")
+    parser.add_argument("--report", help="write the per-row error report to this CSV")
+    args = parser.parse_args()
+
+    # [github] credentials from .streamlit/secrets.toml, like the app
+    client = GitHubRepo.from_secrets(st.secrets)
+    submissions, _ = load_shards(client, "submissions")
+    reviews, _ = load_shards(client, "reviews")
+    plan = prepare_reviews(read_sheet(args.sheet, aliases=REVIEW_HEADER_ALIASES), submissions, reviews)
+
+    print(f"{plan.total} rows: {len(plan.changes)} to apply, {plan.unchanged} unchanged, "
+          f"{len(plan.report)} with errors")
+    if len(plan.changes):
+        print(format_diff(plan.changes))
+    if args.report:
+        plan.report.to_csv(args.report, index=False)
+    elif not plan.report.empty:
+        print(plan.report.to_string(index=False, max_rows=50))
+
+    if args.dry_run or not len(plan.changes):
+        return
+    message = f"Bulk review of {len(plan.changes)} submissions"
+    if args.reviewer:
+        message += f" by {args.reviewer}"
+    commit = apply_reviews(client, plan, message)
+    print(f"Committed {len(plan.changes)} reviews as {commit[:7]}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+# ============= CACHE CONTROL =============
+# Per-dataset cache versions so a write only invalidates what it touched.
+# Cached loaders take the dataset version as their first argument: bumping
+# the version makes the next call a cache miss without touching other caches.
+
+import threading
+import streamlit as st
+
+DATASETS = ("submissions", "reviews", "audio")
+
+
+@st.cache_resource
+def _cache_registry():
+    """Process-wide dataset versions and hit/miss counters (shared by all sessions)"""
+    return {
+        "lock": threading.Lock(),
+        "versions": {name: 0 for name in DATASETS},
+        "stats": {},
+        "listeners": [],
+    }
+
+
+def dataset_version(dataset):
+    """Current version number of a dataset"""
+    return _cache_registry()["versions"].get(dataset, 0)
+
+
+def invalidate(*datasets):
+    """Bump the version of each dataset so its cached loaders refetch"""
+    registry = _cache_registry()
+    with registry["lock"]:
+        for name in datasets:
+            registry["versions"][name] = registry["versions"].get(name, 0) + 1
+        listeners = list(registry["listeners"])
+    for listener in listeners:
+        listener(datasets)
+
+
+def add_invalidation_listener(listener):
+    """Register listener(datasets) to be called after every invalidate()"""
+    registry = _cache_registry()
+    with registry["lock"]:
+        registry["listeners"].append(listener)
+
+
+def _stats_for(cache_name, dataset):
+    stats = _cache_registry()["stats"]
+    if cache_name not in stats:
+        stats[cache_name] = {"dataset": dataset, "calls": 0, "misses": 0}
+    return stats[cache_name]
+
+
+def record_miss(cache_name, dataset):
+    """Called from inside a cached function body, which only runs on a miss"""
+    registry = _cache_registry()
+    with registry["lock"]:
+        _stats_for(cache_name, dataset)["misses"] += 1
+
+
+def cached_call(cache_name, dataset, func, *args):
+    """Call a versioned cached loader and count the call"""
+    registry = _cache_registry()
+    with registry["lock"]:
+        _stats_for(cache_name, dataset)["calls"] += 1
+    return func(dataset_version(dataset), *args)
+
+
+def cache_stats():
+    """Hit/miss counters for every versioned cache"""
+    registry = _cache_registry()
+    with registry["lock"]:
+        rows = []
+        for name, s in sorted(registry["stats"].items()):
+            hits = max(0, s["calls"] - s["misses"])
+            rows.append({
+                "cache": name,
+                "dataset": s["dataset"],
+                "version": registry["versions"].get(s["dataset"], 0),
+                "hits": hits,
+                "misses": s["misses"],
+                "hit_rate": round(hits / s["calls"], 3) if s["calls"] else 0.0,
+            })
+        return rows
+
+
+def show_cache_stats():
+    """Display cache counters in the admin sidebar"""
+    with st.sidebar.expander("⚙️ Cache Stats"):
+        rows = cache_stats()
+        if rows:
+            st.dataframe(rows, hide_index=True, use_container_width=True)
+        else:
+            st.caption("No cache activity yet")
@@ -5,37 +5,94 @@ import streamlit as st
 # ADMIN_PASSWORD = "azan"
 ADMIN_PASSWORD = st.secrets["ADMIN_PASSWORD"]
 
+# Season currently open for registration (storage is sharded per season, see shards.py)
+SEASON = "1447"
+SEASON_NAME = f"Shehrullah {SEASON}"
+
 # Files & Directories
 DATA_FILE = "submissions.csv"
 UPLOAD_DIR = "uploads"
 REVIEW_FILE = "admin_reviews.csv"
 
+# Background image and its pre-resized variants (see assets.py)
+BG_IMAGE = "assets/ramadan-bg.jpg"
+BG_WIDTHS = (640, 1280, 1920)  # one variant per viewport width breakpoint
+BG_WEBP_QUALITY = 70
+BG_JPEG_QUALITY = 72
+
+# Sidecar HTTP server for machine-facing endpoints (/metrics, ...), 0 disables
+SIDECAR_HOST = "127.0.0.1"
+SIDECAR_PORT = 8599
+
+# Headless read API (read_api.py), a separate process
+READ_API_HOST = "127.0.0.1"
+READ_API_PORT = 8600
+READ_API_PAGE_SIZE = 50
+READ_API_MAX_PAGE_SIZE = 500
+
 # Audio Settings
 AUDIO_PAUSE_THRESHOLD = 6.0  # seconds
 AUDIO_SAMPLE_RATE = 16000
 
-# Validation Rules
+# Masjid List
+MASJID_LIST = ["", "Najmi Masjid", "Saifee Masjid", "Kalimi Masjid", "Vajihi Masjid"]
+
+# Validation Rules (compiled once by validation.py)
+# label: used in "<label> is required", message: summary error for the form
 VALIDATION_RULES = {
     "name": {
+        "label": "Name",
         "required": True,
         "min_length": 6,
         "max_length": 60,
+        "message": "Name must be 6–60 characters",
     },
     "its": {
+        "label": "ITS",
         "required": True,
         "pattern": r"^\d{8}$",
+        "message": "ITS must be 8 digits",
     },
     "whatsapp": {
+        "label": "WhatsApp number",
         "required": True,
         "pattern": r"^\d{7,15}$",
+        "message": "Invalid WhatsApp number (7-15 digits)",
     },
     "masjid": {
+        "label": "Masjid selection",
         "required": True,
+        "choices": MASJID_LIST[1:],
+        "message": "Please choose a masjid from the list",
     },
 }
 
-# Masjid List
-MASJID_LIST = ["", "Najmi Masjid", "Saifee Masjid", "Kalimi Masjid", "Vajihi Masjid"]
+# Admin Panel
+ADMIN_PAGE_SIZE = 25  # submissions listed per page in the admin sidebar
+REVIEW_STATUSES = ["Approved", "Needs Improvement", "Not Okay"]
+
+# Reviewer playback derivatives (playback.py)
+SKIP_SILENCE_DB = 35  # frames this far below the loud parts of a recording are silence
+SKIP_SILENCE_MIN = 0.6  # seconds; shorter pauses are left alone
+SKIP_SILENCE_KEEP = 0.25  # seconds of every longer pause that are kept
+PLAYBACK_SPEEDS = [1.25, 1.5]
+PLAYBACK_CACHE_MB = 256  # derivatives kept on disk under SNAPSHOT_DIR
+
+# Ramadan allotment of Approved reciters (allotment.py)
+RAMADAN_DAYS = 30
+RAMADAN_START = "2026-02-18"  # date of day 1, shown on the schedule
+PRAYERS = ["Fajr", "Zuhr", "Asr", "Maghrib", "Isha"]
+DUTY_COVERAGE = {"Azan": 1, "Takbirah": 1}  # reciters needed per prayer and masjid
+ALLOTMENT_MAX_DUTIES = 40  # per reciter over the month
+ALLOTMENT_MAX_PER_DAY = 1
+
+# Background refresh of GitHub data (seconds)
+REFRESH_MIN_INTERVAL = 15   # while data is changing
+REFRESH_MAX_INTERVAL = 300  # backed off ceiling while idle
+REFRESH_WEBHOOK_MAX_INTERVAL = 1800  # ceiling when push webhooks invalidate (see webhooks.py)
+
+# Last synced data, kept on disk for warm restarts (see snapshot_store.py), "" disables
+SNAPSHOT_DIR = ".snapshot"
 
 # CSS Styles - Mobile Optimized & Dark Mode Compatible
 CSS_STYLES = """
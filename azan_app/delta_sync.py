@@ -0,0 +1,284 @@
+# ============= INCREMENTAL (DELTA) SYNC =============
+# Remembers the last synced commit and, on every pull, asks GitHub which
+# files changed since then (one compare call). CSV changes are applied as
+# row patches to the in-memory tables; only files that cannot be patched
+# are downloaded again. Submissions and reviews are tracked per shard
+# (see shards.py) of the open season.
+
+import io
+import re
+import hashlib
+import logging
+import pandas as pd
+from config import SEASON
+from github_client import NOT_MODIFIED
+from metrics import span, timed
+from shards import parse_shard_path, list_shards, ensure_migrated
+
+logger = logging.getLogger(__name__)
+
+AUDIO_PREFIX = "audio/"
+
+# GitHub stops listing files in a comparison after this many
+COMPARE_FILE_LIMIT = 300
+
+HUNK_HEADER = re.compile(r"^@@ -(\d+)(?:,(\d+))? \+(\d+)(?:,(\d+))? @@")
+
+
+class PatchError(Exception):
+    """A patch does not apply cleanly, the file must be reloaded in full"""
+
+
+def git_blob_sha(data):
+    """Blob sha GitHub reports for a file with these bytes"""
+    return hashlib.sha1(b"blob %d\0" % len(data) + data).hexdigest()
+
+
+def parse_hunks(patch):
+    """Split a unified diff (GitHub 'patch' field) into (old_start, old_len, lines)"""
+    hunks = []
+    for line in patch.split("\n"):
+        match = HUNK_HEADER.match(line)
+        if match:
+            old_start = int(match.group(1))
+            old_len = int(match.group(2)) if match.group(2) is not None else 1
+            hunks.append((old_start, old_len, []))
+        elif line.startswith("\\"):
+            raise PatchError("missing newline at end of file")
+        elif hunks and line[:1] in (" ", "-", "+"):
+            hunks[-1][2].append(line)
+    return hunks
+
+
+class CsvTable:
+    """A CSV file held both as raw lines and as a DataFrame"""
+
+    def __init__(self, content, sha):
+        text = content.decode() if content else ""
+        self.lines = text.split("\n") if text else []
+        self.sha = sha
+        with span("csv.parse"):
+            self.df = pd.read_csv(io.StringIO(text)) if text.strip() else pd.DataFrame()
+        # With quoted newlines a physical line is not a row; patch the text instead
+        self.aligned = len(self.data_lines()) == len(self.df)
+
+    @classmethod
+    def restore(cls, df, content, sha):
+        """A table from a saved frame and its raw text, without parsing"""
+        table = cls.__new__(cls)
+        text = content.decode()
+        table.lines = text.split("\n") if text else []
+        table.sha = sha
+        table.df = df
+        table.aligned = len(table.data_lines()) == len(df)
+        return table
+
+    def data_lines(self):
+        lines = self.lines[1:]
+        if lines and lines[-1] == "":
+            lines = lines[:-1]
+        return lines
+
+    def content(self):
+        return "\n".join(self.lines).encode()
+
+    @timed("csv.apply_patch")
+    def apply_patch(self, patch, new_sha):
+        """Apply a unified diff, touching only the changed rows of the frame"""
+        new_lines, row_pieces, added = [], [], []
+        cursor = 0      # next old line (0-based) not yet copied
+        row_cursor = 0  # next df row not yet copied
+
+        for old_start, old_len, hunk in parse_hunks(patch):
+            # For pure insertions old_start is the line *before* the insert
+            position = old_start if old_len == 0 else old_start - 1
+            if position < cursor or position > len(self.lines):
+                raise PatchError("hunk out of range")
+            new_lines.extend(self.lines[cursor:position])
+            cursor = position
+
+            for line in hunk:
+                tag, text = line[0], line[1:]
+                if tag == "+":
+                    if cursor == 0:
+                        raise PatchError("header changed")
+                    row = cursor - 1
+                    row_pieces.append(self.df.iloc[row_cursor:row])
+                    row_pieces.append(len(added))
+                    row_cursor = row
+                    added.append(text)
+                    new_lines.append(text)
+                    continue
+
+                if cursor >= len(self.lines) or self.lines[cursor] != text:
+                    raise PatchError("context does not match")
+                if tag == "-":
+                    if cursor == 0:
+                        raise PatchError("header changed")
+                    row = cursor - 1
+                    row_pieces.append(self.df.iloc[row_cursor:row])
+                    row_cursor = row + 1
+                else:
+                    new_lines.append(text)
+                cursor += 1
+
+        new_lines.extend(self.lines[cursor:])
+        content = "\n".join(new_lines).encode()
+        if git_blob_sha(content) != new_sha:
+            raise PatchError("patched content does not match blob sha")
+
+        self.lines = new_lines
+        self.sha = new_sha
+        if not self.aligned or self.df.empty:
+            self.df = pd.read_csv(io.StringIO(content.decode()))
+            self.aligned = len(self.data_lines()) == len(self.df)
+            return
+
+        # Parse only the added rows, in one go, with the table's header
+        with span("csv.parse_delta"):
+            new_rows = pd.read_csv(io.StringIO("\n".join([self.lines[0]] + added)))
+        if len(new_rows) != len(added):
+            self.df = pd.read_csv(io.StringIO(content.decode()))
+            self.aligned = len(self.data_lines()) == len(self.df)
+            return
+        frames = [
+            new_rows.iloc[piece:piece + 1] if isinstance(piece, int) else piece
+            for piece in row_pieces
+        ]
+        frames.append(self.df.iloc[row_cursor:])
+        frames = [f for f in frames if len(f)]
+        self.df = (
+            pd.concat(frames, ignore_index=True) if frames
+            else self.df.iloc[0:0]
+        )
+
+
+class DeltaSync:
+    """Keeps the submission/review shards and the audio listing in step with a branch"""
+
+    def __init__(self, client):
+        self.client = client
+        self.commit_sha = None
+        self.tables = {}  # shard path -> CsvTable
+        self.audio = None
+        self.stats = {"full_loads": 0, "patched": 0, "noop_pulls": 0}
+        self._head_etag = None
+
+    def shards(self, dataset):
+        """{shard path: (DataFrame, blob sha)} of a CSV dataset, or None before the first pull"""
+        if self.commit_sha is None:
+            return None
+        return {
+            path: (table.df, table.sha)
+            for path, table in self.tables.items()
+            if parse_shard_path(path)[2] == dataset
+        }
+
+    def export(self):
+        """(commit, {path: (df, raw bytes, sha)}, audio listing) for snapshot_store.save"""
+        tables = {path: (t.df, t.content(), t.sha) for path, t in self.tables.items()}
+        return self.commit_sha, tables, self.audio
+
+    def restore(self, commit, tables, audio):
+        """Start from a saved snapshot; the next pull is a delta from its commit"""
+        self.commit_sha = commit
+        self.tables = {path: CsvTable.restore(df, content, sha) for path, (df, content, sha) in tables.items()}
+        self.audio = audio
+
+    @staticmethod
+    def _tracked(path):
+        """Dataset of a shard of the open season, None for any other path"""
+        parsed = parse_shard_path(path or "")
+        return parsed[2] if parsed and parsed[0] == SEASON else None
+
+    def _load_csv(self, path, ref):
+        content, sha, _ = self.client.get_file(path, ref=ref)
+        if content is None:
+            self.tables.pop(path, None)
+        else:
+            self.tables[path] = CsvTable(content, sha)
+        self.stats["full_loads"] += 1
+
+    def _full_load(self, head):
+        # One recursive listing gives both the shard paths and the audio files
+        tree = self.client.list_tree("", ref=head)
+        if tree is None:
+            paths = list_shards(self.client, ref=head)
+            self.audio = self.client.list_tree(AUDIO_PREFIX, ref=head)
+        else:
+            paths = [path for path in tree if self._tracked(path)]
+            self.audio = {path: item for path, item in tree.items() if path.startswith(AUDIO_PREFIX)}
+        self.tables = {}
+        for path in paths:
+            self._load_csv(path, head)
+        return {"submissions", "reviews", "audio"}
+
+    @timed("sync.pull")
+    def pull(self):
+        """Bring tables up to the branch head, returns the set of changed datasets"""
+        if self.commit_sha is None:
+            ensure_migrated(self.client)  # never load shards that legacy rows still belong in
+        head, self._head_etag = self.client.get_head(self._head_etag)
+        if head is NOT_MODIFIED or head == self.commit_sha:
+            self.stats["noop_pulls"] += 1
+            return set()
+
+        if self.commit_sha is None:
+            changed = self._full_load(head)
+        else:
+            comparison = self.client.compare(self.commit_sha, head)
+            files = comparison.get("files", []) if comparison else None
+            if (files is None or len(files) >= COMPARE_FILE_LIMIT
+                    or comparison.get("status") not in ("ahead", "identical")):
+                # Unrelated history, branch reset back ("behind") or force-pushed
+                # ("diverged": files are listed from the merge base), or too large a gap
+                changed = self._full_load(head)
+            else:
+                changed = self._apply(files, head)
+
+        self.commit_sha = head
+        return changed
+
+    def _apply(self, files, head):
+        changed = set()
+        # The refresher publishes self.audio to every session: edit a copy
+        audio = dict(self.audio) if self.audio is not None else None
+
+        for f in files:
+            path, status = f["filename"], f["status"]
+            dataset = self._tracked(path)
+            previous = self._tracked(f.get("previous_filename"))
+
+            if dataset or previous:
+                changed.update(d for d in (dataset, previous) if d)
+                if previous:
+                    self.tables.pop(f["previous_filename"], None)
+                if status == "removed" or not dataset:
+                    self.tables.pop(path, None)
+                    continue
+                table = self.tables.get(path)
+                try:
+                    if status != "modified" or table is None or "patch" not in f:
+                        raise PatchError(status)
+                    table.apply_patch(f["patch"], f["sha"])
+                    self.stats["patched"] += 1
+                except PatchError as e:
+                    logger.info("Reloading %s in full: %s", path, e)
+                    self._load_csv(path, head)
+
+            elif path.startswith(AUDIO_PREFIX) or f.get("previous_filename", "").startswith(AUDIO_PREFIX):
+                changed.add("audio")
+                if audio is None:
+                    continue
+                previous_item = audio.pop(f["previous_filename"], None) if f.get("previous_filename") else None
+                if status == "removed":
+                    audio.pop(path, None)
+                elif path.startswith(AUDIO_PREFIX):
+                    # Compare entries carry no size: a rename of the same blob keeps
+                    # the known one, anything else stays None until the next full
+                    # load (readers treat it as unknown, see wav_info.read_remote)
+                    size = previous_item["size"] if previous_item and previous_item["sha"] == f["sha"] else None
+                    audio[path] = {"sha": f["sha"], "size": size}
+
+        self.audio = audio
+        return changed
@@ -6,116 +6,282 @@ import requests
 import base64
 import io
 from datetime import datetime
+from functools import lru_cache
 from config import *
 from utils import *
+from search_index import show_submission_search
+from cache_control import cached_call, record_miss, show_cache_stats, invalidate
+from refresher import get_refresher, show_refresh_status
+from review_writer import commit_row_changes, review_change, write_stats
+from metrics import span, timed, show_metrics_panel
+from shards import shard_path, select, load_shards, ensure_migrated
+from audio_packs import is_index_path, read_indexes, read_member, read_member_header, read_recording
+from wav_info import describe, read_remote, parse_header, describe_format, format_duration
+from playback import MODES, derivative
 import time
 
 # ============= GITHUB FUNCTIONS =============
 
-@st.cache_data(ttl=300)  # Cache for 5 minutes
-def load_submissions_from_github():
-    """Load submissions CSV from GitHub"""
+@st.cache_data(ttl=300, max_entries=8)  # Cache for 5 minutes
+def _cached_submissions(version, masjid=None):
+    """Load one masjid's submissions shard (or every shard) from GitHub"""
+    record_miss("load_submissions_from_github", "submissions")
     try:
-        token = st.secrets["github"]["token"]
-        repo = st.secrets["github"]["repo"]
-        url = f"https://api.github.com/repos/{repo}/contents/submissions.csv"
-        headers = {"Authorization": f"token {token}"}
-        
-        response = requests.get(url, headers=headers)
-        
-        if response.status_code == 200:
-            csv_content = base64.b64decode(response.json()['content']).decode()
-            df = pd.read_csv(io.StringIO(csv_content))
-            return df, response.json()['sha']  # Return sha for updates
-        else:
+        df, sha = load_shards(github_repo(), "submissions", masjid)
+        if sha is None:
             return None, None
+        return df, sha  # Return sha for updates
     
     except Exception as e:
         st.error(f"❌ Error loading submissions: {e}")
         return None, None
 
 
-def load_reviews_from_github():
-    """Load reviews CSV from GitHub (or create if doesn't exist)"""
+def _latest(dataset):
+    """Newest background snapshot of a dataset, or None before the first refresh"""
+    snapshot = get_refresher().get(dataset)
+    return snapshot["data"] if snapshot is not None else None
+
+
+def _shallow(result):
+    # Snapshots are shared by every session; callers may add columns
+    df, sha = result
+    return (df.copy(deep=False) if df is not None else None), sha
+
+
+def load_submissions_from_github(masjid=None):
+    """Load one masjid's submissions, or all (background snapshot, else cached fetch)"""
+    latest = _latest("submissions")
+    if latest is not None:
+        return _shallow(select("submissions", latest, masjid))
+    return cached_call("load_submissions_from_github", "submissions", _cached_submissions, masjid)
+
+
+def fetch_reviews_from_github(masjid=None):
+    """Load reviews of one masjid (or all) from GitHub, uncached for writes"""
     try:
-        token = st.secrets["github"]["token"]
-        repo = st.secrets["github"]["repo"]
-        url = f"https://api.github.com/repos/{repo}/contents/reviews.csv"
-        headers = {"Authorization": f"token {token}"}
-        
-        response = requests.get(url, headers=headers)
-        
-        if response.status_code == 200:
-            csv_content = base64.b64decode(response.json()['content']).decode()
-            df = pd.read_csv(io.StringIO(csv_content))
-            return df, response.json()['sha']
-        else:
-            # File doesn't exist - return empty dataframe
-            return pd.DataFrame(), None
+        # Missing shards come back as an empty dataframe with no sha
+        return load_shards(github_repo(), "reviews", masjid)
     
     except Exception as e:
         st.error(f"❌ Error loading reviews: {e}")
         return None, None
 
 
-def save_review_to_github(its_number, status, comments):
-    """Save admin review to GitHub"""
+@st.cache_data(ttl=300, max_entries=8)
+def _cached_reviews(version, masjid=None):
+    record_miss("load_reviews_from_github", "reviews")
+    return fetch_reviews_from_github(masjid)
+
+
+def load_reviews_from_github(masjid=None):
+    """Load reviews of one masjid, or all (background snapshot, else cached fetch)"""
+    latest = _latest("reviews")
+    if latest is not None:
+        return _shallow(select("reviews", latest, masjid))
+    return cached_call("load_reviews_from_github", "reviews", _cached_reviews, masjid)
+
+
+def migrate_legacy_data():
+    """Move a legacy submissions.csv / reviews.csv into the shards once, False if that failed"""
     try:
-        token = st.secrets["github"]["token"]
-        repo = st.secrets["github"]["repo"]
-        url = f"https://api.github.com/repos/{repo}/contents/reviews.csv"
-        headers = {"Authorization": f"token {token}"}
-        
-        # Load existing reviews
-        reviews_df, sha = load_reviews_from_github()
-        
-        if reviews_df is None:
-            reviews_df = pd.DataFrame()
-        
-        # Check if ITS already has a review
-        if not reviews_df.empty and 'its' in reviews_df.columns:
-            mask = reviews_df['its'].astype(str) == str(its_number)
-            if mask.any():
-                # Update existing review
-                reviews_df.loc[mask, 'status'] = status
-                reviews_df.loc[mask, 'comments'] = comments
-                reviews_df.loc[mask, 'reviewed_at'] = datetime.now().isoformat()
-            else:
-                # Add new review
-                new_review = pd.DataFrame([{
-                    'its': its_number,
-                    'status': status,
-                    'comments': comments,
-                    'reviewed_at': datetime.now().isoformat()
-                }])
-                reviews_df = pd.concat([reviews_df, new_review], ignore_index=True)
-        else:
-            # Create new reviews DataFrame
-            reviews_df = pd.DataFrame([{
-                'its': its_number,
-                'status': status,
-                'comments': comments,
-                'reviewed_at': datetime.now().isoformat()
-            }])
-        
-        # Convert to CSV
-        csv_string = reviews_df.to_csv(index=False)
-        encoded = base64.b64encode(csv_string.encode()).decode()
-        
-        # Prepare GitHub API request
-        data = {
-            "message": f"Update review for {its_number} - {status}",
-            "content": encoded,
-            "branch": "main"
-        }
-        
-        if sha:
-            data["sha"] = sha
-        
-        # Push to GitHub
-        response = requests.put(url, json=data, headers=headers)
-        
-        return response.status_code in [201, 200]
+        commit = ensure_migrated(github_repo())
+
+    except Exception as e:
+        st.error(f"❌ Legacy submissions.csv / reviews.csv could not be moved into shards, reviewing is paused: {e}")
+        return False
+    if commit:
+        invalidate("submissions", "reviews")
+        st.success(f"✅ Moved the legacy submissions.csv / reviews.csv into masjid shards ({commit[:7]})")
+    return True
+
+
+@st.cache_data(ttl=300, max_entries=4)
+def _cached_audio_tree(version):
+    """List every blob under audio/ with a single tree call"""
+    record_miss("load_audio_tree_from_github", "audio")
+    try:
+        return github_repo().list_tree("audio/")
+
+    except Exception as e:
+        st.error(f"❌ Error listing audio files: {e}")
+        return None
+
+
+def load_audio_tree_from_github():
+    """Audio blob listing {path: {sha, size}}, None if unavailable"""
+    latest = _latest("audio")
+    if latest is not None:
+        return latest
+    return cached_call("load_audio_tree_from_github", "audio", _cached_audio_tree)
+
+
+@st.cache_data(max_entries=4)
+def _cached_pack_index(indexes):
+    """Merge the pack indexes; keyed by their blob shas, so never stale"""
+    record_miss("load_pack_index", "audio")
+    return read_indexes(github_repo(), [path for path, _ in indexes])
+
+
+def load_pack_index():
+    """{recording path: pack entry} of every packed recording"""
+    audio_tree = load_audio_tree_from_github() or {}
+    indexes = tuple(sorted((path, item["sha"]) for path, item in audio_tree.items() if is_index_path(path)))
+    if not indexes:
+        return {}
+    try:
+        return _cached_pack_index(indexes)
+
+    except Exception as e:
+        st.error(f"❌ Error loading audio pack index: {e}")
+        return {}
+
+
+@st.cache_data(max_entries=32)
+def _packed_audio(entry):
+    with span("github.get_packed_audio"):
+        return read_member(github_repo(), entry)
+
+
+def get_audio_source(file_path):
+    """What st.audio plays for a recording: URL of a loose file, bytes of a packed one, None if missing"""
+    entry = load_pack_index().get(file_path)
+    if entry is None:
+        return get_audio_file_url(file_path)
+    try:
+        return _packed_audio(entry)
+
+    except Exception as e:
+        st.error(f"❌ Error reading packed audio: {e}")
+        return None
+
+
+def get_audio_derivative(file_path, skip, speed):
+    """WAV bytes of a playback derivative of a recording (see playback.py), None if missing"""
+    audio_tree = load_audio_tree_from_github() or {}
+    packed = load_pack_index()
+    item = packed.get(file_path) or audio_tree.get(file_path)
+    if item is None:
+        return None
+    try:
+        with span("playback.derivative"):
+            return derivative(item["sha"], lambda: read_recording(github_repo(), file_path, audio_tree, packed),
+                              skip, speed)
+
+    except Exception as e:
+        st.error(f"❌ Error preparing playback: {e}")
+        return None
+
+
+def show_playback(file_path, mode, info):
+    """Alternate player for the reviewer's playback mode, nothing for the original"""
+    if MODES.get(mode) is None:
+        return
+    with st.spinner(f"Preparing {mode.lower()}..."):
+        data = get_audio_derivative(file_path, *MODES[mode])
+    if data:
+        st.audio(data, format="audio/wav")
+        shortened = format_duration(parse_header(memoryview(data)).duration)
+        st.caption(f"⏩ {mode}: {format_duration(info.duration) + ' → ' if info else ''}{shortened}")
+
+
+def load_recording_info(paths):
+    """{path: WavInfo} of recordings, from ranged header reads cached by blob sha"""
+    audio_tree = load_audio_tree_from_github() or {}
+    packed = load_pack_index()
+    client = github_repo()
+    recordings = {}
+    for path in paths:
+        if path in packed:
+            recordings[path] = packed[path]["sha"]
+        elif path in audio_tree:
+            recordings[path] = audio_tree[path]["sha"]
+
+    # Loose files are read at the head commit, not the branch: the raw CDN caches branch URLs
+    head = lru_cache(maxsize=1)(lambda: client.get_head()[0])
+
+    def read_info(path):
+        if path in packed:
+            entry = packed[path]
+            return read_remote(lambda start, length: read_member_header(client, entry, length), entry["size"])
+        return read_remote(lambda start, length: client.get_range(path, start, length, head()),
+                           audio_tree[path]["size"])
+
+    with span("github.recording_info"):
+        return describe(recordings, read_info)
+
+
+def show_submission_list(display_df, reviews_df):
+    """Submissions of the current filter with recording durations"""
+    with st.expander("🗂️ Submission List"):
+        columns = [c for c in ("azan_file", "takbirah_file") if c in display_df.columns]
+        paths = {p for c in columns for p in display_df[c].dropna() if p}
+        info = load_recording_info(paths)
+        status = {}
+        if reviews_df is not None and not reviews_df.empty:
+            status = dict(zip(reviews_df["its"].astype(str), reviews_df["status"]))
+        table = pd.DataFrame({
+            "ITS": display_df["its"].astype(str),
+            "Name": display_df["name"],
+            "Masjid": display_df["masjid"],
+            "Azan": display_df.get("azan_file", pd.Series(dtype=str)).map(
+                lambda p: format_duration(info[p].duration) if p in info else ""),
+            "Takbirah": display_df.get("takbirah_file", pd.Series(dtype=str)).map(
+                lambda p: format_duration(info[p].duration) if p in info else ""),
+            "Status": display_df["its"].astype(str).map(status).fillna("Pending"),
+        })
+        st.dataframe(table, hide_index=True, use_container_width=True)
+
+
+@st.cache_data(max_entries=4, show_spinner="Scoring pending recordings...")
+def _cached_triage(submissions_key, reviews_key, candidates, _submissions, _reviews):
+    """Candidate submissions ranked by a triage model trained on every shard, keyed by the data versions"""
+    from triage import recording_table, extract_features, rank_pending
+
+    record_miss("load_triage", "reviews")
+    tree = load_audio_tree_from_github() or {}
+    packed = load_pack_index()
+    recordings = {path: item["sha"] for path, item in tree.items()}
+    recordings.update({path: entry["sha"] for path, entry in packed.items()})
+    table = recording_table(_submissions, recordings)
+    # Features of the labelled recordings (training) and the candidates (scoring) only
+    reviewed = set(_reviews["its"].astype(str)) if "its" in _reviews.columns else set()
+    table = table[table["its"].isin(reviewed) | table["its"].isin(candidates)]
+    features = extract_features(github_repo(), dict(zip(table["path"], table["sha"])), tree, packed)
+    return rank_pending(_submissions, _reviews, features, table)
+
+
+def load_triage(display_df):
+    """its, quality, predicted, confidence of the pending submissions in display_df (best first)"""
+    try:
+        submissions_df, submissions_key = load_submissions_from_github()
+        reviews_df, reviews_key = load_reviews_from_github()
+        if submissions_df is None or reviews_df is None:
+            return None
+        candidates = tuple(sorted(display_df["its"].astype(str).unique()))
+        return _cached_triage(submissions_key, reviews_key, candidates, submissions_df, reviews_df)
+
+    except Exception as e:
+        st.error(f"❌ Error scoring pending submissions: {e}")
+        return None
+
+
+def save_review_to_github(its_number, status, comments, masjid):
+    """Save admin review to its masjid's shard (merged and retried if another admin saved first)"""
+    path = shard_path("reviews", masjid)
+    try:
+        result = commit_row_changes(
+            github_repo(),
+            path,
+            review_change(its_number, status, comments),
+            f"Update review for {its_number} - {status}",
+        )
+        if result is None:
+            return False
+
+        # Serve our own write immediately, only the reviews cache is stale
+        get_refresher().publish("reviews", result, path)
+        return True
     
     except Exception as e:
         st.error(f"❌ Failed to save review: {e}")
@@ -125,12 +291,21 @@ def save_review_to_github(its_number, status, comments):
 def get_audio_file_url(file_path):
     """Get GitHub URL for audio file"""
     try:
+        repo = st.secrets["github"]["repo"]
+        audio_tree = load_audio_tree_from_github()
+        if audio_tree is not None:
+            if file_path in audio_tree:
+                return f"https://raw.githubusercontent.com/{repo}/main/{file_path}"
+            return None
+
+        # Listing unavailable, fall back to a per-file check
         token = st.secrets["github"]["token"]
         repo = st.secrets["github"]["repo"]
         url = f"https://api.github.com/repos/{repo}/contents/{file_path}"
         headers = {"Authorization": f"token {token}"}
         
-        response = requests.get(url, headers=headers)
+        with span("github.get_audio_file"):
+            response = requests.get(url, headers=headers)
         
         if response.status_code == 200:
             # Return raw content URL for audio playback
@@ -143,8 +318,116 @@ def get_audio_file_url(file_path):
         return None
 
 
+# ============= DASHBOARD AGGREGATION =============
+
+def count_assessed(submissions_df, reviews_df):
+    """Number of distinct submitted ITS that have a review"""
+    if reviews_df is None or reviews_df.empty or 'its' not in reviews_df.columns:
+        return 0
+    reviewed = reviews_df["its"].astype(str)
+    return reviewed[reviewed.isin(submissions_df["its"].astype(str))].nunique()
+
+
+def masjid_assessment_stats(df, reviews_df, masjids):
+    """[{Masjid, Assessed, Pending}] for each masjid"""
+    masjid_stats = []
+    for m in masjids:
+        masjid_df = df[df["masjid"] == m]
+        assessed_m = count_assessed(masjid_df, reviews_df)
+        masjid_stats.append({
+            "Masjid": m,
+            "Assessed": assessed_m,
+            "Pending": len(masjid_df) - assessed_m
+        })
+    return masjid_stats
+
+
 # ============= ADMIN PANEL FUNCTIONS =============
 
+def show_bulk_import():
+    """Import offline registrations (CSV/XLSX + recordings) in one commit"""
+    from bulk_import import read_sheet, uploaded_audio, prepare_import, commit_import
+
+    with st.expander("📥 Bulk Import (offline registrations)"):
+        st.caption(
+            "Columns: name, its, whatsapp, masjid, interests, remarks. "
+            "Recordings (optional) are matched by azan_file / takbirah_file or named azan_<ITS>.wav / takbirah_<ITS>.wav"
+        )
+        sheet = st.file_uploader("Spreadsheet", type=["csv", "xlsx"], key="bulk_sheet")
+        recordings = st.file_uploader("Recordings", type=["wav"], accept_multiple_files=True, key="bulk_audio")
+        if sheet is None:
+            return
+
+        try:
+            # Every masjid's shard: an ITS may only register once
+            df, _ = load_submissions_from_github()
+            existing_its = set(df["its"].astype(str)) if df is not None and "its" in df.columns else set()
+            audio = uploaded_audio(recordings) if recordings else None
+            plan = prepare_import(read_sheet(sheet, sheet.name), existing_its, audio)
+        except Exception as e:
+            st.error(f"❌ Could not read {sheet.name}: {e}")
+            return
+
+        col1, col2 = st.columns(2)
+        col1.metric("Valid rows", plan.valid_count)
+        col2.metric("Rows with errors", plan.error_count)
+        if plan.error_count:
+            st.dataframe(plan.report, hide_index=True, use_container_width=True)
+
+        if plan.valid_count and st.button(f"📥 Import {plan.valid_count} submissions", key="btn_bulk_import"):
+            try:
+                with st.spinner("Committing to GitHub..."):
+                    rows, commit = commit_import(github_repo(), plan)
+                if commit:
+                    invalidate("submissions", "audio")
+                    st.success(f"✅ Imported {len(rows)} submissions ({commit[:7]})")
+                else:
+                    st.warning("Nothing imported: every ITS is already registered")
+            except Exception as e:
+                st.error(f"❌ Bulk import failed: {e}")
+
+
+def show_allotment():
+    """Ramadan schedule of the Approved reciters, re-solved when someone drops out"""
+    from allotment import allot
+
+    with st.expander("📅 Ramadan Allotment"):
+        if st.button("Generate schedule", key="btn_allotment"):
+            submissions, _ = load_submissions_from_github()
+            reviews, _ = load_reviews_from_github()
+            if submissions is None or reviews is None:
+                st.error("❌ Could not load submissions and reviews")
+                return
+            st.session_state.allotment = allot(submissions, reviews)
+
+        allotment = st.session_state.get("allotment")
+        if allotment is None:
+            return
+        if not allotment.reciters:
+            st.info("No Approved reciters yet")
+            return
+
+        reciters = {f"{r.name} ({its})": its for its, r in allotment.reciters.items() if its not in allotment.away}
+        col1, col2 = st.columns([3, 1])
+        away = col1.selectbox("Reciter unavailable", [""] + sorted(reciters), key="allotment_away")
+        from_day = col2.number_input("From day", 1, allotment.days, 1, key="allotment_from_day")
+        if away and st.button("Re-allot their duties", key="btn_allotment_away"):
+            filled = allotment.mark_unavailable(reciters[away], int(from_day))
+            st.success(f"✅ {len(filled)} duties reassigned")
+
+        coverage = allotment.coverage()
+        col1, col2 = st.columns(2)
+        col1.metric("Approved reciters", len(allotment.reciters))
+        col2.metric("Slots filled", f"{coverage['filled'].sum()} / {coverage['slots'].sum()}")
+        st.dataframe(coverage, hide_index=True, use_container_width=True)
+        st.dataframe(allotment.duties(), hide_index=True, use_container_width=True)
+        schedule = allotment.schedule()
+        st.dataframe(schedule[schedule["its"] != ""], hide_index=True, use_container_width=True)
+        st.download_button("⬇️ Download schedule (CSV)", schedule.to_csv(index=False),
+                           f"allotment_{SEASON}.csv", "text/csv", key="btn_allotment_csv")
+
+
+@timed("render.show_admin_panel_github")
 def show_admin_panel_github():
     """Display admin panel with GitHub data"""
     if not st.session_state.admin_ok:
@@ -152,10 +435,28 @@ def show_admin_panel_github():
     
     st.sidebar.divider()
     st.sidebar.subheader("📊 Admin Panel")
+    show_refresh_status()
+    show_cache_stats()
+    show_metrics_panel()
+    with st.sidebar.expander("✍️ Review Write Stats"):
+        st.dataframe([write_stats()], hide_index=True, use_container_width=True)
+
+    # Filter by masjid: a single masjid only loads its own shard
+    masjid = st.sidebar.selectbox(
+        "Filter by Masjid",
+        ["All"] + MASJID_LIST[1:],
+        key="filter_masjid"
+    )
+    shard = None if masjid == "All" else masjid
+
+    if not migrate_legacy_data():
+        return
 
     # Load data from GitHub
-    df, _ = load_submissions_from_github()
-    reviews_df, _ = load_reviews_from_github()
+    df, submissions_sha = load_submissions_from_github(shard)
+    reviews_df, reviews_sha = load_reviews_from_github(shard)
+    show_bulk_import()
+    show_allotment()
     
     if df is None or len(df) == 0:
         st.sidebar.info("No submissions yet")
@@ -165,14 +466,7 @@ def show_admin_panel_github():
         st.sidebar.write(f"Total Submissions: **{len(df)}**")
         st.sidebar.subheader("🔍 Filter & Review")
 
-        # Filter by masjid
-        masjid = st.sidebar.selectbox(
-            "Filter by Masjid",
-            ["All"] + sorted(df["masjid"].dropna().unique().tolist()),
-            key="filter_masjid"
-        )
-        
-        display_df = df if masjid == "All" else df[df["masjid"] == masjid]
+        display_df = df
         
         # Show assessment statistics
         if masjid == "All":
@@ -180,13 +474,7 @@ def show_admin_panel_github():
         else:
             st.subheader(f"📊 Assessment Summary - {masjid}")
         
-        assessed = 0
-        if reviews_df is not None and not reviews_df.empty and 'its' in reviews_df.columns:
-            reviews_df["its"] = reviews_df["its"].astype(str)
-            display_df_its = display_df["its"].astype(str)
-            reviewed_unique = reviews_df[reviews_df["its"].isin(display_df_its)]["its"].unique()
-            assessed = len(reviewed_unique)
-        
+        assessed = count_assessed(display_df, reviews_df)
         pending = len(display_df) - assessed
         
         col1, col2, col3 = st.columns(3)
@@ -201,21 +489,7 @@ def show_admin_panel_github():
         if masjid == "All" and len(display_df) > 1:
             st.write("**Assessment Status by Masjid**")
             
-            masjid_stats = []
-            for m in display_df["masjid"].dropna().unique().tolist():
-                masjid_df = df[df["masjid"] == m]
-                if reviews_df is not None and not reviews_df.empty:
-                    reviewed_its = reviews_df[reviews_df["its"].isin(masjid_df["its"].astype(str))]["its"].unique()
-                    assessed_m = len(reviewed_its)
-                else:
-                    assessed_m = 0
-                pending_m = len(masjid_df) - assessed_m
-                
-                masjid_stats.append({
-                    "Masjid": m,
-                    "Assessed": assessed_m,
-                    "Pending": pending_m
-                })
+            masjid_stats = masjid_assessment_stats(df, reviews_df, display_df["masjid"].dropna().unique().tolist())
             
             stats_df = pd.DataFrame(masjid_stats)
             stats_df = stats_df.set_index("Masjid")
@@ -239,12 +513,8 @@ def show_admin_panel_github():
             # Show chart for selected masjid only
             st.write(f"**Assessment Status - {masjid}**")
             
-            masjid_df = df[df["masjid"] == masjid]
-            if reviews_df is not None and not reviews_df.empty:
-                reviewed_its = reviews_df[reviews_df["its"].isin(masjid_df["its"].astype(str))]["its"].unique()
-                assessed_m = len(reviewed_its)
-            else:
-                assessed_m = 0
+            masjid_df = df
+            assessed_m = count_assessed(masjid_df, reviews_df)
             pending_m = len(masjid_df) - assessed_m
             
             # Create single-row dataframe for chart
@@ -266,14 +536,24 @@ def show_admin_panel_github():
             with col3:
                 st.metric("Pending", pending_m)
         
+        show_submission_list(display_df, reviews_df)
         st.divider()
         
-        # Select submission to review
-        selected_its = st.sidebar.selectbox(
-            "Select Submission (ITS)",
-            display_df["its"].astype(str).tolist(),
-            key="select_its"
+        # Select submission to review, pending ones optionally pre-ranked by the triage model
+        order = st.sidebar.selectbox(
+            "Order",
+            ["ITS", "Pending: predicted best first", "Pending: least confident first"],
+            key="triage_order"
         )
+        triage = None
+        rank = None
+        if order != "ITS":
+            triage = load_triage(display_df)
+        if triage is not None and not triage.empty:
+            if order == "Pending: least confident first":
+                triage = triage.sort_values("confidence", kind="stable", ignore_index=True)
+            rank = {its: position for position, its in enumerate(triage["its"])}
+        selected_its = show_submission_search(display_df, (submissions_sha, masjid), rank)
         
         if not selected_its:
             st.info("Select an ITS to review")
@@ -295,19 +575,34 @@ def show_admin_panel_github():
             st.write("**Interests:**", row["interests"])
             st.write("**Remarks:**", row["remarks"])
         
+        if rank and selected_its in rank:
+            prediction = triage.iloc[rank[selected_its]]
+            st.caption(
+                f"🤖 Triage: predicted **{prediction['predicted']}** "
+                f"({prediction['confidence']:.0%} confidence, quality score {prediction['quality']:.2f})"
+            )
+        
         st.divider()
         
         # Display audio files
         st.subheader("🎙️ Recordings")
+        playback_mode = st.radio(
+            "Playback", list(MODES), horizontal=True, key="playback_mode",
+            help="Adds a second player with long pauses shortened, optionally faster at the same pitch",
+        )
         
         col1, col2 = st.columns(2)
         
         with col1:
             if pd.notna(row.get("azan_file")) and row["azan_file"]:
                 st.write("**Azan Recording:**")
-                audio_url = get_audio_file_url(row["azan_file"])
+                audio_url = get_audio_source(row["azan_file"])
                 if audio_url:
                     st.audio(audio_url, format="audio/wav")
+                    info = load_recording_info([row["azan_file"]]).get(row["azan_file"])
+                    if info:
+                        st.caption(describe_format(info))
+                    show_playback(row["azan_file"], playback_mode, info)
                 else:
                     st.caption("❌ Could not load audio")
             else:
@@ -316,9 +611,13 @@ def show_admin_panel_github():
         with col2:
             if pd.notna(row.get("takbirah_file")) and row["takbirah_file"]:
                 st.write("**Takbirah Recording:**")
-                audio_url = get_audio_file_url(row["takbirah_file"])
+                audio_url = get_audio_source(row["takbirah_file"])
                 if audio_url:
                     st.audio(audio_url, format="audio/wav")
+                    info = load_recording_info([row["takbirah_file"]]).get(row["takbirah_file"])
+                    if info:
+                        st.caption(describe_format(info))
+                    show_playback(row["takbirah_file"], playback_mode, info)
                 else:
                     st.caption("❌ Could not load audio")
             else:
@@ -348,7 +647,7 @@ def show_admin_panel_github():
         with col1:
             status = st.selectbox(
                 "Assessment Status",
-                ["Approved", "Needs Improvement", "Not Okay"],
+                REVIEW_STATUSES,
                 key="review_status"
             )
         
@@ -362,9 +661,8 @@ def show_admin_panel_github():
         
         # Save review button
         if st.button("💾 Save Review", use_container_width=True, type="primary"):
-            if save_review_to_github(selected_its, status, comments):
+            if save_review_to_github(selected_its, status, comments, row["masjid"]):
                 st.success("✅ Review saved to GitHub!")
-                st.cache_data.clear()  # Clear cache to reload data
                 time.sleep(1)
                 st.rerun()
             else:
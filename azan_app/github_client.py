@@ -0,0 +1,231 @@
+# ============= GITHUB CONTENTS API CLIENT =============
+# Plain requests helpers with no Streamlit calls, so they are safe to use
+# from background threads and command line tools.
+
+import base64
+import io
+import requests
+import pandas as pd
+from metrics import span
+
+API_URL = "https://api.github.com"
+
+# Returned by get_file when the ETag still matches
+NOT_MODIFIED = object()
+
+
+class GitHubRepo:
+    """Thin wrapper around the contents and git data endpoints of one repo"""
+
+    def __init__(self, token, repo, branch="main", api_url=API_URL, timeout=15):
+        self.token = token
+        self.repo = repo
+        self.branch = branch
+        self.api_url = api_url.rstrip("/")
+        self.timeout = timeout
+        self.session = requests.Session()
+        self.session.headers["Authorization"] = f"token {token}"
+
+    @classmethod
+    def from_secrets(cls, secrets):
+        """Build from the [github] section of st.secrets (or any mapping)"""
+        github = secrets["github"]
+        return cls(
+            github["token"],
+            github["repo"],
+            branch=github.get("branch", "main"),
+            api_url=github.get("api_url", API_URL),
+        )
+
+    def _request(self, name, method, url, **kwargs):
+        """Send one API request, timed as the span github.<name>"""
+        with span(f"github.{name}"):
+            return self.session.request(method, url, timeout=self.timeout, **kwargs)
+
+    def contents_url(self, path):
+        return f"{self.api_url}/repos/{self.repo}/contents/{path}"
+
+    def raw_url(self, path, ref=None):
+        """
+        raw.githubusercontent.com URL of a file. Pass a commit sha as ref: the
+        raw CDN caches branch URLs for minutes, commit URLs never go stale.
+        """
+        return f"https://raw.githubusercontent.com/{self.repo}/{ref or self.branch}/{path}"
+
+    def get_range(self, path, start, length, ref=None):
+        """length bytes of a file at ref from offset start, with one ranged raw download"""
+        headers = {"Range": f"bytes={start}-{start + length - 1}"}
+        if self.api_url == API_URL:
+            url, params = self.raw_url(path, ref), None
+        else:
+            # GitHub Enterprise (and tools/fake_github.py): the contents API serves raw bytes
+            url, params = self.contents_url(path), {"ref": ref or self.branch}
+            headers["Accept"] = "application/vnd.github.raw"
+        response = self._request("get_range", "GET", url, params=params, headers=headers)
+        response.raise_for_status()
+        if response.status_code == 206:
+            return response.content
+        return response.content[start:start + length]  # server ignored the Range header
+
+    def get_file(self, path, etag=None, ref=None):
+        """
+        Return (content bytes, blob sha, etag).
+        Content is None when the file does not exist, NOT_MODIFIED when etag matched.
+        """
+        headers = {"If-None-Match": etag} if etag else {}
+        response = self._request(
+            "get_file", "GET",
+            self.contents_url(path),
+            params={"ref": ref or self.branch},
+            headers=headers,
+        )
+        if response.status_code == 304:
+            return NOT_MODIFIED, None, etag
+        if response.status_code == 404:
+            return None, None, None
+        response.raise_for_status()
+
+        meta = response.json()
+        if meta.get("encoding") == "base64" and meta.get("content"):
+            content = base64.b64decode(meta["content"])
+        elif meta.get("size", 0) == 0:
+            content = b""
+        else:
+            # Files over 1 MB come back without inline content
+            content = self.get_blob(meta["sha"])
+        return content, meta["sha"], response.headers.get("ETag")
+
+    def get_blob(self, sha):
+        """Raw blob bytes by sha (works for files too large for the contents API)"""
+        response = self._request(
+            "get_blob", "GET",
+            f"{self.api_url}/repos/{self.repo}/git/blobs/{sha}",
+            headers={"Accept": "application/vnd.github.raw"},
+        )
+        response.raise_for_status()
+        return response.content
+
+    def get_csv(self, path, etag=None):
+        """Return (DataFrame, sha, etag); an empty frame when the file is missing"""
+        content, sha, etag = self.get_file(path, etag)
+        if content is NOT_MODIFIED:
+            return NOT_MODIFIED, sha, etag
+        if not content:
+            return pd.DataFrame(), sha, etag
+        with span("csv.parse"):
+            return pd.read_csv(io.StringIO(content.decode())), sha, etag
+
+    def put_file(self, path, content, message, sha=None):
+        """Create or update a file, returns the requests response"""
+        data = {
+            "message": message,
+            "content": base64.b64encode(content).decode(),
+            "branch": self.branch,
+        }
+        if sha:
+            data["sha"] = sha
+        return self._request("put_file", "PUT", self.contents_url(path), json=data)
+
+    def get_head(self, etag=None):
+        """Return (head commit sha of the branch, etag); sha is NOT_MODIFIED when etag matched"""
+        headers = {"Accept": "application/vnd.github.sha"}
+        if etag:
+            headers["If-None-Match"] = etag
+        response = self._request(
+            "get_head", "GET",
+            f"{self.api_url}/repos/{self.repo}/commits/{self.branch}",
+            headers=headers,
+        )
+        if response.status_code == 304:
+            return NOT_MODIFIED, etag
+        response.raise_for_status()
+        return response.text.strip(), response.headers.get("ETag")
+
+    def get_commit(self, sha):
+        """Git commit object (tree sha, parents)"""
+        response = self._request(
+            "get_commit", "GET",
+            f"{self.api_url}/repos/{self.repo}/git/commits/{sha}",
+        )
+        response.raise_for_status()
+        return response.json()
+
+    def create_blob(self, content):
+        """Upload bytes as a git blob, returns its sha"""
+        response = self._request(
+            "create_blob", "POST",
+            f"{self.api_url}/repos/{self.repo}/git/blobs",
+            json={"content": base64.b64encode(content).decode(), "encoding": "base64"},
+        )
+        response.raise_for_status()
+        return response.json()["sha"]
+
+    def commit_tree(self, files, message, parent):
+        """
+        Commit {path: blob sha} on top of parent as one commit and move the branch to it.
+        Returns the new commit sha, or None when the branch no longer points at parent.
+        """
+        base_tree = self.get_commit(parent)["tree"]["sha"]
+        response = self._request(
+            "create_tree", "POST",
+            f"{self.api_url}/repos/{self.repo}/git/trees",
+            json={
+                "base_tree": base_tree,
+                "tree": [
+                    {"path": path, "mode": "100644", "type": "blob", "sha": sha}
+                    for path, sha in files.items()
+                ],
+            },
+        )
+        response.raise_for_status()
+        tree = response.json()["sha"]
+
+        response = self._request(
+            "create_commit", "POST",
+            f"{self.api_url}/repos/{self.repo}/git/commits",
+            json={"message": message, "tree": tree, "parents": [parent]},
+        )
+        response.raise_for_status()
+        commit = response.json()["sha"]
+
+        # Not forced: GitHub refuses (422) unless this is a fast-forward of parent
+        response = self._request(
+            "update_ref", "PATCH",
+            f"{self.api_url}/repos/{self.repo}/git/refs/heads/{self.branch}",
+            json={"sha": commit, "force": False},
+        )
+        if response.status_code == 422:
+            return None
+        response.raise_for_status()
+        return commit
+
+    def compare(self, base, head):
+        """Commits and changed files (with patches) between two commits, None if unrelated"""
+        response = self._request(
+            "compare", "GET",
+            f"{self.api_url}/repos/{self.repo}/compare/{base}...{head}",
+        )
+        if response.status_code in (404, 422):
+            return None
+        response.raise_for_status()
+        return response.json()
+
+    def list_tree(self, prefix="", ref=None):
+        """
+        Return {path: {"sha", "size"}} for every blob under prefix with one call,
+        or None when GitHub truncated the listing.
+        """
+        response = self._request(
+            "list_tree", "GET",
+            f"{self.api_url}/repos/{self.repo}/git/trees/{ref or self.branch}",
+            params={"recursive": "1"},
+        )
+        response.raise_for_status()
+        tree = response.json()
+        if tree.get("truncated"):
+            return None
+        return {
+            item["path"]: {"sha": item["sha"], "size": item.get("size", 0)}
+            for item in tree["tree"]
+            if item["type"] == "blob" and item["path"].startswith(prefix)
+        }
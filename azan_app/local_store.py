@@ -0,0 +1,204 @@
+# ============= LOCAL CSV WRITER =============
+# Writes for self-hosted / offline deployments that keep their CSVs on the
+# local disk. Every write holds an fcntl lock on "<file>.lock" (a separate
+# file, so the lock survives the rename below), which serialises writers
+# across threads and Streamlit processes.
+#
+# * rewrite_csv(): read-modify-write into a temporary file, fsync, then
+#   os.replace, so readers only ever see the old or the new file.
+# * append_rows(): group commit. Concurrent appends to a file are queued;
+#   whichever caller finds the queue idle writes every queued row with one
+#   write() and one fsync() and then wakes the others.
+#
+# No pandas import at module level: appends are on the applicant path.
+
+import csv
+import io
+import os
+import tempfile
+import threading
+from contextlib import contextmanager
+
+try:
+    import fcntl
+except ImportError:  # Windows: only this process' threads are serialised
+    fcntl = None
+
+_thread_locks = {}
+_thread_locks_guard = threading.Lock()
+
+
+def _thread_lock(path):
+    with _thread_locks_guard:
+        return _thread_locks.setdefault(os.path.abspath(path), threading.Lock())
+
+
+@contextmanager
+def locked(path):
+    """Exclusive lock for writing path, across threads and processes"""
+    with _thread_lock(path):
+        if fcntl is None:
+            yield
+            return
+        with open(f"{path}.lock", "a") as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+
+def _fsync_dir(path):
+    if not hasattr(os, "O_DIRECTORY"):
+        return
+    fd = os.open(os.path.dirname(os.path.abspath(path)), os.O_RDONLY | os.O_DIRECTORY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+def replace_file(path, content):
+    """Atomically replace path with content (bytes); hold locked(path) around it"""
+    fd, tmp = tempfile.mkstemp(prefix=f".{os.path.basename(path)}.", dir=os.path.dirname(os.path.abspath(path)))
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(content)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, path)
+    except BaseException:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+        raise
+    _fsync_dir(path)
+
+
+def rewrite_csv(path, update):
+    """
+    Locked read-modify-write: update(df) gets the current DataFrame (empty when
+    the file does not exist yet) and returns the one to store.
+    """
+    import pandas as pd
+
+    with locked(path):
+        df = pd.read_csv(path) if os.path.exists(path) and os.path.getsize(path) else pd.DataFrame()
+        df = update(df)
+        replace_file(path, df.to_csv(index=False).encode())
+    return df
+
+
+# ============= GROUP COMMIT =============
+
+class _Pending:
+    def __init__(self, rows):
+        self.rows = rows
+        self.done = threading.Event()
+        self.error = None
+
+
+class _GroupWriter:
+    """Append queue of one file"""
+
+    def __init__(self, path):
+        self.path = path
+        self.queue = []
+        self.guard = threading.Lock()
+        self.writing = False
+        self.stats = {"appends": 0, "rows": 0, "batches": 0, "fsyncs": 0}
+
+    def append(self, rows, columns):
+        pending = _Pending(rows)
+        with self.guard:
+            self.queue.append(pending)
+            if self.writing:
+                leader = False
+            else:
+                self.writing = leader = True
+
+        if not leader:
+            # The current writer picks our rows up in its next batch
+            pending.done.wait()
+            if pending.error is not None:
+                raise pending.error
+            return
+
+        while True:
+            with self.guard:
+                batch, self.queue = self.queue, []
+                if not batch:
+                    self.writing = False
+                    break
+            try:
+                self._write(batch, columns)
+            except Exception as e:
+                for p in batch:
+                    p.error = e
+            for p in batch:
+                p.done.set()
+        if pending.error is not None:
+            raise pending.error
+
+    def _write(self, batch, columns):
+        with locked(self.path):
+            exists = os.path.exists(self.path) and os.path.getsize(self.path) > 0
+            header = _read_header(self.path) if exists else list(columns)
+            buffer = io.StringIO()
+            writer = csv.DictWriter(buffer, fieldnames=header, extrasaction="ignore",
+                                    restval="", lineterminator="\n")
+            if not exists:
+                writer.writeheader()
+            for pending in batch:
+                writer.writerows(pending.rows)
+            data = buffer.getvalue().encode()
+
+            fd = os.open(self.path, os.O_RDWR | os.O_APPEND | os.O_CREAT, 0o644)
+            try:
+                if exists and not _ends_with_newline(fd):
+                    data = b"\n" + data
+                os.write(fd, data)
+                os.fsync(fd)
+            finally:
+                os.close(fd)
+        with self.guard:
+            self.stats["appends"] += len(batch)
+            self.stats["rows"] += sum(len(p.rows) for p in batch)
+            self.stats["batches"] += 1
+            self.stats["fsyncs"] += 1
+
+
+def _read_header(path):
+    with open(path, newline="", encoding="utf-8") as f:
+        return next(csv.reader(f), [])
+
+
+def _ends_with_newline(fd):
+    size = os.fstat(fd).st_size
+    if size == 0:
+        return True
+    os.lseek(fd, size - 1, os.SEEK_SET)  # O_APPEND writes still go to the end
+    return os.read(fd, 1) == b"\n"
+
+
+_writers = {}
+_writers_guard = threading.Lock()
+
+
+def _writer(path):
+    with _writers_guard:
+        return _writers.setdefault(os.path.abspath(path), _GroupWriter(path))
+
+
+def append_rows(path, rows, columns):
+    """
+    Append row dicts to a CSV durably (returns once they are fsynced). Rows
+    follow the file's existing header; columns is the header of a new file.
+    """
+    _writer(path).append(list(rows), columns)
+
+
+def append_stats(path):
+    """Appends, rows, batches and fsyncs of a file's group writer"""
+    writer = _writer(path)
+    with writer.guard:
+        return dict(writer.stats)
@@ -0,0 +1,191 @@
+# ============= HOT-PATH METRICS =============
+# Timing spans around the expensive steps of a rerun (GitHub calls, CSV
+# parsing, page rendering). Every span feeds a per-name histogram (for the
+# Prometheus endpoint) and a window of recent samples (for p50/p95). Spans
+# opened inside track_rerun() are also attached to that rerun so the admin
+# panel can show where the slowest reruns spent their time.
+#
+# No Streamlit calls outside show_metrics_panel: spans are safe in background
+# threads and command line tools.
+
+import functools
+import threading
+import time
+from collections import deque
+
+# Histogram bucket upper bounds, in seconds
+BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+RECENT_SAMPLES = 2048  # per span, used for percentiles
+RECENT_RERUNS = 200
+
+_lock = threading.Lock()
+_histograms = {}
+_reruns = deque(maxlen=RECENT_RERUNS)
+_local = threading.local()
+
+
+class Histogram:
+    """Cumulative bucket counts plus a window of recent samples"""
+
+    def __init__(self):
+        self.counts = [0] * (len(BUCKETS) + 1)  # last bucket is +Inf
+        self.count = 0
+        self.total = 0.0
+        self.recent = deque(maxlen=RECENT_SAMPLES)
+
+    def observe(self, seconds):
+        for i, bound in enumerate(BUCKETS):
+            if seconds <= bound:
+                break
+        else:
+            i = len(BUCKETS)
+        self.counts[i] += 1
+        self.count += 1
+        self.total += seconds
+        self.recent.append(seconds)
+
+    def percentile(self, q):
+        """q-th percentile (0-100) of the recent samples, in seconds"""
+        samples = sorted(self.recent)
+        if not samples:
+            return 0.0
+        return samples[min(len(samples) - 1, int(round(q / 100 * (len(samples) - 1))))]
+
+
+def observe(name, seconds):
+    """Record one duration for a span name"""
+    with _lock:
+        histogram = _histograms.get(name)
+        if histogram is None:
+            histogram = _histograms[name] = Histogram()
+        histogram.observe(seconds)
+    rerun = getattr(_local, "rerun", None)
+    if rerun is not None:
+        rerun["spans"].append((name, seconds))
+
+
+class span:
+    """Context manager timing a block: with span("github.get_file"): ..."""
+
+    def __init__(self, name):
+        self.name = name
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        # Also recorded when the block raises (st.stop / st.rerun included)
+        observe(self.name, time.perf_counter() - self.started)
+        return False
+
+
+def timed(name):
+    """Decorator form of span"""
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with span(name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+class track_rerun:
+    """Wrap one script run; spans opened on this thread are attached to it"""
+
+    def __init__(self, page=""):
+        self.page = page
+
+    def __enter__(self):
+        _local.rerun = {"page": self.page, "started_at": time.time(), "spans": []}
+        self.started = time.perf_counter()
+        return _local.rerun
+
+    def __exit__(self, *exc):
+        rerun = _local.rerun
+        _local.rerun = None
+        rerun["seconds"] = time.perf_counter() - self.started
+        observe("rerun", rerun["seconds"])
+        with _lock:
+            _reruns.append(rerun)
+        return False
+
+
+# ============= EXPORT =============
+
+def summary():
+    """[{span, count, p50_ms, p95_ms, mean_ms}] sorted by span name"""
+    with _lock:
+        items = sorted(_histograms.items())
+        return [
+            {
+                "span": name,
+                "count": h.count,
+                "p50_ms": round(h.percentile(50) * 1000, 2),
+                "p95_ms": round(h.percentile(95) * 1000, 2),
+                "mean_ms": round(h.total / h.count * 1000, 2) if h.count else 0.0,
+            }
+            for name, h in items
+        ]
+
+
+def slowest_reruns(limit=10):
+    """The slowest of the recent reruns, with their spans (slowest first)"""
+    with _lock:
+        reruns = sorted(_reruns, key=lambda r: r["seconds"], reverse=True)[:limit]
+    return [
+        {
+            "at": time.strftime("%H:%M:%S", time.localtime(r["started_at"])),
+            "page": r["page"],
+            "total_ms": round(r["seconds"] * 1000, 1),
+            "spans": ", ".join(
+                f"{name} {seconds * 1000:.0f}ms"
+                for name, seconds in sorted(r["spans"], key=lambda s: s[1], reverse=True)[:5]
+            ),
+        }
+        for r in reruns
+    ]
+
+
+def prometheus_text():
+    """All histograms in the Prometheus text exposition format"""
+    lines = [
+        "# HELP azan_span_duration_seconds Duration of instrumented hot-path spans",
+        "# TYPE azan_span_duration_seconds histogram",
+    ]
+    with _lock:
+        for name, h in sorted(_histograms.items()):
+            cumulative = 0
+            for bound, count in zip(BUCKETS + ("+Inf",), h.counts):
+                cumulative += count
+                lines.append(f'azan_span_duration_seconds_bucket{{span="{name}",le="{bound}"}} {cumulative}')
+            lines.append(f'azan_span_duration_seconds_sum{{span="{name}"}} {h.total:.6f}')
+            lines.append(f'azan_span_duration_seconds_count{{span="{name}"}} {h.count}')
+    return "\n".join(lines) + "\n"
+
+
+def snapshot():
+    """JSON-friendly dump of the summary and slowest reruns"""
+    return {"generated_at": time.time(), "spans": summary(), "slowest_reruns": slowest_reruns()}
+
+
+def reset():
+    with _lock:
+        _histograms.clear()
+        _reruns.clear()
+
+
+def show_metrics_panel():
+    """p50/p95 per span and the slowest recent reruns (admin sidebar)"""
+    import streamlit as st
+
+    with st.sidebar.expander("⏱️ Performance"):
+        rows = summary()
+        if not rows:
+            st.caption("No timings recorded yet")
+            return
+        st.dataframe(rows, hide_index=True, use_container_width=True)
+        st.caption("Slowest recent reruns")
+        st.dataframe(slowest_reruns(), hide_index=True, use_container_width=True)
@@ -0,0 +1,167 @@
+# ============= PLAYBACK DERIVATIVES =============
+# Quicker-to-review copies of a recording, made on demand:
+#
+#   * skip silence  pauses longer than SKIP_SILENCE_MIN are cut down to
+#                   SKIP_SILENCE_KEEP, half kept at each end, so the cut
+#                   falls inside the pause and never clicks
+#   * speed         time-stretched by WSOLA: Hann-windowed frames are
+#                   overlap-added at half their length, each taken within
+#                   +-10 ms of its nominal position where it best continues
+#                   the previous one, so the pitch is unchanged
+#
+# Silence detection, framing and the overlap-add are whole-array NumPy
+# operations; only the WSOLA alignment walks the frames (one small
+# matrix-vector product each). Derivatives are keyed by the recording's git
+# blob sha and the settings and kept on disk under SNAPSHOT_DIR, so each one
+# is computed once however many reviewers play it.
+
+import os
+import threading
+from config import *
+from wav_info import read_samples, to_wav
+
+CACHE_VERSION = "playback-v1"
+SILENCE_FRAME_SECONDS = 0.02
+FRAME_SECONDS = 0.04  # WSOLA frame, overlapped by half
+TOLERANCE_SECONDS = 0.01  # WSOLA search window either side of the nominal position
+
+# Reviewer choices: label -> (skip_silence, speed), None plays the original
+MODES = {
+    "Original": None,
+    "Skip silence": (True, 1.0),
+    **{f"Skip silence · {speed:g}×": (True, speed) for speed in PLAYBACK_SPEEDS},
+}
+
+
+def skip_silence(samples, rate):
+    """samples (frames x channels) with every pause longer than SKIP_SILENCE_MIN shortened"""
+    import numpy as np
+
+    hop = max(1, int(rate * SILENCE_FRAME_SECONDS))
+    count = len(samples) // hop
+    if count == 0:
+        return samples
+    mono = samples[:count * hop].mean(axis=1).reshape(count, hop)
+    level = 10 * np.log10(np.square(mono).mean(axis=1) + 1e-12)
+    silent = level < np.percentile(level, 95) - SKIP_SILENCE_DB
+
+    edges = np.diff(silent.astype(np.int8), prepend=0, append=0)
+    starts, ends = np.flatnonzero(edges == 1), np.flatnonzero(edges == -1)
+    keep = int(round(SKIP_SILENCE_KEEP / 2 / SILENCE_FRAME_SECONDS))
+    long = (ends - starts) * hop >= SKIP_SILENCE_MIN * rate
+    starts, ends = starts[long] + keep, ends[long] - keep
+    starts, ends = starts[starts < ends], ends[starts < ends]
+    if len(starts) == 0:
+        return samples
+
+    marks = np.zeros(len(samples) + 1, np.int32)
+    marks[starts * hop] += 1
+    marks[ends * hop] -= 1
+    return samples[np.cumsum(marks[:-1]) == 0]
+
+
+def time_stretch(samples, rate, speed):
+    """samples (frames x channels) played speed times faster at the same pitch"""
+    import numpy as np
+    from numpy.lib.stride_tricks import sliding_window_view
+
+    size = 2 * int(rate * FRAME_SECONDS / 2)
+    hop = size // 2
+    tolerance = int(rate * TOLERANCE_SECONDS)
+    analysis_hop = hop * speed
+    count = int((len(samples) - size - tolerance - hop) / analysis_hop)
+    if speed == 1 or count < 2:
+        return samples
+
+    # Alignment on the mono mix, so every channel gets the same frames
+    windows = sliding_window_view(samples.mean(axis=1), size)
+    step = max(1, size // 128)  # correlate every step-th sample, plenty for a +-10 ms search
+    positions = np.zeros(count, np.int64)
+    for k in range(1, count):
+        template = windows[positions[k - 1] + hop, ::step]  # natural continuation of the previous frame
+        nominal = int(k * analysis_hop)
+        low = max(0, nominal - tolerance)
+        high = min(len(windows) - 1, nominal + tolerance)
+        positions[k] = low + int(np.argmax(windows[low:high + 1, ::step] @ template))
+
+    # Periodic Hann: the two overlapping halves sum to one, no normalisation needed
+    window = np.hanning(size + 1)[:size].astype(np.float32)
+    frames = samples[positions[:, None] + np.arange(size)] * window[:, None]
+    out = np.zeros((count + 1, hop, samples.shape[1]), np.float32)
+    out[:-1] += frames[:, :hop]
+    out[1:] += frames[:, hop:]
+    return out.reshape(-1, samples.shape[1])
+
+
+def derive(data, skip=True, speed=1.0):
+    """16-bit WAV bytes of the derivative of a WAV recording"""
+    samples, info = read_samples(data)
+    if skip:
+        samples = skip_silence(samples, info.rate)
+    return to_wav(time_stretch(samples, info.rate, speed), info.rate)
+
+
+# ============= CACHE =============
+
+_locks = {}
+_locks_guard = threading.Lock()
+
+
+def cache_path(sha, skip, speed, directory=SNAPSHOT_DIR):
+    name = f"{sha}-{'skip' if skip else 'full'}-{speed:g}x-{CACHE_VERSION}.wav"
+    return os.path.join(directory, "playback", name)
+
+
+def _prune(directory, limit=PLAYBACK_CACHE_MB * 1024 * 1024):
+    """Delete the least recently played derivatives beyond limit bytes"""
+    entries = []
+    for entry in os.scandir(directory):
+        if entry.name.endswith(".wav"):
+            stat = entry.stat()
+            entries.append((stat.st_mtime, stat.st_size, entry.path))
+    total = sum(size for _, size, _ in entries)
+    for _, size, path in sorted(entries):
+        if total <= limit:
+            break
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+        total -= size
+
+
+def _read(path):
+    try:
+        with open(path, "rb") as f:
+            data = f.read()
+    except FileNotFoundError:
+        return None
+    os.utime(path)  # most recently played, pruned last
+    return data
+
+
+def derivative(sha, load, skip=True, speed=1.0):
+    """
+    WAV bytes of a derivative of the recording with git blob sha. load()
+    returns the original recording and is only called on a cache miss.
+    """
+    if not SNAPSHOT_DIR:
+        return derive(load(), skip, speed)
+    from local_store import replace_file
+
+    path = cache_path(sha, skip, speed)
+    data = _read(path)
+    if data is not None:
+        return data
+    with _locks_guard:
+        lock = _locks.setdefault(path, threading.Lock())
+    with lock:  # another session may be deriving the same one
+        data = _read(path)
+        if data is None:
+            data = derive(load(), skip, speed)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            replace_file(path, data)
+            _prune(os.path.dirname(path))
+    with _locks_guard:
+        _locks.pop(path, None)
+    return data
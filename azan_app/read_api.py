@@ -0,0 +1,440 @@
+# ============= HEADLESS READ API =============
+# Read-only JSON API and CLI for coordinators, outside the Streamlit app.
+# A DeltaSync keeps the open season's shards in step with GitHub; every
+# masjid's submissions joined with their reviews are held in an indexed
+# SQLite table that is rebuilt one masjid at a time when its shards change.
+# Responses carry an ETag derived from the synced commit and the query, so
+# unchanged data is answered with 304 or from the response cache.
+#
+#     python azan_app/read_api.py serve [--port 8600] [--interval 15]
+#     python azan_app/read_api.py query --masjid "Najmi Masjid" --status Approved [--format csv]
+#     python azan_app/read_api.py query --url http://127.0.0.1:8600 --status pending --from 2026-02-01
+#
+# Endpoints (GET):
+#     /api/submissions   ?masjid= &status= &from= &to= &page= &per_page= &format=json|csv
+#     /api/reviews       same filters, reviewed entries only, dates on reviewed_at
+#     /api/masjids       submissions per masjid and status
+#     /api/health        synced commit and row count
+# status is a review status ("Approved", ...) or "pending" for unreviewed.
+# from / to are inclusive YYYY-MM-DD dates.
+#
+# Every request needs "Authorization: Bearer <token>" with [read_api] token
+# from .streamlit/secrets.toml; serve refuses to start without one. Applicants'
+# names and WhatsApp numbers are personal data and are left out of responses
+# unless [read_api] contacts = true.
+
+import hashlib
+import hmac
+import io
+import json
+import logging
+import sqlite3
+import threading
+import time
+from datetime import date, timedelta
+from config import *
+from sidecar import route, serve
+from shards import parse_shard_path, SHARDED_DATASETS
+
+logger = logging.getLogger(__name__)
+
+ENTRY_COLUMNS = [
+    "its", "name", "whatsapp", "masjid", "interests", "azan_file", "takbirah_file",
+    "remarks", "submitted_at", "status", "comments", "reviewed_at",
+]
+CONTACT_COLUMNS = ("name", "whatsapp")
+RESPONSE_CACHE_SIZE = 1024
+
+SCHEMA_SQL = f"""
+CREATE TABLE entries (shard TEXT NOT NULL, {", ".join(f"{c} TEXT" for c in ENTRY_COLUMNS)});
+CREATE INDEX entries_masjid ON entries (masjid, status, submitted_at);
+CREATE INDEX entries_status ON entries (status, submitted_at);
+CREATE INDEX entries_submitted ON entries (submitted_at);
+CREATE INDEX entries_reviewed ON entries (reviewed_at);
+CREATE INDEX entries_shard ON entries (shard);
+"""
+
+
+class QueryError(ValueError):
+    """Bad query parameters (HTTP 400)"""
+
+
+class EntryStore:
+    """Submissions joined with their reviews, indexed in an in-memory SQLite database"""
+
+    def __init__(self):
+        self.db = sqlite3.connect(":memory:", check_same_thread=False)
+        self.db.executescript(SCHEMA_SQL)
+        self.lock = threading.Lock()
+        self.commit = None
+        self.loaded = {}  # masjid slug -> (submissions sha, reviews sha)
+
+    def update(self, commit, submissions, reviews):
+        """
+        Bring the table to a synced commit from {path: (df, sha)} shard maps.
+        Only masjids whose shards changed are rebuilt; returns their slugs.
+        """
+        import pandas as pd
+
+        shards = {}
+        for dataset, tables in (("submissions", submissions), ("reviews", reviews)):
+            for path, table in tables.items():
+                shards.setdefault(parse_shard_path(path)[1], {})[dataset] = table
+
+        changed = {
+            slug for slug in set(shards) | set(self.loaded)
+            if tuple(shards.get(slug, {}).get(d, (None, None))[1] for d in SHARDED_DATASETS)
+            != self.loaded.get(slug)
+        }
+        rows = {}
+        for slug in changed:
+            sub_df, _ = shards.get(slug, {}).get("submissions", (pd.DataFrame(), None))
+            rev_df, _ = shards.get(slug, {}).get("reviews", (pd.DataFrame(), None))
+            rows[slug] = _join(sub_df, rev_df, slug)
+
+        with self.lock:
+            with self.db:
+                for slug in changed:
+                    self.db.execute("DELETE FROM entries WHERE shard = ?", (slug,))
+                    self.db.executemany(
+                        f"INSERT INTO entries VALUES ({', '.join('?' * (len(ENTRY_COLUMNS) + 1))})",
+                        rows[slug],
+                    )
+            for slug in changed:
+                if slug in shards:
+                    self.loaded[slug] = tuple(shards[slug].get(d, (None, None))[1] for d in SHARDED_DATASETS)
+                else:
+                    self.loaded.pop(slug, None)
+            self.commit = commit
+        return changed
+
+    def query(self, sql, params=()):
+        with self.lock:
+            cursor = self.db.execute(sql, params)
+            names = [d[0] for d in cursor.description]
+            return [dict(zip(names, row)) for row in cursor.fetchall()]
+
+    def count(self):
+        with self.lock:
+            return self.db.execute("SELECT COUNT(*) FROM entries").fetchone()[0]
+
+
+def _as_text(df):
+    """Every cell as a string or None (integral float columns without the .0)"""
+    out = {}
+    for column in df.columns:
+        values = df[column]
+        if values.dtype.kind == "f" and (values.dropna() % 1 == 0).all():
+            values = values.astype("Int64")
+        out[column] = values.astype(str).where(values.notna(), None)
+    return df.__class__(out, index=df.index)
+
+
+def _join(submissions, reviews, slug):
+    """Rows for the entries table: one per submission, with its review if any"""
+    if submissions.empty:
+        return []
+    df = _as_text(submissions)
+    if not reviews.empty and "its" in reviews.columns:
+        latest = _as_text(reviews).drop_duplicates("its", keep="last")
+        df = df.merge(latest.reindex(columns=["its", "status", "comments", "reviewed_at"]), on="its", how="left")
+    df = df.reindex(columns=ENTRY_COLUMNS).astype(object)
+    df = df.where(df.notna(), None)
+    df.insert(0, "shard", slug)
+    return list(df.itertuples(index=False, name=None))
+
+
+# ============= QUERIES =============
+
+def _day(value, name):
+    try:
+        return date.fromisoformat(value)
+    except ValueError:
+        raise QueryError(f"{name} must be a YYYY-MM-DD date")
+
+
+def _int(value, name, low, high):
+    try:
+        number = int(value)
+    except ValueError:
+        raise QueryError(f"{name} must be a number")
+    if not low <= number <= high:
+        raise QueryError(f"{name} must be between {low} and {high}")
+    return number
+
+
+def output_columns(contacts=False):
+    """Columns returned by listings, without the applicants' contact details unless asked"""
+    return [c for c in ENTRY_COLUMNS if contacts or c not in CONTACT_COLUMNS]
+
+
+def build_query(kind, params, columns=ENTRY_COLUMNS):
+    """(SQL for the page, SQL for the total, arguments, page, per_page) of a filtered listing"""
+    date_column = "reviewed_at" if kind == "reviews" else "submitted_at"
+    where, args = [], []
+    if kind == "reviews":
+        where.append("status IS NOT NULL")
+    if params.get("masjid"):
+        where.append("masjid = ?")
+        args.append(params["masjid"])
+    status = params.get("status")
+    if status:
+        if status.lower() == "pending":
+            where.append("status IS NULL")
+        else:
+            where.append("status = ?")
+            args.append(status)
+    if params.get("from"):
+        where.append(f"{date_column} >= ?")
+        args.append(_day(params["from"], "from").isoformat())
+    if params.get("to"):
+        where.append(f"{date_column} < ?")
+        args.append((_day(params["to"], "to") + timedelta(days=1)).isoformat())
+
+    page = _int(params.get("page", "1"), "page", 1, 10 ** 6)
+    per_page = _int(params.get("per_page", str(READ_API_PAGE_SIZE)), "per_page", 1, READ_API_MAX_PAGE_SIZE)
+    clause = f" WHERE {' AND '.join(where)}" if where else ""
+    listing = (
+        f"SELECT {', '.join(columns)} FROM entries{clause} "
+        f"ORDER BY {date_column}, its LIMIT ? OFFSET ?"
+    )
+    total = f"SELECT COUNT(*) AS total FROM entries{clause}"
+    return listing, total, args, page, per_page
+
+
+def list_entries(store, kind, params, columns=ENTRY_COLUMNS):
+    """One page of submissions or reviews as a JSON-ready dict"""
+    listing, total, args, page, per_page = build_query(kind, params, columns)
+    items = store.query(listing, (*args, per_page, (page - 1) * per_page))
+    return {
+        "items": items,
+        "page": page,
+        "per_page": per_page,
+        "total": store.query(total, args)[0]["total"],
+        "commit": store.commit,
+    }
+
+
+def masjid_counts(store):
+    rows = store.query(
+        "SELECT masjid, COALESCE(status, 'pending') AS status, COUNT(*) AS n "
+        "FROM entries GROUP BY masjid, status ORDER BY masjid"
+    )
+    counts = {}
+    for row in rows:
+        entry = counts.setdefault(row["masjid"], {"masjid": row["masjid"], "total": 0, "statuses": {}})
+        entry["total"] += row["n"]
+        entry["statuses"][row["status"]] = row["n"]
+    return {"masjids": list(counts.values()), "commit": store.commit}
+
+
+def to_csv(items, columns=ENTRY_COLUMNS):
+    import csv
+
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=columns, lineterminator="\n")
+    writer.writeheader()
+    writer.writerows(items)
+    return buffer.getvalue()
+
+
+# ============= SERVER =============
+
+def api_settings():
+    """([read_api] token or None, whether contacts are served) from st.secrets"""
+    import streamlit as st
+
+    try:
+        section = st.secrets["read_api"]
+    except (KeyError, FileNotFoundError):
+        return None, False
+    return section.get("token") or None, bool(section.get("contacts", False))
+
+
+class ReadApi:
+    """The store, its background sync and the ETag-keyed response cache"""
+
+    def __init__(self, client, interval=REFRESH_MIN_INTERVAL, token=None, contacts=False):
+        from delta_sync import DeltaSync
+
+        self.sync = DeltaSync(client)
+        self.store = EntryStore()
+        self.interval = interval
+        self.token = token
+        self.columns = output_columns(contacts)
+        self._responses = {}
+        self._cache_lock = threading.Lock()
+
+    def refresh(self):
+        """Pull from GitHub and rebuild the masjids that changed"""
+        changed = self.sync.pull()
+        if changed & set(SHARDED_DATASETS) or self.store.commit is None:
+            rebuilt = self.store.update(
+                self.sync.commit_sha, self.sync.shards("submissions"), self.sync.shards("reviews"),
+            )
+            logger.info("Synced %s, rebuilt %s", self.sync.commit_sha, sorted(rebuilt))
+        self.store.commit = self.sync.commit_sha
+        return changed
+
+    def run(self):
+        while True:
+            time.sleep(self.interval)
+            try:
+                self.refresh()
+            except Exception:
+                logger.exception("Read API refresh failed")
+
+    def authorized(self, request):
+        """Whether the request carries the bearer token (never without one configured)"""
+        scheme, _, token = (request.headers.get("Authorization") or "").partition(" ")
+        return bool(self.token) and scheme.lower() == "bearer" and hmac.compare_digest(
+            token.strip().encode(), self.token.encode())
+
+    def respond(self, request, kind, build):
+        """200 with an ETag, 304 when the client has it, cached per commit and query"""
+        if not self.authorized(request):
+            return 401, {"error": "missing or wrong bearer token"}, "application/json", UNAUTHORIZED
+        query = sorted((key, values[-1]) for key, values in request.query.items())
+        etag = '"' + hashlib.sha1(f"{self.store.commit}|{request.path}|{query}".encode()).hexdigest() + '"'
+        headers = {"ETag": etag, "Cache-Control": "no-cache"}
+        if request.headers.get("If-None-Match") == etag:
+            return 304, b"", "application/json", headers
+
+        with self._cache_lock:
+            cached = self._responses.get(etag)
+        if cached is None:
+            params = dict(query)
+            try:
+                result = build(self.store, kind, params, self.columns)
+            except QueryError as e:
+                return 400, {"error": str(e)}
+            if params.get("format") == "csv":
+                cached = (to_csv(result.get("items", []), self.columns).encode(), "text/csv; charset=utf-8")
+            else:
+                cached = (json.dumps(result).encode(), "application/json")
+            with self._cache_lock:
+                if len(self._responses) >= RESPONSE_CACHE_SIZE:
+                    self._responses.clear()
+                self._responses[etag] = cached
+        return 200, cached[0], cached[1], headers
+
+
+_api = None
+UNAUTHORIZED = {"WWW-Authenticate": 'Bearer realm="read-api"'}
+
+
+def _listing(kind):
+    def handler(request):
+        return _api.respond(request, kind, list_entries)
+    return handler
+
+
+route("/api/submissions")(_listing("submissions"))
+route("/api/reviews")(_listing("reviews"))
+
+
+@route("/api/masjids")
+def _masjids(request):
+    return _api.respond(request, None, lambda store, kind, params, columns: masjid_counts(store))
+
+
+@route("/api/health")
+def _health(request):
+    if not _api.authorized(request):
+        return 401, {"error": "missing or wrong bearer token"}, "application/json", UNAUTHORIZED
+    return 200, {"commit": _api.store.commit, "entries": _api.store.count()}
+
+
+# ============= COMMAND LINE =============
+
+def _client():
+    import streamlit as st
+    from github_client import GitHubRepo
+
+    # [github] credentials from .streamlit/secrets.toml, like the app
+    return GitHubRepo.from_secrets(st.secrets)
+
+
+def _remote_query(url, kind, params, token):
+    from urllib.parse import urlencode
+    from urllib.request import Request, urlopen
+
+    request = Request(f"{url.rstrip('/')}/api/{kind}?{urlencode(params)}")
+    if token:
+        request.add_header("Authorization", f"Bearer {token}")
+    with urlopen(request, timeout=30) as response:
+        return json.loads(response.read())
+
+
+def main():
+    import argparse
+
+    global _api
+    parser = argparse.ArgumentParser(description="Read-only API for submissions and reviews")
+    commands = parser.add_subparsers(dest="command", required=True)
+    server = commands.add_parser("serve", help="run the HTTP JSON API")
+    server.add_argument("--host", default=READ_API_HOST)
+    server.add_argument("--port", type=int, default=READ_API_PORT)
+    server.add_argument("--interval", type=float, default=REFRESH_MIN_INTERVAL, help="seconds between GitHub polls")
+    query = commands.add_parser("query", help="print submissions or reviews")
+    query.add_argument("kind", nargs="?", default="submissions", choices=["submissions", "reviews"])
+    query.add_argument("--masjid")
+    query.add_argument("--status", help='review status, or "pending"')
+    query.add_argument("--from", dest="start", help="YYYY-MM-DD")
+    query.add_argument("--to", dest="end", help="YYYY-MM-DD")
+    query.add_argument("--format", choices=["table", "csv", "json"], default="table")
+    query.add_argument("--url", help="query a running API instead of GitHub")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(message)s")
+
+    token, contacts = api_settings()
+    if args.command == "serve":
+        if token is None:
+            parser.exit(1, "Set [read_api] token in .streamlit/secrets.toml before serving\n")
+        _api = ReadApi(_client(), args.interval, token, contacts)
+        _api.refresh()
+        if serve(args.host, args.port, name="read-api") is None:
+            parser.exit(1, f"Port {args.port} is in use\n")
+        print(f"Read API on http://{args.host}:{args.port}/api/submissions ({_api.store.count()} entries)")
+        try:
+            _api.run()
+        except KeyboardInterrupt:
+            pass
+        return
+
+    params = {
+        key: value for key, value in
+        (("masjid", args.masjid), ("status", args.status), ("from", args.start), ("to", args.end))
+        if value
+    }
+    items, page = [], 1
+    while True:
+        params.update(page=page, per_page=READ_API_MAX_PAGE_SIZE)
+        if args.url:
+            result = _remote_query(args.url, args.kind, params, token)
+        else:
+            if _api is None:
+                _api = ReadApi(_client(), contacts=contacts)
+                _api.refresh()
+            try:
+                result = list_entries(_api.store, args.kind, {k: str(v) for k, v in params.items()}, _api.columns)
+            except QueryError as e:
+                parser.error(str(e))
+        items.extend(result["items"])
+        if page * result["per_page"] >= result["total"]:
+            break
+        page += 1
+
+    if args.format == "json":
+        print(json.dumps(items, indent=2))
+    elif args.format == "csv":
+        print(to_csv(items, output_columns(contacts)), end="")
+    else:
+        for item in items:
+            print(f"{item['its']:<10} {item.get('name') or '':<32} {item['masjid'] or '':<16} "
+                  f"{item['status'] or 'pending':<18} {(item['submitted_at'] or '')[:10]}")
+        print(f"{len(items)} {args.kind}")
+
+
+if __name__ == "__main__":
+    main()
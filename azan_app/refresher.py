@@ -0,0 +1,176 @@
+# ============= BACKGROUND DATA REFRESHER =============
+# One daemon thread per process keeps the latest submission and review
+# shards ({path: (df, sha)}) and the audio listing in memory. Readers never wait on GitHub: they get the newest
+# snapshot plus the time it was fetched (stale-while-revalidate).
+# Each poll is one conditional request for the branch head; data is only
+# pulled, as a delta, when the head moved. The synced data is saved to disk
+# (snapshot_store.py) so a restarted process serves it at once and only
+# revalidates in the background.
+
+import threading
+import time
+import logging
+import streamlit as st
+from datetime import datetime
+from config import *
+from github_client import GitHubRepo
+from delta_sync import DeltaSync
+import snapshot_store
+from cache_control import invalidate, add_invalidation_listener
+
+logger = logging.getLogger(__name__)
+
+
+class DataRefresher:
+    """Polls GitHub in the background with an adaptive interval"""
+
+    def __init__(self, client, min_interval=REFRESH_MIN_INTERVAL,
+                 max_interval=REFRESH_MAX_INTERVAL):
+        self.client = client
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.interval = min_interval
+        self.next_refresh_at = None
+        self.sync = DeltaSync(client)
+        self._snapshots = {}
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._thread = None
+
+    # ----- readers -----
+
+    def get(self, dataset):
+        """Latest snapshot {"data", "fetched_at", "changed_at"} or None"""
+        with self._lock:
+            return self._snapshots.get(dataset)
+
+    def oldest_fetch(self):
+        """Fetch time of the stalest dataset (None until every dataset loaded once)"""
+        with self._lock:
+            if len(self._snapshots) < 3:
+                return None
+            return min(s["fetched_at"] for s in self._snapshots.values())
+
+    # ----- writers -----
+
+    def publish(self, dataset, data, path=None):
+        """
+        Install data we just wrote ourselves, so the writer reads its own write.
+        With a shard path, data is that shard's (df, sha) and the other shards stay.
+        """
+        now = time.time()
+        with self._lock:
+            snapshot = self._snapshots.get(dataset)
+            if path is not None and snapshot is not None:
+                data = {**(snapshot["data"] or {}), path: data}
+            if path is None or snapshot is not None:
+                # A lone shard is not a snapshot of the dataset: wait for the first pull
+                self._snapshots[dataset] = {"data": data, "fetched_at": now, "changed_at": now}
+        invalidate(dataset)
+
+    def wake(self):
+        """Ask for an immediate refresh (e.g. after a write)"""
+        self._wake.set()
+
+    def _on_invalidate(self, datasets):
+        # Writes elsewhere in the app invalidate a dataset: refetch now.
+        # Our own invalidations (after a refresh) must not re-trigger the loop.
+        if threading.current_thread() is not self._thread:
+            self.wake()
+
+    # ----- disk snapshot -----
+
+    def restore_snapshot(self):
+        """Serve the data saved by a previous process until the first pull; True if restored"""
+        if not SNAPSHOT_DIR:
+            return False
+        saved = snapshot_store.load(self.client)
+        if saved is None:
+            return False
+        manifest, tables, audio = saved
+        self.sync.restore(manifest["commit"], tables, audio)
+        saved_at = manifest["saved_at"]
+        with self._lock:
+            for dataset in ("submissions", "reviews", "audio"):
+                data = audio if dataset == "audio" else self.sync.shards(dataset)
+                self._snapshots[dataset] = {"data": data, "fetched_at": saved_at, "changed_at": saved_at}
+        logger.info("Restored snapshot of %s", manifest["commit"])
+        return True
+
+    def save_snapshot(self):
+        if SNAPSHOT_DIR and self.sync.commit_sha is not None:
+            snapshot_store.save(self.client, *self.sync.export())
+
+    # ----- refresh loop -----
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(
+                target=self._run, name="azan-data-refresher", daemon=True
+            )
+            self._thread.start()
+
+    def _run(self):
+        while True:
+            try:
+                changed = self.refresh_all()
+            except Exception:
+                logger.exception("Background refresh failed")
+                changed = False
+
+            # Tighten while data is moving, back off while idle
+            if changed:
+                self.interval = self.min_interval
+            else:
+                self.interval = min(self.max_interval, self.interval * 2)
+            self.next_refresh_at = time.time() + self.interval
+
+            self._wake.wait(self.interval)
+            self._wake.clear()
+
+    def refresh_all(self):
+        """Pull changes since the last synced commit, returns True if anything changed"""
+        changed = self.sync.pull()
+        now = time.time()
+        with self._lock:
+            for dataset in ("submissions", "reviews", "audio"):
+                data = self.sync.audio if dataset == "audio" else self.sync.shards(dataset)
+                snapshot = self._snapshots.get(dataset)
+                if dataset in changed or snapshot is None:
+                    self._snapshots[dataset] = {"data": data, "fetched_at": now, "changed_at": now}
+                else:
+                    snapshot["fetched_at"] = now
+        if changed:
+            invalidate(*changed)
+            self.save_snapshot()
+        return bool(changed)
+
+
+@st.cache_resource
+def get_refresher():
+    """Start the refresher thread once per process"""
+    # Pushes are announced by the webhook: polling is only a safety net then
+    webhooks = bool(st.secrets["github"].get("webhook_secret"))
+    refresher = DataRefresher(
+        GitHubRepo.from_secrets(st.secrets),
+        max_interval=REFRESH_WEBHOOK_MAX_INTERVAL if webhooks else REFRESH_MAX_INTERVAL,
+    )
+    refresher.restore_snapshot()
+    add_invalidation_listener(refresher._on_invalidate)
+    refresher.start()
+    return refresher
+
+
+def show_refresh_status():
+    """Show how fresh the admin data is in the sidebar"""
+    refresher = get_refresher()
+    fetched_at = refresher.oldest_fetch()
+    if fetched_at is None:
+        st.sidebar.caption("🔄 Loading latest data…")
+        return
+    age = int(time.time() - fetched_at)
+    stamp = datetime.fromtimestamp(fetched_at).strftime("%H:%M:%S")
+    note = f"🔄 Data as of {stamp} ({age}s ago)"
+    if refresher.next_refresh_at:
+        note += f" · next check in {max(0, int(refresher.next_refresh_at - time.time()))}s"
+    st.sidebar.caption(note)
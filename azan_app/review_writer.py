@@ -0,0 +1,181 @@
+# ============= OPTIMISTIC CONCURRENT CSV WRITES =============
+# Writes to a CSV on GitHub send the blob sha they were based on. When another
+# writer got there first, GitHub answers 409/422: we fetch the new base,
+# three-way merge per key row (base / ours / theirs) and retry with jittered
+# exponential backoff, so concurrent reviewers never lose a decision.
+
+import io
+import random
+import threading
+import time
+from datetime import datetime
+import pandas as pd
+
+REVIEW_COLUMNS = ["its", "status", "comments", "reviewed_at"]
+
+CONFLICT_STATUSES = (409, 422)
+
+_stats_lock = threading.Lock()
+_stats = {
+    "writes": 0,
+    "attempts": 0,
+    "sha_conflicts": 0,
+    "row_conflicts": 0,
+    "retries": 0,
+    "failures": 0,
+}
+
+
+def _count(**increments):
+    with _stats_lock:
+        for name, value in increments.items():
+            _stats[name] += value
+
+
+def write_stats():
+    """Counters since process start (shared by all sessions)"""
+    with _stats_lock:
+        return dict(_stats)
+
+
+# ============= ROW MERGE =============
+
+def rows_by_key(df, key="its"):
+    """{key: {column: str}} with NaN as "" (the last row wins for duplicate keys)"""
+    if df is None or df.empty or key not in df.columns:
+        return {}
+    records = df.fillna("").astype(str).to_dict("records")
+    return {r[key]: r for r in records}
+
+
+def three_way_merge(base, ours, theirs, time_column="reviewed_at"):
+    """
+    Merge keyed rows (a missing row means deleted): take whichever side changed it.
+    When both changed the same row differently, the newer time_column wins.
+    Returns (merged rows in theirs' order then ours' additions, conflicting keys).
+    """
+    merged, conflicts = {}, []
+    for key in dict.fromkeys(list(theirs) + list(ours)):
+        b, o, t = base.get(key), ours.get(key), theirs.get(key)
+        if o == b:
+            chosen = t
+        elif t == b or o == t:
+            chosen = o
+        else:
+            conflicts.append(key)
+            chosen = max(o, t, key=lambda r: r.get(time_column, "")) if o and t else (o or t)
+        if chosen is not None:
+            merged[key] = chosen
+    return merged, conflicts
+
+
+def apply_changes(rows, changes):
+    """Apply {key: row or None} on top of keyed rows (None deletes)"""
+    updated = dict(rows)
+    for key, row in changes.items():
+        if row is None:
+            updated.pop(key, None)
+        else:
+            updated[key] = {**updated.get(key, {}), **{c: str(v) for c, v in row.items()}}
+    return updated
+
+
+def to_frame(rows, columns):
+    extra = [c for r in rows.values() for c in r if c not in columns]
+    return pd.DataFrame(list(rows.values()), columns=list(dict.fromkeys(columns + extra)))
+
+
+def review_change(its, status, comments, reviewed_at=None):
+    """The {its: row} change a review decision makes to a reviews CSV"""
+    return {str(its): {
+        "its": its,
+        "status": status,
+        "comments": comments,
+        "reviewed_at": reviewed_at or datetime.now().isoformat(),
+    }}
+
+
+# ============= WRITER =============
+
+def _read_rows(client, path, ref, key):
+    """
+    (keyed rows, blob sha) of a CSV read verbatim: no NA or number inference, so
+    other rows ("NA" comments, integer columns with gaps) are written back unchanged
+    """
+    content, sha, _ = client.get_file(path, ref=ref)
+    if not content:
+        return {}, sha
+    return rows_by_key(pd.read_csv(io.BytesIO(content), dtype=str, keep_default_na=False), key), sha
+
+
+def commit_row_changes(client, path, changes, message, key="its",
+                       columns=REVIEW_COLUMNS, max_attempts=10,
+                       backoff=0.25, max_backoff=4.0):
+    """
+    Apply {key: row or None} to a CSV on GitHub in one commit.
+    Returns (DataFrame as written, new blob sha), or None if every attempt failed.
+    """
+    _count(writes=1)
+    base, sha = _read_rows(client, path, None, key)
+    ours = apply_changes(base, changes)
+
+    for attempt in range(max_attempts):
+        _count(attempts=1)
+        df = to_frame(ours, columns)
+        response = client.put_file(path, df.to_csv(index=False).encode(), message, sha)
+
+        if response.status_code in (200, 201):
+            return df, response.json().get("content", {}).get("sha")
+
+        if response.status_code not in CONFLICT_STATUSES or attempt == max_attempts - 1:
+            break
+
+        # Someone else committed first: merge onto their version and retry
+        _count(sha_conflicts=1, retries=1)
+        time.sleep(random.uniform(0, min(max_backoff, backoff * 2 ** attempt)))
+        theirs, sha = _read_rows(client, path, None, key)
+        ours, conflicts = three_way_merge(base, ours, theirs)
+        _count(row_conflicts=len(conflicts))
+        base = theirs
+
+    _count(failures=1)
+    return None
+
+
+def commit_tree_row_changes(client, changes, message, key="its",
+                            columns=REVIEW_COLUMNS, max_attempts=10,
+                            backoff=0.25, max_backoff=4.0):
+    """
+    Apply {path: {key: row or None}} to several CSVs on GitHub in a single
+    commit (git data API). When the branch moves underneath, every file is
+    three-way merged onto the new head like commit_row_changes does.
+    Returns ({path: DataFrame as written}, commit sha), or None if every attempt failed.
+    """
+    _count(writes=1)
+    head, _ = client.get_head()
+    base = {path: _read_rows(client, path, head, key)[0] for path in changes}
+    ours = {path: apply_changes(base[path], file_changes) for path, file_changes in changes.items()}
+
+    for attempt in range(max_attempts):
+        _count(attempts=1)
+        frames = {path: to_frame(rows, columns) for path, rows in ours.items()}
+        blobs = {path: client.create_blob(df.to_csv(index=False).encode()) for path, df in frames.items()}
+        commit = client.commit_tree(blobs, message, head)
+        if commit is not None:
+            return frames, commit
+
+        if attempt == max_attempts - 1:
+            break
+
+        # Another commit landed first: merge every file onto the new head and retry
+        _count(sha_conflicts=1, retries=1)
+        time.sleep(random.uniform(0, min(max_backoff, backoff * 2 ** attempt)))
+        head, _ = client.get_head()
+        for path in changes:
+            theirs, _ = _read_rows(client, path, head, key)
+            ours[path], conflicts = three_way_merge(base[path], ours[path], theirs)
+            _count(row_conflicts=len(conflicts))
+            base[path] = theirs
+
+    _count(failures=1)
+    return None
@@ -0,0 +1,171 @@
+# ============= SUBMISSION SEARCH INDEX =============
+
+import re
+import streamlit as st
+import pandas as pd
+from config import *
+
+
+def normalize_text(value):
+    """Lowercase and collapse a name into space separated tokens"""
+    return " ".join(re.findall(r"[a-z0-9]+", str(value).lower()))
+
+
+def _name_grams(token):
+    """Token-prefix grams plus trigrams of a padded token"""
+    padded = f" {token} "
+    grams = {padded[:2], padded[:3]}
+    grams.update(padded[i:i + 3] for i in range(len(padded) - 2))
+    return grams
+
+
+def _query_grams(token):
+    """Grams that must all be present for a token to match"""
+    padded = f" {token}"
+    if len(token) <= 2:
+        return {padded}
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class SearchIndex:
+    """
+    In-memory index over ITS prefixes and tokenized names.
+    ITS lookups walk a prefix trie, name lookups intersect n-gram postings.
+    """
+
+    def __init__(self, its_values, names):
+        self.its = [str(i) for i in its_values]
+        self.names = [str(n) if pd.notna(n) else "" for n in names]
+        self._words = [tuple(normalize_text(n).split()) for n in self.names]
+        self._order = sorted(range(len(self.its)), key=lambda i: self.its[i])
+        self._rank = {row_id: rank for rank, row_id in enumerate(self._order)}
+
+        # Prefix trie: every node keeps its row ids in ITS order
+        self._trie = {"ids": self._order}
+        for row_id in self._order:
+            node = self._trie
+            for ch in self.its[row_id]:
+                node = node.setdefault(ch, {"ids": []})
+                node["ids"].append(row_id)
+
+        # N-gram postings over name tokens
+        self._grams = {}
+        for row_id in self._order:
+            for token in self._words[row_id]:
+                for gram in _name_grams(token):
+                    postings = self._grams.setdefault(gram, [])
+                    if not postings or postings[-1] != row_id:
+                        postings.append(row_id)
+        self._gram_sets = {g: frozenset(ids) for g, ids in self._grams.items()}
+        self._cache = {}
+
+    def __len__(self):
+        return len(self.its)
+
+    def _its_prefix(self, prefix):
+        node = self._trie
+        for ch in prefix:
+            node = node.get(ch)
+            if node is None:
+                return []
+        return node["ids"]
+
+    def _name_match(self, query):
+        tokens = query.split()
+        postings = []
+        for token in tokens:
+            for gram in _query_grams(token):
+                if gram not in self._grams:
+                    return []
+                postings.append(gram)
+        postings.sort(key=lambda g: len(self._grams[g]))
+        others = [self._gram_sets[g] for g in postings[1:]]
+
+        # Walk the shortest (ITS ordered) posting list and probe the rest
+        ids = self._grams[postings[0]]
+        if others:
+            ids = [i for i in ids if all(i in s for s in others)]
+        if all(len(t) <= 2 for t in tokens):
+            return ids
+        # Trigrams can match across token boundaries, confirm word prefixes
+        return [
+            i for i in ids
+            if all(any(w.startswith(t) for w in self._words[i]) for t in tokens)
+        ]
+
+    def search(self, query):
+        """Return matching row ids (ITS order) for an ITS prefix or name query"""
+        query = normalize_text(query)
+        if not query:
+            return self._order
+        if query.isdigit():
+            return self._its_prefix(query)
+        if query not in self._cache:
+            if len(self._cache) >= 256:
+                self._cache.clear()
+            self._cache[query] = self._name_match(query)
+        return self._cache[query]
+
+    def page(self, query, page=1, page_size=ADMIN_PAGE_SIZE, rank=None):
+        """
+        Return (total matches, ids on the requested page). rank ({its: position})
+        puts those rows first in that order, the rest follow in ITS order.
+        """
+        ids = self.search(query)
+        if rank:
+            ids = sorted(ids, key=lambda i: rank.get(self.its[i], len(rank)))
+        start = (max(1, page) - 1) * page_size
+        return len(ids), ids[start:start + page_size]
+
+
+@st.cache_resource(max_entries=16)
+def get_search_index(index_key, _df):
+    """Build (once per data version and filter) the search index for a frame"""
+    names = _df["name"] if "name" in _df.columns else [""] * len(_df)
+    return SearchIndex(_df["its"].tolist(), names)
+
+
+def show_submission_search(display_df, index_key, rank=None):
+    """
+    Sidebar search box with a paginated result list (ordered by rank when given).
+    Only the current page is sent to the browser. Returns the selected ITS.
+    """
+    index = get_search_index(index_key, display_df)
+
+    query = st.sidebar.text_input(
+        "Search ITS or Name",
+        placeholder="e.g. 3043 or husain",
+        key="search_its_query"
+    )
+
+    # Start from the first page whenever the query changes
+    if st.session_state.get("search_its_prev") != query:
+        st.session_state.search_its_prev = query
+        st.session_state.pop("search_its_page", None)
+
+    total = len(index.search(query))
+    pages = max(1, -(-total // ADMIN_PAGE_SIZE))
+    page = 1
+    if pages > 1:
+        page = st.sidebar.number_input(
+            f"Page (of {pages})",
+            min_value=1,
+            max_value=pages,
+            value=1,
+            step=1,
+            key="search_its_page"
+        )
+    total, ids = index.page(query, int(page), rank=rank)
+
+    if total == 0:
+        st.sidebar.caption("No matching submissions")
+        return None
+
+    st.sidebar.caption(f"{total} match(es)")
+    labels = {index.its[i]: index.names[i] for i in ids}
+    return st.sidebar.selectbox(
+        "Select Submission (ITS)",
+        list(labels),
+        format_func=lambda its: f"{its} — {labels[its]}" if labels[its] else its,
+        key="select_its"
+    )
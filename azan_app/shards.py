@@ -0,0 +1,335 @@
+# ============= SHARDED STORAGE =============
+# Submissions and reviews are stored per season and masjid:
+#
+#     data/<season>/<masjid-slug>/submissions.csv
+#     data/<season>/<masjid-slug>/reviews.csv
+#     data/archive/<season>/<masjid-slug>/<dataset>.csv.gz   (closed seasons)
+#     data/manifest.json
+#
+# Shard paths are derived from (season, masjid), so a write only touches its
+# own shard and never the manifest. The manifest lists the seasons, which one
+# is open, and the immutable archives of closed seasons (with row counts and
+# checksums). Closing a season gzips its shards into the archive in one commit.
+#
+#     python azan_app/shards.py status
+#     python azan_app/shards.py migrate          # split legacy submissions.csv / reviews.csv
+#     python azan_app/shards.py archive 1446     # close a season
+
+import csv
+import gzip
+import hashlib
+import io
+import json
+import re
+import threading
+from config import *
+
+DATA_ROOT = "data"
+MANIFEST_PATH = f"{DATA_ROOT}/manifest.json"
+ARCHIVE_ROOT = f"{DATA_ROOT}/archive"
+SHARDED_DATASETS = ("submissions", "reviews")
+LEGACY_PATHS = {"submissions": "submissions.csv", "reviews": "reviews.csv"}
+
+SHARD_PATH = re.compile(rf"^{DATA_ROOT}/(\d+)/([a-z0-9-]+)/(submissions|reviews)\.csv$")
+
+
+def slug(masjid):
+    """Lower-case, hyphenated shard name: Najmi Masjid -> najmi-masjid"""
+    return re.sub(r"[^a-z0-9]+", "-", str(masjid).lower()).strip("-") or "unknown"
+
+
+def shard_path(dataset, masjid, season=SEASON):
+    """Path of the CSV holding one masjid's rows of a dataset for a season"""
+    return f"{DATA_ROOT}/{season}/{slug(masjid)}/{dataset}.csv"
+
+
+def archive_path(dataset, shard_slug, season):
+    return f"{ARCHIVE_ROOT}/{season}/{shard_slug}/{dataset}.csv.gz"
+
+
+def parse_shard_path(path):
+    """(season, masjid slug, dataset) for a shard path, None for anything else"""
+    match = SHARD_PATH.match(path)
+    return match.groups() if match else None
+
+
+def season_prefix(season=SEASON):
+    return f"{DATA_ROOT}/{season}/"
+
+
+def masjid_for_slug(shard_slug):
+    """Display name of a shard (MASJID_LIST spelling when known)"""
+    for masjid in MASJID_LIST[1:]:
+        if slug(masjid) == shard_slug:
+            return masjid
+    return shard_slug.replace("-", " ").title()
+
+
+# ============= READING =============
+
+_combined = {}  # dataset -> (key, DataFrame); one combined frame per dataset
+
+
+def combine(dataset, shards):
+    """
+    One frame out of {path: (df, sha)} shards, with a key that changes when any
+    shard does. The last combination per dataset is memoised.
+    """
+    import pandas as pd
+
+    parts = sorted((path, df, sha) for path, (df, sha) in shards.items() if sha)
+    if not parts:
+        return pd.DataFrame(), None
+    key = hashlib.sha1("".join(sha for _, _, sha in parts).encode()).hexdigest()
+    cached = _combined.get(dataset)
+    if cached is None or cached[0] != key:
+        frames = [df for _, df, _ in parts if not df.empty]
+        combined = pd.concat(frames, ignore_index=True) if frames else pd.DataFrame()
+        _combined[dataset] = cached = (key, combined)
+    return cached[1], key
+
+
+def select(dataset, shards, masjid=None, season=SEASON):
+    """(df, sha or combined key) of one masjid's shard, or of every shard when masjid is None"""
+    import pandas as pd
+
+    if masjid is not None:
+        return shards.get(shard_path(dataset, masjid, season), (pd.DataFrame(), None))
+    selected = {}
+    for path, table in shards.items():
+        parsed = parse_shard_path(path)
+        if parsed and parsed[0] == str(season) and parsed[2] == dataset:
+            selected[path] = table
+    return combine(dataset, selected)
+
+
+def list_shards(client, season=SEASON, ref=None):
+    """Shard paths of a season present on the branch (one tree call)"""
+    tree = client.list_tree(season_prefix(season), ref=ref)
+    if tree is None:
+        # Truncated listing: fall back to the known masjids
+        return [shard_path(d, m, season) for m in MASJID_LIST[1:] for d in SHARDED_DATASETS]
+    return sorted(path for path in tree if parse_shard_path(path))
+
+
+def load_shards(client, dataset, masjid=None, season=SEASON):
+    """
+    Fetch one masjid's shard (a single request) or all shards of a dataset.
+    Returns (df, sha or combined key) like select().
+    """
+    ensure_migrated(client)
+    if masjid is not None:
+        df, sha, _ = client.get_csv(shard_path(dataset, masjid, season))
+        return df, sha
+    shards = {}
+    for path in list_shards(client, season):
+        if parse_shard_path(path)[2] == dataset:
+            df, sha, _ = client.get_csv(path)
+            shards[path] = (df, sha)
+    return select(dataset, shards, None, season)
+
+
+def legacy_files(client, ref=None):
+    """Legacy single-file CSVs still on the branch (ensure_migrated() moves them into shards)"""
+    return [path for path in LEGACY_PATHS.values() if client.get_file(path, ref=ref)[0] is not None]
+
+
+def read_manifest(client, ref=None):
+    """Manifest dict (an empty one when the repo has none yet)"""
+    content, sha, _ = client.get_file(MANIFEST_PATH, ref=ref)
+    if not content:
+        return {"version": 1, "current_season": SEASON, "seasons": {}}, None
+    return json.loads(content), sha
+
+
+def read_archive(client, dataset, masjid, season):
+    """DataFrame of an archived (closed season) shard"""
+    import pandas as pd
+
+    content, _, _ = client.get_file(archive_path(dataset, slug(masjid), season))
+    if not content:
+        return pd.DataFrame()
+    return pd.read_csv(io.BytesIO(gzip.decompress(content)))
+
+
+# ============= MAINTENANCE =============
+
+def _manifest_blob(client, manifest):
+    return client.create_blob((json.dumps(manifest, indent=2, sort_keys=True) + "\n").encode())
+
+
+def migrate_legacy(client, season=SEASON):
+    """
+    Split the legacy single submissions.csv / reviews.csv into masjid shards of
+    a season, write the manifest and delete the legacy files, in one commit.
+    Reviews go to the shard of the submission they review. Shards that already
+    exist at head are merged, not replaced: their rows win per ITS, so nothing
+    written to the shards since deployment is lost.
+    """
+    import pandas as pd
+
+    def read(path):
+        content, _, _ = client.get_file(path, ref=head)
+        if content is None:
+            return None
+        return pd.read_csv(io.BytesIO(content), dtype=str, keep_default_na=False) if content else pd.DataFrame()
+
+    head, _ = client.get_head()
+    legacy = {dataset: read(path) for dataset, path in LEGACY_PATHS.items()}
+    present = [LEGACY_PATHS[dataset] for dataset, df in legacy.items() if df is not None]
+    if not present:
+        raise ValueError("No legacy submissions.csv / reviews.csv to migrate")
+    existing = {dataset: [] for dataset in SHARDED_DATASETS}
+    for path in list_shards(client, season, ref=head):
+        df = read(path)
+        if df is not None and not df.empty:
+            _, shard_slug, dataset = parse_shard_path(path)
+            existing[dataset].append(df.assign(_slug=shard_slug))
+
+    def merged(dataset, slug_of):
+        """Legacy rows keyed to their shard plus the shard rows, which win per ITS"""
+        frames = []
+        df = legacy[dataset]
+        in_shards = {its for shard in existing[dataset] for its in shard["its"]}
+        if df is not None and not df.empty:
+            df = df[~df["its"].isin(in_shards)]
+            slugs = slug_of(df)
+            if slugs.isna().any():
+                raise ValueError(f"{int(slugs.isna().sum())} legacy {dataset} rows have no matching submission")
+            frames.append(df.assign(_slug=slugs))
+        frames += existing[dataset]
+        if not frames:
+            return pd.DataFrame(columns=["its", "_slug"])
+        return pd.concat(frames, ignore_index=True).fillna("")
+
+    submissions = merged("submissions", lambda df: df["masjid"].map(slug))
+    slug_by_its = dict(zip(submissions["its"], submissions["_slug"]))
+    reviews = merged("reviews", lambda df: df["its"].map(slug_by_its))
+
+    files, counts = {}, {}
+    for dataset, rows in (("submissions", submissions), ("reviews", reviews)):
+        for shard_slug, group in rows.groupby("_slug", sort=True):
+            files[shard_path(dataset, shard_slug, season)] = group.drop(columns="_slug")
+            counts.setdefault(shard_slug, {"masjid": masjid_for_slug(shard_slug)})[dataset] = len(group)
+
+    manifest, _ = read_manifest(client, ref=head)
+    manifest["current_season"] = season
+    manifest["seasons"].setdefault(season, {})["status"] = "open"
+    manifest["seasons"][season]["shards"] = counts
+
+    tree = {path: client.create_blob(rows.to_csv(index=False).encode()) for path, rows in files.items()}
+    tree.update({path: None for path in present})
+    tree[MANIFEST_PATH] = _manifest_blob(client, manifest)
+    commit = client.commit_tree(tree, f"Split submissions and reviews into {season} masjid shards", head)
+    if commit is None:
+        raise RuntimeError("Branch moved during the migration, run it again")
+    return commit, counts
+
+
+_migration_checked = False
+_migration_lock = threading.Lock()
+
+
+def ensure_migrated(client, season=SEASON, attempts=3):
+    """
+    Migrate the legacy files once, before anything reads or writes the shards.
+    Checked once per process (two contents calls); returns the migration
+    commit, None when there was nothing to migrate.
+    """
+    global _migration_checked
+    if _migration_checked:
+        return None
+    with _migration_lock:
+        if _migration_checked:
+            return None
+        commit = None
+        for attempt in range(attempts):
+            if not legacy_files(client):
+                break
+            try:
+                commit, _ = migrate_legacy(client, season)
+                break
+            except RuntimeError:
+                if attempt == attempts - 1:
+                    raise  # the branch kept moving: checked again on the next call
+        _migration_checked = True
+        return commit
+
+
+def archive_season(client, season):
+    """
+    Close a season: gzip each of its shards into data/archive/, delete the
+    live shards and record the archives in the manifest, in one commit.
+    """
+    if str(season) == str(SEASON):
+        raise ValueError(f"{season} is the open season (SEASON in config.py)")
+
+    head, _ = client.get_head()
+    manifest, _ = read_manifest(client, ref=head)
+    entry = manifest["seasons"].get(str(season), {})
+    if entry.get("status") == "archived":
+        raise ValueError(f"Season {season} is already archived")
+
+    tree, archived = {}, {}
+    for path in list_shards(client, season, ref=head):
+        _, shard_slug, dataset = parse_shard_path(path)
+        content, _, _ = client.get_file(path, ref=head)
+        content = content or b""
+        packed = gzip.compress(content, compresslevel=9, mtime=0)
+        target = archive_path(dataset, shard_slug, season)
+        tree[target] = client.create_blob(packed)
+        tree[path] = None
+        archived.setdefault(shard_slug, {"masjid": masjid_for_slug(shard_slug)})[dataset] = {
+            "path": target,
+            "rows": max(0, sum(1 for _ in csv.reader(io.StringIO(content.decode()))) - 1),
+            "bytes": len(content),
+            "compressed_bytes": len(packed),
+            "sha256": hashlib.sha256(content).hexdigest(),
+        }
+    if not archived:
+        raise ValueError(f"No shards found for season {season}")
+
+    manifest["seasons"][str(season)] = {"status": "archived", "shards": archived}
+    manifest["current_season"] = SEASON
+    tree[MANIFEST_PATH] = _manifest_blob(client, manifest)
+    commit = client.commit_tree(tree, f"Archive season {season}", head)
+    if commit is None:
+        raise RuntimeError("Branch moved during archiving, run it again")
+    return commit, archived
+
+
+# ============= COMMAND LINE =============
+
+def main():
+    import argparse
+    import streamlit as st
+    from github_client import GitHubRepo
+
+    parser = argparse.ArgumentParser(description="Sharded storage maintenance")
+    commands = parser.add_subparsers(dest="command", required=True)
+    commands.add_parser("status", help="print the manifest")
+    migrate = commands.add_parser("migrate", help="split legacy submissions.csv / reviews.csv")
+    migrate.add_argument("--season", default=SEASON)
+    archive = commands.add_parser("archive", help="close a season into compressed archives")
+    archive.add_argument("season")
+    args = parser.parse_args()
+
+    # [github] credentials from .streamlit/secrets.toml, like the app
+    client = GitHubRepo.from_secrets(st.secrets)
+    if args.command == "status":
+        manifest, _ = read_manifest(client)
+        print(json.dumps(manifest, indent=2, sort_keys=True))
+        legacy = legacy_files(client)
+        if legacy:
+            print(f"Not migrated yet: {', '.join(legacy)} (run: python azan_app/shards.py migrate)")
+    elif args.command == "migrate":
+        commit, counts = migrate_legacy(client, args.season)
+        print(f"Migrated into {len(counts)} shards as {commit[:7]}")
+        print(json.dumps(counts, indent=2, sort_keys=True))
+    else:
+        commit, archived = archive_season(client, args.season)
+        print(f"Archived {len(archived)} shards of {args.season} as {commit[:7]}")
+
+
+if __name__ == "__main__":
+    main()
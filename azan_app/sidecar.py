@@ -0,0 +1,115 @@
+# ============= SIDECAR HTTP SERVER =============
+# Streamlit owns the app's HTTP server and has no hook for extra routes, so
+# machine-facing endpoints (metrics, ...) are served by a small threaded HTTP
+# server started once per process on its own port.
+
+import json
+import threading
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from urllib.parse import urlparse, parse_qs
+import streamlit as st
+from config import *
+import metrics
+
+_routes = {}  # (method, path) -> handler(request) -> (status, body, content type[, headers])
+
+
+def route(path, method="GET"):
+    """Register a handler; it gets a Request and returns (status, body, content_type[, headers])"""
+    def decorator(handler):
+        _routes[(method, path)] = handler
+        return handler
+    return decorator
+
+
+class Request:
+    """What a route handler sees of the HTTP request"""
+
+    def __init__(self, method, path, query, headers, body):
+        self.method = method
+        self.path = path
+        self.query = query
+        self.headers = headers
+        self.body = body
+
+    def json(self):
+        return json.loads(self.body or b"{}")
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    # Headers and body go out in one buffered write (flushed per request), and
+    # without Nagle a keep-alive client is not held up by delayed ACKs
+    wbufsize = 64 * 1024
+    disable_nagle_algorithm = True
+
+    def log_message(self, *args):
+        pass
+
+    def _dispatch(self, method):
+        url = urlparse(self.path)
+        handler = _routes.get((method, url.path))
+        if handler is None:
+            return self._send(404, {"error": "not found"})
+        length = int(self.headers.get("Content-Length") or 0)
+        request = Request(method, url.path, parse_qs(url.query), self.headers, self.rfile.read(length))
+        try:
+            result = handler(request)
+        except Exception as e:
+            return self._send(500, {"error": str(e)})
+        self._send(*result)
+
+    def _send(self, status, body, content_type="application/json", headers=None):
+        if isinstance(body, (dict, list)):
+            body = json.dumps(body).encode()
+        elif isinstance(body, str):
+            body = body.encode()
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+        self.end_headers()
+        if self.command != "HEAD" and status != 304:
+            self.wfile.write(body)
+
+    def do_GET(self):
+        self._dispatch("GET")
+
+    def do_HEAD(self):
+        self._dispatch("GET")
+
+    def do_POST(self):
+        self._dispatch("POST")
+
+
+def serve(host, port, name="sidecar"):
+    """Serve the registered routes from a daemon thread, None if the port is taken"""
+    try:
+        server = ThreadingHTTPServer((host, port), _Handler)
+    except OSError:
+        return None
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name=name, daemon=True).start()
+    return server
+
+
+@st.cache_resource
+def start_sidecar(host=SIDECAR_HOST, port=SIDECAR_PORT):
+    """Serve the registered routes in a daemon thread (once per process), None if disabled"""
+    if not port:
+        return None
+    # Port taken (e.g. a second Streamlit process): this process goes without
+    return serve(host, port)
+
+
+# ============= METRICS ROUTES =============
+
+@route("/metrics")
+def _prometheus(request):
+    return 200, metrics.prometheus_text(), "text/plain; version=0.0.4; charset=utf-8"
+
+
+@route("/metrics.json")
+def _metrics_json(request):
+    return 200, metrics.snapshot(), "application/json"
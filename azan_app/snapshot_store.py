@@ -0,0 +1,162 @@
+# ============= ON-DISK SNAPSHOT =============
+# The background refresher's tables (parsed shards plus their raw text) and
+# the audio listing are saved as Feather files next to the app, so a restarted
+# process starts from the last synced commit instead of cold. The manifest
+# stamps the format, repo, branch, season and commit; a snapshot that does not
+# match is ignored. After a restore the refresher revalidates in the
+# background with a single compare from the saved commit.
+#
+#     .snapshot/manifest.json
+#     .snapshot/<blob sha>.feather    parsed shard
+#     .snapshot/<blob sha>.csv        raw shard text (keeps delta patches working)
+#     .snapshot/audio-<digest>.feather
+#     .snapshot/frames/<name>-<key>.feather   derived caches (save_frame)
+#
+# Files are named by content, so unchanged shards are never rewritten and
+# the manifest is swapped in last, with os.replace.
+
+import hashlib
+import json
+import logging
+import os
+import time
+from config import *
+
+logger = logging.getLogger(__name__)
+
+SNAPSHOT_FORMAT = 1
+MANIFEST = "manifest.json"
+
+
+def _stamp(client):
+    return {"format": SNAPSHOT_FORMAT, "repo": client.repo, "branch": client.branch, "season": SEASON}
+
+
+def _audio_digest(audio):
+    return hashlib.sha1("".join(f"{p}:{i['sha']}\n" for p, i in sorted(audio.items())).encode()).hexdigest()
+
+
+def _write_feather(df, path):
+    tmp = f"{path}.tmp"
+    df.reset_index(drop=True).to_feather(tmp)
+    os.replace(tmp, path)
+
+
+def save(client, commit, tables, audio, directory=SNAPSHOT_DIR):
+    """
+    Persist {path: (df, raw bytes, blob sha)} tables and the audio listing
+    synced at commit. Returns True when the manifest was written.
+    """
+    import pandas as pd
+
+    os.makedirs(directory, exist_ok=True)
+    manifest = {**_stamp(client), "commit": commit, "saved_at": time.time(), "tables": {}, "audio": None}
+    try:
+        for path, (df, content, sha) in tables.items():
+            if not os.path.exists(os.path.join(directory, f"{sha}.csv")):
+                _write_feather(df, os.path.join(directory, f"{sha}.feather"))
+                with open(os.path.join(directory, f"{sha}.csv.tmp"), "wb") as f:
+                    f.write(content)
+                os.replace(os.path.join(directory, f"{sha}.csv.tmp"), os.path.join(directory, f"{sha}.csv"))
+            manifest["tables"][path] = sha
+
+        if audio is not None:
+            name = f"audio-{_audio_digest(audio)}.feather"
+            if not os.path.exists(os.path.join(directory, name)):
+                _write_feather(pd.DataFrame({
+                    "path": list(audio),
+                    "sha": [i["sha"] for i in audio.values()],
+                    "size": pd.array([i.get("size") for i in audio.values()], dtype="Int64"),
+                }), os.path.join(directory, name))
+            manifest["audio"] = name
+    except Exception:
+        # e.g. a column with mixed types Arrow cannot store: keep the old snapshot
+        logger.exception("Could not write the snapshot")
+        return False
+
+    tmp = os.path.join(directory, f"{MANIFEST}.tmp")
+    with open(tmp, "w") as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+    os.replace(tmp, os.path.join(directory, MANIFEST))
+    _prune(directory, manifest)
+    return True
+
+
+def _prune(directory, manifest):
+    """Remove shard and audio files the manifest no longer refers to"""
+    keep = {MANIFEST, manifest["audio"]}
+    for sha in manifest["tables"].values():
+        keep.update((f"{sha}.feather", f"{sha}.csv"))
+    for name in os.listdir(directory):
+        if name not in keep and os.path.isfile(os.path.join(directory, name)):
+            try:
+                os.remove(os.path.join(directory, name))
+            except OSError:
+                pass
+
+
+def load(client, directory=SNAPSHOT_DIR):
+    """
+    (manifest, {path: (df, raw bytes, blob sha)}, audio listing) of the saved
+    snapshot, or None when there is none or it was written for another
+    format, repo, branch or season.
+    """
+    import pandas as pd
+
+    try:
+        with open(os.path.join(directory, MANIFEST)) as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if any(manifest.get(key) != value for key, value in _stamp(client).items()):
+        logger.info("Ignoring snapshot written for %s", {k: manifest.get(k) for k in _stamp(client)})
+        return None
+
+    try:
+        tables = {}
+        for path, sha in manifest["tables"].items():
+            df = pd.read_feather(os.path.join(directory, f"{sha}.feather"))
+            with open(os.path.join(directory, f"{sha}.csv"), "rb") as f:
+                tables[path] = (df, f.read(), sha)
+
+        audio = None
+        if manifest.get("audio"):
+            listing = pd.read_feather(os.path.join(directory, manifest["audio"]))
+            sizes = listing["size"].astype(object).where(listing["size"].notna(), None)
+            audio = {
+                path: {"sha": sha, "size": size}
+                for path, sha, size in zip(listing["path"], listing["sha"], sizes)
+            }
+    except Exception:
+        logger.exception("Snapshot is unreadable, starting cold")
+        return None
+    return manifest, tables, audio
+
+
+# ============= DERIVED CACHES =============
+# Anything computed from the data (features, thumbnails, ...) that is worth
+# keeping across restarts, stored as one DataFrame per name and key.
+
+def save_frame(name, key, df, directory=SNAPSHOT_DIR):
+    """Persist df as the cache name for key (e.g. a data sha), replacing older keys"""
+    folder = os.path.join(directory, "frames")
+    os.makedirs(folder, exist_ok=True)
+    target = f"{name}-{key}.feather"
+    _write_feather(df, os.path.join(folder, target))
+    for other in os.listdir(folder):
+        if other.startswith(f"{name}-") and other != target:
+            try:
+                os.remove(os.path.join(folder, other))
+            except OSError:
+                pass
+
+
+def load_frame(name, key, directory=SNAPSHOT_DIR):
+    """The cache name saved for key, or None"""
+    import pandas as pd
+
+    path = os.path.join(directory, "frames", f"{name}-{key}.feather")
+    try:
+        return pd.read_feather(path)
+    except (OSError, ValueError):
+        return None
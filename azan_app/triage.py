@@ -0,0 +1,319 @@
+# ============= REVIEWER TRIAGE =============
+# Pre-ranks pending submissions by how likely their recordings are to be
+# Approved, so reviewers can start with the strongest (or least certain)
+# ones instead of ITS order.
+#
+# * Features (numpy only): MFCC mean / spread / delta of the voiced frames,
+#   plus duration, silence ratio, loudness and clipping of each recording.
+# * Features are keyed by the recording's git blob sha (the same whether the
+#   file is loose or packed) and cached on disk in the snapshot directory,
+#   so a run only decodes recordings it has not seen before.
+# * Model: L2-regularised softmax regression over the REVIEW_STATUSES
+#   labels in reviews. A submission's score is the mean over its
+#   recordings of the expected quality (Approved 1, Needs Improvement 0.5,
+#   Not Okay 0); confidence is the probability of the predicted status.
+#
+#     python azan_app/triage.py              # cross-validated accuracy + ranking
+
+from functools import lru_cache
+from concurrent.futures import ThreadPoolExecutor
+from config import *
+from audio_packs import AUDIO_COLUMNS
+from wav_info import read_samples
+
+FEATURE_VERSION = "mfcc-v1"  # bump when the extraction changes
+N_MFCC = 13
+N_MELS = 26
+FRAME_SECONDS = 0.025
+HOP_SECONDS = 0.010
+SILENCE_DB = 40  # frames this far below the loudest frame count as silence
+FEATURE_NAMES = (
+    [f"mfcc{i}_mean" for i in range(N_MFCC)]
+    + [f"mfcc{i}_std" for i in range(N_MFCC)]
+    + [f"mfcc{i}_delta" for i in range(N_MFCC)]
+    + ["duration", "silence_ratio", "rms_db", "clipping"]
+)
+STATUS_QUALITY = {"Approved": 1.0, "Needs Improvement": 0.5, "Not Okay": 0.0}
+
+
+# ============= FEATURES =============
+
+def decode_wav(data):
+    """(mono float32 samples in [-1, 1], sample rate) of a PCM or float WAV"""
+    import numpy as np
+
+    samples, info = read_samples(data)
+    return samples.mean(axis=1, dtype=np.float32), info.rate
+
+
+@lru_cache(maxsize=8)
+def _mel_filterbank(rate, n_fft):
+    import numpy as np
+
+    def to_mel(hz):
+        return 2595 * np.log10(1 + hz / 700)
+
+    points = 700 * (10 ** (np.linspace(0, to_mel(rate / 2), N_MELS + 2) / 2595) - 1)
+    bins = np.floor((n_fft + 1) * points / rate).astype(int)
+    bank = np.zeros((N_MELS, n_fft // 2 + 1), dtype=np.float32)
+    for m in range(1, N_MELS + 1):
+        left, centre, right = bins[m - 1], bins[m], bins[m + 1]
+        if centre > left:
+            bank[m - 1, left:centre] = (np.arange(left, centre) - left) / (centre - left)
+        if right > centre:
+            bank[m - 1, centre:right] = (right - np.arange(centre, right)) / (right - centre)
+    return bank
+
+
+@lru_cache(maxsize=1)
+def _dct_matrix():
+    """Orthonormal DCT-II, N_MFCC x N_MELS"""
+    import numpy as np
+
+    n = np.arange(N_MELS)
+    matrix = np.cos(np.pi / N_MELS * (n + 0.5)[None, :] * np.arange(N_MFCC)[:, None])
+    matrix[0] *= 1 / np.sqrt(2)
+    return (matrix * np.sqrt(2 / N_MELS)).astype(np.float32)
+
+
+def recording_features(data):
+    """Feature vector (FEATURE_NAMES order) of one WAV"""
+    import numpy as np
+
+    samples, rate = decode_wav(data)
+    frame = int(rate * FRAME_SECONDS)
+    hop = int(rate * HOP_SECONDS)
+    if len(samples) < frame:
+        samples = np.pad(samples, (0, frame - len(samples)))
+    emphasised = np.append(samples[:1], samples[1:] - 0.97 * samples[:-1])
+    frames = np.lib.stride_tricks.sliding_window_view(emphasised, frame)[::hop] * np.hamming(frame).astype(np.float32)
+    n_fft = 1 << (frame - 1).bit_length()
+    power = np.abs(np.fft.rfft(frames, n_fft)) ** 2 / n_fft
+
+    energy_db = 10 * np.log10(power.sum(axis=1) + 1e-12)
+    voiced = energy_db > energy_db.max() - SILENCE_DB
+    mel = np.log(power @ _mel_filterbank(rate, n_fft).T + 1e-10)
+    mfcc = mel @ _dct_matrix().T
+    active = mfcc[voiced] if voiced.sum() > 2 else mfcc
+    delta = np.abs(np.diff(active, axis=0)).mean(axis=0) if len(active) > 1 else np.zeros(N_MFCC)
+
+    rms = np.sqrt(np.mean(samples ** 2)) if len(samples) else 0.0
+    return np.concatenate([
+        active.mean(axis=0), active.std(axis=0), delta,
+        [len(samples) / rate, 1 - voiced.mean(), 20 * np.log10(rms + 1e-9), np.mean(np.abs(samples) > 0.99)],
+    ]).astype(np.float32)
+
+
+def load_feature_cache():
+    """DataFrame of cached feature vectors indexed by blob sha"""
+    import pandas as pd
+    import snapshot_store
+
+    cached = snapshot_store.load_frame("triage_features", FEATURE_VERSION) if SNAPSHOT_DIR else None
+    if cached is None:
+        return pd.DataFrame(columns=FEATURE_NAMES, dtype="float32").rename_axis("sha")
+    return cached.set_index("sha")
+
+
+def extract_features(client, recordings, tree, packed, workers=8):
+    """
+    Feature rows (indexed by sha) of recordings {path: blob sha}, decoding only
+    the shas missing from the on-disk cache. Unreadable recordings are skipped.
+    """
+    import pandas as pd
+    import snapshot_store
+    from audio_packs import read_recording
+
+    cache = load_feature_cache()
+    todo = {}
+    for path, sha in recordings.items():
+        if sha not in cache.index:
+            todo.setdefault(sha, path)
+
+    def extract(item):
+        sha, path = item
+        try:
+            return sha, recording_features(read_recording(client, path, tree, packed))
+        except Exception:
+            return sha, None
+
+    if todo:
+        with ThreadPoolExecutor(workers) as pool:
+            fresh = {sha: vector for sha, vector in pool.map(extract, todo.items()) if vector is not None}
+        if fresh:
+            new = pd.DataFrame.from_dict(fresh, orient="index", columns=FEATURE_NAMES).rename_axis("sha")
+            cache = pd.concat([cache, new]) if len(cache) else new
+            if SNAPSHOT_DIR:
+                snapshot_store.save_frame("triage_features", FEATURE_VERSION, cache.reset_index())
+    return cache.loc[cache.index.intersection(list(set(recordings.values())))]
+
+
+def recording_table(submissions, recordings):
+    """its, path, sha of every submission recording that exists"""
+    import pandas as pd
+
+    parts = []
+    for column in AUDIO_COLUMNS:
+        if column in submissions.columns:
+            parts.append(pd.DataFrame({"its": submissions["its"].astype(str), "path": submissions[column]}))
+    table = pd.concat(parts, ignore_index=True) if parts else pd.DataFrame(columns=["its", "path"])
+    table = table.assign(sha=table["path"].map(recordings))
+    return table.dropna(subset=["sha"]).reset_index(drop=True)
+
+
+# ============= MODEL =============
+
+class TriageModel:
+    """Standardised softmax regression"""
+
+    def __init__(self, l2=0.3, iterations=400, learning_rate=0.5):
+        self.l2 = l2
+        self.iterations = iterations
+        self.learning_rate = learning_rate
+
+    def fit(self, X, labels):
+        import numpy as np
+
+        self.classes = [s for s in REVIEW_STATUSES if s in set(labels)]
+        y = np.array([self.classes.index(label) for label in labels])
+        self.mean = X.mean(axis=0)
+        self.scale = X.std(axis=0) + 1e-6
+        Z = (X - self.mean) / self.scale
+        onehot = np.eye(len(self.classes))[y]
+        self.weights = np.zeros((Z.shape[1], len(self.classes)))
+        self.bias = np.zeros(len(self.classes))
+        for _ in range(self.iterations):
+            error = (self._softmax(Z) - onehot) / len(Z)
+            self.weights -= self.learning_rate * (Z.T @ error + self.l2 * self.weights)
+            self.bias -= self.learning_rate * error.sum(axis=0)
+        return self
+
+    def _softmax(self, Z):
+        import numpy as np
+
+        logits = Z @ self.weights + self.bias
+        logits -= logits.max(axis=1, keepdims=True)
+        p = np.exp(logits)
+        return p / p.sum(axis=1, keepdims=True)
+
+    def predict_proba(self, X):
+        return self._softmax((X - self.mean) / self.scale)
+
+    def quality(self, proba):
+        import numpy as np
+
+        return proba @ np.array([STATUS_QUALITY[c] for c in self.classes])
+
+
+def labelled(table, reviews):
+    """Recording table rows of reviewed submissions with their status"""
+    if reviews.empty or "its" not in reviews.columns:  # a masjid without a reviews shard yet
+        return table.iloc[:0].assign(status=None)
+    status = reviews.assign(its=reviews["its"].astype(str)).drop_duplicates("its", keep="last")
+    status = status.set_index("its")["status"]
+    table = table.assign(status=table["its"].map(status))
+    return table[table["status"].isin(REVIEW_STATUSES)]
+
+
+def train(table, reviews, features):
+    """TriageModel fitted on every reviewed recording, None with fewer than two statuses"""
+    rows = labelled(table, reviews)
+    rows = rows[rows["sha"].isin(features.index)]
+    if rows["status"].nunique() < 2:
+        return None
+    X = features.loc[rows["sha"]].to_numpy(dtype="float64")
+    return TriageModel().fit(X, rows["status"].tolist())
+
+
+def score(model, table, features):
+    """Per submission: its, quality, predicted, confidence (mean over its recordings)"""
+    import pandas as pd
+
+    rows = table[table["sha"].isin(features.index)]
+    if model is None or rows.empty:
+        return pd.DataFrame(columns=["its", "quality", "predicted", "confidence"])
+    proba = model.predict_proba(features.loc[rows["sha"]].to_numpy(dtype="float64"))
+    per_recording = pd.DataFrame(proba, columns=model.classes).assign(its=rows["its"].to_numpy())
+    mean = per_recording.groupby("its", sort=False).mean()
+    return pd.DataFrame({
+        "its": mean.index,
+        "quality": model.quality(mean.to_numpy()),
+        "predicted": mean.idxmax(axis=1).to_numpy(),
+        "confidence": mean.max(axis=1).to_numpy(),
+    }).reset_index(drop=True)
+
+
+def rank_pending(submissions, reviews, features, table):
+    """Scores of the submissions without a review, best first"""
+    import pandas as pd
+
+    if reviews.empty or "its" not in reviews.columns:
+        return pd.DataFrame(columns=["its", "quality", "predicted", "confidence"])
+    model = train(table, reviews, features)
+    reviewed = set(reviews["its"].astype(str))
+    pending = table[~table["its"].isin(reviewed)]
+    return score(model, pending, features).sort_values("quality", ascending=False, ignore_index=True)
+
+
+def cross_validate(table, reviews, features, folds=5):
+    """Accuracy of k-fold cross-validation by submission (a submission's recordings stay together)"""
+    import numpy as np
+
+    rows = labelled(table, reviews)
+    rows = rows[rows["sha"].isin(features.index)]
+    its = rows["its"].unique()
+    if len(its) < folds:
+        folds = len(its)
+    fold_of = {i: n % folds for n, i in enumerate(np.random.default_rng(0).permutation(its))}
+    correct = total = 0
+    truth = rows.drop_duplicates("its").set_index("its")["status"]
+    for k in range(folds):
+        test = rows["its"].map(fold_of) == k
+        model = train(rows[~test], reviews, features)
+        if model is None:
+            continue
+        scored = score(model, rows[test], features)
+        correct += int((scored["predicted"].to_numpy() == truth.loc[scored["its"]].to_numpy()).sum())
+        total += len(scored)
+    return correct / total if total else None
+
+
+# ============= COMMAND LINE =============
+
+def main():
+    import argparse
+    import time
+    import streamlit as st
+    from github_client import GitHubRepo
+    from shards import load_shards
+    from audio_gc import load_packed
+
+    parser = argparse.ArgumentParser(description="Rank pending submissions by predicted review status")
+    parser.add_argument("--folds", type=int, default=5)
+    parser.add_argument("--out", help="write the ranking to this CSV")
+    args = parser.parse_args()
+
+    # [github] credentials from .streamlit/secrets.toml, like the app
+    client = GitHubRepo.from_secrets(st.secrets)
+    submissions, _ = load_shards(client, "submissions")
+    reviews, _ = load_shards(client, "reviews")
+    tree = client.list_tree("audio/") or {}
+    packed = load_packed(client, tree)
+    recordings = {path: item["sha"] for path, item in tree.items()}
+    recordings.update({path: entry["sha"] for path, entry in packed.items()})
+
+    table = recording_table(submissions, recordings)
+    started = time.perf_counter()
+    features = extract_features(client, dict(zip(table["path"], table["sha"])), tree, packed)
+    print(f"Features of {len(features)} recordings in {time.perf_counter() - started:.1f}s")
+    accuracy = cross_validate(table, reviews, features, args.folds)
+    print(f"{args.folds}-fold accuracy: {accuracy:.0%}" if accuracy is not None else "Not enough reviews to validate")
+
+    ranking = rank_pending(submissions, reviews, features, table)
+    print(ranking.to_string(index=False, max_rows=50))
+    if args.out:
+        ranking.to_csv(args.out, index=False)
+
+
+if __name__ == "__main__":
+    main()
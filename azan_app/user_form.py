@@ -6,11 +6,24 @@ from audio_recorder_streamlit import audio_recorder
 from config import *
 from utils import *
 from datetime import datetime
+from metrics import timed
 
-def show_form():
-    """Display main user registration form"""
-    st.subheader("📝 Your Information")
+# Each fragment below reruns on its own when one of its widgets changes:
+# typing a name does not re-run the recorders, the CSS/background injection
+# or the admin sidebar. A full rerun only happens on the checkboxes and the
+# Review / Submit buttons.
 
+def its_registered(its):
+    """Whether an ITS is already registered; looked up once per ITS value in a session"""
+    checked = st.session_state.get("its_lookup")
+    if checked is None or checked[0] != its:
+        checked = st.session_state.its_lookup = (its, its in load_existing_its())
+    return checked[1]
+
+
+@st.fragment
+def show_identity_fields():
+    """Name, ITS, WhatsApp and Masjid fields with inline validation"""
     # NAME FIELD
     name = st.text_input(
         "Aapnu Full Name *",
@@ -18,7 +31,6 @@ def show_form():
         key="input_name"
     )
 
-    name_valid = False
     if name:
         name_valid, name_error = validate_field(
             "Name",
@@ -40,19 +52,12 @@ def show_form():
         max_chars=8
     )
 
-    its_valid = False
     if its:
-        existing_its = load_existing_its()
-        its_valid, its_error = validate_field(
-            "ITS",
-            its,
-            {
-                'pattern': VALIDATION_RULES["its"]["pattern"],
-                'custom_check': lambda x: (
-                    False, "ITS already registered"
-                ) if x in existing_its else (True, None)
-            }
-        )
+        # Only a new, well-formed ITS is looked up: other keystrokes in this
+        # fragment reuse the session's answer (show_form checks again on submit)
+        its_valid, its_error = validate_field("ITS", its, VALIDATION_RULES["its"])
+        if its_valid and its_registered(its):
+            its_valid, its_error = False, "ITS already registered"
         if its_valid:
             show_inline_success("its", "Valid & unique")
         else:
@@ -68,7 +73,6 @@ def show_form():
         max_chars=15
     )
 
-    whatsapp_valid = False
     if whatsapp:
         whatsapp_valid, whatsapp_error = validate_field(
             "WhatsApp",
@@ -84,7 +88,7 @@ def show_form():
 
     # MASJID FIELD
     masjid = st.selectbox(
-        "Shehrullah 1447 ma Kai Masjid ma Namaz ada karso? *",
+        f"{SEASON_NAME} ma Kai Masjid ma Namaz ada karso? *",
         MASJID_LIST,
         key="select_masjid"
     )
@@ -94,6 +98,58 @@ def show_form():
     elif masjid:
         show_inline_success("masjid", f"Selected: {masjid}")
 
+
+@st.fragment
+def show_recorder(audio_type, label):
+    """Recorder, playback and status for one recording type"""
+    st.markdown(f"**🎙️ {label} Recording**")
+    st.caption("💡 **Tip:** Tap the button → Allow microphone → Speak clearly → Auto-stops after silence")
+    
+    # Check if we have existing audio
+    existing_audio = get_audio(audio_type)
+    button_text = "🔄 Record Again" if existing_audio else "🎙️ Tap to Record"
+    
+    recorded_audio = audio_recorder(
+        button_text,
+        key=f"{audio_type}_recorder",
+        pause_threshold=AUDIO_PAUSE_THRESHOLD,
+        sample_rate=AUDIO_SAMPLE_RATE
+    )
+    
+    # Save audio if recorded
+    if recorded_audio is not None:
+        set_audio(audio_type, recorded_audio)
+    
+    # Display saved audio
+    audio = get_audio(audio_type)
+    if audio:
+        st.audio(audio, format="audio/wav")
+        show_inline_success(f"{audio_type}_audio", f"{label} recorded successfully")
+    else:
+        # Show status and error if checkbox selected but no audio
+        st.caption("⏳ No recording yet")
+        show_inline_error(
+            f"{audio_type}_audio",
+            f"🎙️ {label} recording is required - please record it above"
+        )
+
+
+@st.fragment
+def show_remarks():
+    """Optional remarks"""
+    st.text_area(
+        "Remarks / Requests (Optional)",
+        placeholder="Any additional information you'd like to share",
+        key="textarea_remarks"
+    )
+
+
+@timed("render.show_form")
+def show_form():
+    """Display main user registration form"""
+    st.subheader("📝 Your Information")
+    show_identity_fields()
+
     # INTERESTS
     st.subheader("🎙️ Recording Preferences")
 
@@ -103,113 +159,37 @@ def show_form():
     if not (interest_azan or interest_takbirah) and st.session_state.validation_errors.get('interests'):
         show_inline_error("interests", st.session_state.validation_errors['interests'])
 
-    # RECORDINGS - Use columns to maintain consistent rendering order
-    azan_audio = None
-    takbirah_audio = None
-
-    # Use st.container to lock widget positions
+    # RECORDINGS - Use st.container to lock widget positions
     with st.container():
-        if interest_azan or interest_takbirah:
-            if interest_azan:
-                st.markdown("**🎙️ Azan Recording**")
-                st.caption("💡 **Tip:** Tap the button → Allow microphone → Speak clearly → Auto-stops after silence")
-                
-                # Check if we have existing audio
-                existing_audio = get_audio("azan")
-                button_text = "🔄 Record Again" if existing_audio else "🎙️ Tap to Record"
-                
-                recorded_audio = audio_recorder(
-                    button_text,
-                    key="azan_recorder",
-                    pause_threshold=AUDIO_PAUSE_THRESHOLD,
-                    sample_rate=AUDIO_SAMPLE_RATE
-                )
-                
-                # Save audio if recorded
-                if recorded_audio is not None:
-                    set_audio("azan", recorded_audio)
-                
-                # Display saved audio
-                azan_audio = get_audio("azan")
-                if azan_audio:
-                    st.audio(azan_audio, format="audio/wav")
-                    show_inline_success("azan_audio", "Azan recorded successfully")
-                else:
-                    # Show error if checkbox selected but no audio
-                    st.caption("⏳ No recording yet")
-            
-            if interest_takbirah:
-                st.markdown("**🎙️ Takbirah Recording**")
-                st.caption("💡 **Tip:** Tap the button → Allow microphone → Speak clearly → Auto-stops after silence")
-                
-                # Check if we have existing audio
-                existing_audio = get_audio("takbirah")
-                button_text = "🔄 Record Again" if existing_audio else "🎙️ Tap to Record"
-                
-                recorded_audio = audio_recorder(
-                    button_text,
-                    key="takbirah_recorder",
-                    pause_threshold=AUDIO_PAUSE_THRESHOLD,
-                    sample_rate=AUDIO_SAMPLE_RATE
-                )
-                
-                # Save audio if recorded
-                if recorded_audio is not None:
-                    set_audio("takbirah", recorded_audio)
-                
-                # Display saved audio
-                takbirah_audio = get_audio("takbirah")
-                if takbirah_audio:
-                    st.audio(takbirah_audio, format="audio/wav")
-                    show_inline_success("takbirah_audio", "Takbirah recorded successfully")
-                else:
-                    # Show status if checkbox selected but no audio
-                    st.caption("⏳ No recording yet")
-    
-    # Get audio for validation (even if not currently displayed)
-    if not interest_azan:
-        azan_audio = get_audio("azan")
-    if not interest_takbirah:
-        takbirah_audio = get_audio("takbirah")
+        if interest_azan:
+            show_recorder("azan", "Azan")
+        if interest_takbirah:
+            show_recorder("takbirah", "Takbirah")
 
     # REMARKS
     st.subheader("📝 Additional Information")
-    remarks = st.text_area(
-        "Remarks / Requests (Optional)",
-        placeholder="Any additional information you'd like to share",
-        key="textarea_remarks"
-    )
+    show_remarks()
+
+    # Field values as of this (full) run, read from the widgets' session state
+    name = st.session_state.get("input_name", "")
+    its = st.session_state.get("input_its", "")
+    whatsapp = st.session_state.get("input_whatsapp", "")
+    masjid = st.session_state.get("select_masjid", "")
+    remarks = st.session_state.get("textarea_remarks", "")
+    azan_audio = get_audio("azan")
+    takbirah_audio = get_audio("takbirah")
+
+    # VALIDATION (field rules from VALIDATION_RULES, compiled once in validation.py)
+    errors = get_validation_schema().form_errors({
+        'name': name,
+        'its': its,
+        'whatsapp': whatsapp,
+        'masjid': masjid,
+    })
 
-    # Always ensure audio variables are defined (get from session state if not set)
-    if azan_audio is None:
-        azan_audio = get_audio("azan")
-    if takbirah_audio is None:
-        takbirah_audio = get_audio("takbirah")
-
-    # VALIDATION
-    errors = {}
-    existing_its = load_existing_its()
-
-    if not name:
-        errors['name'] = "Name is required"
-    elif not name_valid:
-        errors['name'] = "Name must be 6–60 characters"
-
-    if not its:
-        errors['its'] = "ITS is required"
-    elif not its.isdigit() or len(its) != 8:
-        errors['its'] = "ITS must be 8 digits"
-    elif its in existing_its:
+    if 'its' not in errors and its in load_existing_its():
         errors['its'] = "ITS already registered"
 
-    if not whatsapp:
-        errors['whatsapp'] = "WhatsApp number is required"
-    elif not whatsapp_valid:
-        errors['whatsapp'] = "Invalid WhatsApp number (7-15 digits)"
-
-    if not masjid:
-        errors['masjid'] = "Masjid selection is required"
-
     if not (interest_azan or interest_takbirah):
         errors['interests'] = "Select at least one recording interest"
 
@@ -221,13 +201,6 @@ def show_form():
 
     st.session_state.validation_errors = errors
 
-    # SHOW AUDIO VALIDATION ERRORS INLINE (before Review button)
-    if errors.get('azan_audio'):
-        show_inline_error("azan_audio", errors['azan_audio'])
-    
-    if errors.get('takbirah_audio'):
-        show_inline_error("takbirah_audio", errors['takbirah_audio'])
-
     # REVIEW BUTTON
     col_review, col_space = st.columns([1, 1])
 
@@ -257,6 +230,7 @@ def show_form():
     }
 
 
+@timed("render.show_review_screen")
 def show_review_screen(form_data):
     """Display review/confirmation screen"""
     st.subheader("✅ Review Your Submission")
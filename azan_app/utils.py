@@ -1,47 +1,28 @@
 # ============= UTILITY FUNCTIONS =============
+# Imported on every applicant rerun: keep heavy dependencies (pandas,
+# requests) as local imports inside the functions that need them.
 
 import streamlit as st
-import pandas as pd
 import os
 import re
 from datetime import datetime
 from config import *
-
-# ============= CACHING OPTIMIZATIONS =============
-# Cache validation rules to avoid re-computing on every run
-@st.cache_data
-def get_validation_rules():
-    """Get cached validation rules"""
-    return VALIDATION_RULES
+from cache_control import invalidate
+from validation import SCHEMA
+from metrics import span, timed
 
 # ============= VALIDATION FUNCTIONS =============
 
+def get_validation_schema():
+    """Validation rules compiled once per process (see validation.py)"""
+    return SCHEMA
+
+
 def validate_field(field_name, value, rules):
     """
     Validate a single field and return (is_valid, error_message)
     """
-    if rules.get('required') and not value:
-        return False, f"{field_name} is required"
-    
-    if not value:
-        return True, None
-    
-    if rules.get('min_length') and len(value) < rules['min_length']:
-        return False, f"Minimum {rules['min_length']} characters required"
-    
-    if rules.get('max_length') and len(value) > rules['max_length']:
-        return False, f"Maximum {rules['max_length']} characters allowed"
-    
-    if rules.get('pattern'):
-        if not re.match(rules['pattern'], value):
-            return False, "Invalid format"
-    
-    if rules.get('custom_check'):
-        is_valid, msg = rules['custom_check'](value)
-        if not is_valid:
-            return False, msg
-    
-    return True, None
+    return SCHEMA.for_rules(rules).check(value, field_name)
 
 
 def show_inline_error(field_name, error_message):
@@ -102,13 +83,19 @@ def set_audio(audio_type, data):
 
 # ============= DATA FUNCTIONS =============
 
+@timed("load_existing_its")
 def load_existing_its():
     """Load existing ITS numbers from CSV"""
     if not os.path.exists(DATA_FILE):
         return set()
     try:
-        df = pd.read_csv(DATA_FILE)
-        return set(df["its"].astype(str)) if "its" in df.columns else set()
+        # csv module rather than pandas: this runs on the applicant path
+        import csv
+        with open(DATA_FILE, newline="", encoding="utf-8") as f:
+            reader = csv.DictReader(f)
+            if "its" not in (reader.fieldnames or []):
+                return set()
+            return {row["its"].strip() for row in reader if row.get("its")}
     except Exception as e:
         st.warning(f"Could not load existing submissions: {e}")
         return set()
@@ -117,6 +104,9 @@ def load_existing_its():
 def upsert_admin_review(its, status, comment):
     """Save or update admin review with Decision: comment format"""
     try:
+        import pandas as pd
+        from local_store import rewrite_csv
+
         # Format comment as "Decision: comment"
         formatted_comment = f"{status}: {comment}" if comment.strip() else f"{status}: No comments"
         
@@ -127,8 +117,9 @@ def upsert_admin_review(its, status, comment):
             "reviewed_at": datetime.now().isoformat()
         }
 
-        if os.path.exists(REVIEW_FILE):
-            df = pd.read_csv(REVIEW_FILE)
+        def update(df):
+            if df.empty:
+                return pd.DataFrame([new_row])
             # Convert ITS column to string for proper comparison
             df["its"] = df["its"].astype(str)
             mask = (df["its"] == str(its))
@@ -138,13 +129,12 @@ def upsert_admin_review(its, status, comment):
                 df.loc[mask, "status"] = status
                 df.loc[mask, "admin_comment"] = formatted_comment
                 df.loc[mask, "reviewed_at"] = datetime.now().isoformat()
-            else:
-                # Insert new review
-                df = pd.concat([df, pd.DataFrame([new_row])], ignore_index=True)
-        else:
-            df = pd.DataFrame([new_row])
+                return df
+            # Insert new review
+            return pd.concat([df, pd.DataFrame([new_row])], ignore_index=True)
 
-        df.to_csv(REVIEW_FILE, index=False)
+        # Locked read-modify-write with an atomic rename (see local_store.py)
+        rewrite_csv(REVIEW_FILE, update)
     except Exception as e:
         st.error(f"Failed to save review: {e}")
 
@@ -155,6 +145,7 @@ def load_existing_review(its):
         return None
 
     try:
+        import pandas as pd
         df = pd.read_csv(REVIEW_FILE)
         match = df[df["its"] == its]
 
@@ -170,36 +161,29 @@ def load_existing_review(its):
 
 # ============= SUBMISSION FUNCTIONS =============
 
+@st.cache_resource
+def github_repo():
+    """GitHub client built from st.secrets (one per process, imported on first use)"""
+    from github_client import GitHubRepo
+    return GitHubRepo.from_secrets(st.secrets)
+
+
 def upload_audio_to_github(audio_bytes, its_number, audio_type):
     """Upload audio file to GitHub"""
     try:
-        import requests
-        import base64
-        
-        token = st.secrets["github"]["token"]
-        repo = st.secrets["github"]["repo"]
-        
         # Create audio folder path
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
         filename = f"{audio_type}_{its_number}_{timestamp}.wav"
         path = f"audio/{audio_type}/{filename}"
         
-        # GitHub API URL for file upload
-        url = f"https://api.github.com/repos/{repo}/contents/{path}"
-        headers = {"Authorization": f"token {token}"}
-        
-        # Encode audio as base64
-        encoded_audio = base64.b64encode(audio_bytes).decode()
-        
-        data = {
-            "message": f"Add {audio_type} audio from {its_number}",
-            "content": encoded_audio,
-            "branch": "main"
-        }
-        
-        response = requests.put(url, json=data, headers=headers)
+        response = github_repo().put_file(
+            path,
+            audio_bytes,
+            f"Add {audio_type} audio from {its_number}",
+        )
         
         if response.status_code in [201, 200]:
+            invalidate("audio")
             # Return the file path as ID for reference in CSV
             return path
         else:
@@ -212,51 +196,41 @@ def upload_audio_to_github(audio_bytes, its_number, audio_type):
 
 
 def save_submission(row):
-    """Save form submission to GitHub"""
+    """Save form submission to its masjid's shard on GitHub"""
     try:
-        import requests
-        import base64
         import io
+        import pandas as pd
+        from shards import shard_path, ensure_migrated
         
-        token = st.secrets["github"]["token"]
-        repo = st.secrets["github"]["repo"]
-        url = f"https://api.github.com/repos/{repo}/contents/submissions.csv"
-        headers = {"Authorization": f"token {token}"}
-        
-        # Get existing CSV from GitHub
-        resp = requests.get(url, headers=headers)
+        # Get the existing shard from GitHub (one masjid, this season)
+        client = github_repo()
+        ensure_migrated(client)  # legacy rows first, once per process
+        path = shard_path("submissions", row["masjid"])
+        content, sha, _ = client.get_file(path)
         
-        if resp.status_code == 200:
+        if content:
             # File exists - update it
-            sha = resp.json()['sha']
-            csv_content = base64.b64decode(resp.json()['content']).decode()
-            df = pd.read_csv(io.StringIO(csv_content))
+            with span("csv.parse"):
+                df = pd.read_csv(io.BytesIO(content))
         else:
             # File doesn't exist - create new
-            sha = None
             df = pd.DataFrame()
         
         # Add new row
         df = pd.concat([df, pd.DataFrame([row])], ignore_index=True)
         
-        # Convert to CSV
-        csv_string = df.to_csv(index=False)
-        encoded = base64.b64encode(csv_string.encode()).decode()
-        
-        # Prepare GitHub API request
-        data = {
-            "message": f"Add submission from {row['its']} - {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}",
-            "content": encoded,
-            "branch": "main"
-        }
-        
-        if sha:
-            data["sha"] = sha
-        
         # Push to GitHub
-        response = requests.put(url, json=data, headers=headers)
+        response = client.put_file(
+            path,
+            df.to_csv(index=False).encode(),
+            f"Add submission from {row['its']} - {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}",
+            sha=sha,
+        )
         
-        return response.status_code in [201, 200]
+        if response.status_code in [201, 200]:
+            invalidate("submissions")
+            return True
+        return False
     
     except Exception as e:
         st.error(f"Failed to save submission: {e}")
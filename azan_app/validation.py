@@ -0,0 +1,130 @@
+# ============= COMPILED VALIDATION ENGINE =============
+# VALIDATION_RULES is compiled once per process into FieldRule objects
+# (precompiled regexes and plain callables). The same schema validates a
+# single value for the interactive form and whole DataFrame columns for bulk
+# work. pandas is only imported by the column-wise path.
+
+import re
+from config import *
+
+
+class FieldRule:
+    """One compiled entry of VALIDATION_RULES"""
+
+    def __init__(self, field, rules):
+        self.field = field
+        self.label = rules.get("label", field.title())
+        self.required = bool(rules.get("required"))
+        self.min_length = rules.get("min_length")
+        self.max_length = rules.get("max_length")
+        self.regex = re.compile(rules["pattern"]) if rules.get("pattern") else None
+        self.choices = rules.get("choices")
+        self.custom_check = rules.get("custom_check")
+        # Short message used when summarising a form's errors
+        self.message = rules.get("message", "Invalid format")
+
+    def check(self, value, field_name=None):
+        """Validate one value, returns (is_valid, error_message)"""
+        if not value:
+            if self.required:
+                return False, f"{field_name or self.label} is required"
+            return True, None
+
+        if self.min_length and len(value) < self.min_length:
+            return False, f"Minimum {self.min_length} characters required"
+
+        if self.max_length and len(value) > self.max_length:
+            return False, f"Maximum {self.max_length} characters allowed"
+
+        if self.regex is not None and not self.regex.match(value):
+            return False, "Invalid format"
+
+        if self.choices is not None and value not in self.choices:
+            return False, f"Must be one of: {', '.join(self.choices)}"
+
+        if self.custom_check:
+            is_valid, msg = self.custom_check(value)
+            if not is_valid:
+                return False, msg
+
+        return True, None
+
+    def check_series(self, values):
+        """Validate a whole column, returns a Series of error messages ("" = valid)"""
+        import numpy as np
+        import pandas as pd
+
+        values = values.astype("string").fillna("")
+        lengths = values.str.len()
+        empty = lengths == 0
+
+        conditions, messages = [empty & self.required], [f"{self.label} is required"]
+        if self.min_length:
+            conditions.append(~empty & (lengths < self.min_length))
+            messages.append(f"Minimum {self.min_length} characters required")
+        if self.max_length:
+            conditions.append(~empty & (lengths > self.max_length))
+            messages.append(f"Maximum {self.max_length} characters allowed")
+        if self.regex is not None:
+            conditions.append(~empty & ~values.str.match(self.regex).fillna(False).astype(bool))
+            messages.append("Invalid format")
+        if self.choices is not None:
+            conditions.append(~empty & ~values.isin(self.choices))
+            messages.append(f"Must be one of: {', '.join(self.choices)}")
+
+        errors = np.select([c.to_numpy(dtype=bool) for c in conditions], messages, default="")
+        errors = pd.Series(errors, index=values.index, dtype=object)
+
+        if self.custom_check:
+            # Not vectorisable: only visit rows that passed everything else
+            pending = (errors == "") & ~empty
+            for index, value in values[pending].items():
+                is_valid, msg = self.custom_check(value)
+                if not is_valid:
+                    errors[index] = msg
+        return errors
+
+
+class ValidationSchema:
+    """All compiled field rules"""
+
+    def __init__(self, rules):
+        self.rules = rules
+        self.fields = {field: FieldRule(field, spec) for field, spec in rules.items()}
+
+    def __getitem__(self, field):
+        return self.fields[field]
+
+    def for_rules(self, rules):
+        """Compiled rule for a rules dict (reuses the compiled entry for VALIDATION_RULES ones)"""
+        for field, spec in self.rules.items():
+            if spec is rules:
+                return self.fields[field]
+        return FieldRule("field", rules)
+
+    def form_errors(self, values):
+        """{field: summary message} for a dict of form values (only fields present)"""
+        errors = {}
+        for field, value in values.items():
+            rule = self.fields[field]
+            is_valid, _ = rule.check(value)
+            if not is_valid:
+                errors[field] = f"{rule.label} is required" if not value else rule.message
+        return errors
+
+    def validate_frame(self, df, fields=None):
+        """
+        Column-wise validation of a DataFrame.
+        Returns a DataFrame of error messages (same index, one column per field).
+        """
+        import pandas as pd
+
+        fields = list(fields or self.fields)
+        columns = {}
+        for field in fields:
+            column = df[field] if field in df.columns else pd.Series("", index=df.index)
+            columns[field] = self.fields[field].check_series(column)
+        return pd.DataFrame(columns, index=df.index)
+
+
+SCHEMA = ValidationSchema(VALIDATION_RULES)
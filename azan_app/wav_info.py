@@ -0,0 +1,231 @@
+# ============= WAV METADATA =============
+# Duration and format of a recording from its RIFF header only:
+#
+# * local files are mmapped and the chunks walked with struct.unpack_from,
+#   so nothing but the few header bytes is ever read or copied
+# * remote files need one small ranged read (HEADER_PROBE bytes), larger
+#   only when a recorder put big metadata chunks before "data"
+#
+# Headers are content-addressed by git blob sha, so describe() keeps them in
+# a process-wide cache (and on disk in the snapshot directory): listing the
+# durations of a whole masjid only fetches headers it has never seen.
+
+import mmap
+import os
+import struct
+import threading
+from typing import NamedTuple
+from concurrent.futures import ThreadPoolExecutor
+from config import *
+
+HEADER_PROBE = 4096
+HEADER_MAX = 256 * 1024
+PCM, IEEE_FLOAT, EXTENSIBLE = 1, 3, 0xFFFE
+
+
+class IncompleteHeader(Exception):
+    """The header continues past the bytes given; needed is the length to read"""
+
+    def __init__(self, needed):
+        super().__init__(f"WAV header needs {needed} bytes")
+        self.needed = needed
+
+
+class WavInfo(NamedTuple):
+    format: int
+    channels: int
+    rate: int
+    bits: int
+    data_offset: int
+    data_bytes: int
+
+    @property
+    def frames(self):
+        block = self.channels * self.bits // 8
+        return self.data_bytes // block if block else 0
+
+    @property
+    def duration(self):
+        return self.frames / self.rate if self.rate else 0.0
+
+
+def parse_header(buffer, size=None, partial=False):
+    """
+    WavInfo out of the start of a WAV (bytes, memoryview or mmap), without
+    copying it. With partial=True buffer is only the start of a file of the
+    given size (None when unknown: the data chunk's declared length is used).
+    """
+    if not partial:
+        size = len(buffer)
+    if len(buffer) < 12:
+        raise IncompleteHeader(12)
+    if buffer[0:4] != b"RIFF" or buffer[8:12] != b"WAVE":
+        raise ValueError("Not a RIFF/WAVE file")
+    pos, fmt = 12, None
+    while True:
+        if pos + 8 > len(buffer):
+            if size is not None and pos + 8 > size:
+                raise ValueError("No data chunk")
+            raise IncompleteHeader(pos + 8)
+        chunk = bytes(buffer[pos:pos + 4])
+        length = struct.unpack_from("<I", buffer, pos + 4)[0]
+        if chunk == b"fmt ":
+            if pos + 24 > len(buffer):
+                raise IncompleteHeader(pos + 24)
+            fmt = struct.unpack_from("<HHIIHH", buffer, pos + 8)
+            if fmt[0] == EXTENSIBLE and length >= 40:
+                if pos + 34 > len(buffer):
+                    raise IncompleteHeader(pos + 34)
+                fmt = (struct.unpack_from("<H", buffer, pos + 32)[0],) + fmt[1:]  # sub-format GUID
+        elif chunk == b"data":
+            if fmt is None:
+                raise ValueError("data chunk before fmt chunk")
+            start = pos + 8
+            # Streaming recorders leave 0 or 0xFFFFFFFF until the file is closed
+            unset = length in (0, 0xFFFFFFFF)
+            if size is None:
+                data_bytes = 0 if unset else length
+            else:
+                available = max(0, size - start)
+                data_bytes = available if unset else min(length, available)
+            audio_format, channels, rate, _, _, bits = fmt
+            return WavInfo(audio_format, channels, rate, bits, start, data_bytes)
+        pos += 8 + length + (length & 1)
+
+
+def read_local(path):
+    """WavInfo of a file on disk (mmapped, only the header pages are touched)"""
+    with open(path, "rb") as f:
+        size = os.fstat(f.fileno()).st_size
+        if size == 0:
+            raise ValueError("Empty file")
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            return parse_header(mapped)
+
+
+def read_remote(read_range, size=None):
+    """
+    WavInfo from read_range(start, length) -> bytes of a file of the given
+    size (None if unknown); a single read for usual headers
+    """
+    limit = min(size, HEADER_MAX) if size is not None else HEADER_MAX
+    probe = min(HEADER_PROBE, limit)
+    while True:
+        head = read_range(0, probe)
+        try:
+            return parse_header(memoryview(head), size, partial=True)
+        except IncompleteHeader as e:
+            if probe >= limit or len(head) < probe:
+                raise ValueError("Truncated or oversized WAV header") from e
+            probe = min(max(e.needed, probe * 4), limit)
+
+
+def read_samples(data):
+    """(float32 samples in [-1, 1] shaped frames x channels, WavInfo) of a PCM or float WAV"""
+    import numpy as np
+
+    info = parse_header(memoryview(data))
+    frames = memoryview(data)[info.data_offset:info.data_offset + info.frames * info.channels * info.bits // 8]
+    if info.format == IEEE_FLOAT and info.bits == 32:
+        samples = np.frombuffer(frames, dtype="<f4")
+    elif info.format != PCM:
+        raise ValueError(f"Unsupported WAV format {info.format}")
+    elif info.bits == 8:
+        samples = (np.frombuffer(frames, dtype=np.uint8).astype(np.float32) - 128) / 128
+    elif info.bits == 16:
+        samples = np.frombuffer(frames, dtype="<i2").astype(np.float32) / 32768
+    elif info.bits == 32:
+        samples = np.frombuffer(frames, dtype="<i4").astype(np.float32) / 2 ** 31
+    else:
+        raise ValueError(f"Unsupported sample width {info.bits} bits")
+    return samples.reshape(-1, info.channels), info
+
+
+def to_wav(samples, rate):
+    """16-bit PCM WAV bytes of float samples (frames x channels)"""
+    import numpy as np
+
+    pcm = (np.clip(samples, -1, 1) * 32767).astype("<i2").tobytes()
+    channels = samples.shape[1] if samples.ndim > 1 else 1
+    header = (
+        b"RIFF" + struct.pack("<I", 36 + len(pcm)) + b"WAVE"
+        + b"fmt " + struct.pack("<IHHIIHH", 16, PCM, channels, rate, rate * channels * 2, channels * 2, 16)
+        + b"data" + struct.pack("<I", len(pcm))
+    )
+    return header + pcm
+
+
+def format_duration(seconds):
+    """m:ss, "" for unknown"""
+    if seconds is None or seconds != seconds:
+        return ""
+    seconds = int(round(seconds))
+    return f"{seconds // 60}:{seconds % 60:02d}"
+
+
+def describe_format(info):
+    """e.g. 2:41 · 16 kHz · 16-bit stereo"""
+    layout = {1: "mono", 2: "stereo"}.get(info.channels, f"{info.channels} ch")
+    return f"{format_duration(info.duration)} · {info.rate / 1000:g} kHz · {info.bits}-bit {layout}"
+
+
+# ============= CACHE =============
+
+CACHE_VERSION = "wav-v1"
+_headers = {}  # blob sha -> WavInfo
+_headers_lock = threading.Lock()
+_disk_loaded = False
+
+
+def _load_disk_cache():
+    global _disk_loaded
+    if _disk_loaded or not SNAPSHOT_DIR:
+        return
+    import snapshot_store
+
+    saved = snapshot_store.load_frame("wav_headers", CACHE_VERSION)
+    with _headers_lock:
+        if saved is not None:
+            for row in saved.itertuples(index=False):
+                _headers.setdefault(row.sha, WavInfo(*map(int, row[1:])))
+        _disk_loaded = True
+
+
+def _save_disk_cache():
+    if not SNAPSHOT_DIR:
+        return
+    import pandas as pd
+    import snapshot_store
+
+    with _headers_lock:
+        rows = [(sha, *info) for sha, info in _headers.items()]
+    snapshot_store.save_frame("wav_headers", CACHE_VERSION,
+                              pd.DataFrame(rows, columns=["sha", *WavInfo._fields]))
+
+
+def describe(recordings, read_info, workers=8):
+    """
+    {path: WavInfo} for recordings {path: blob sha}. read_info(path) reads one
+    header and is only called for shas not cached yet; unreadable files are left out.
+    """
+    _load_disk_cache()
+    with _headers_lock:
+        missing = {sha: path for path, sha in recordings.items() if sha not in _headers}
+
+    def fetch(item):
+        sha, path = item
+        try:
+            return sha, read_info(path)
+        except Exception:
+            return sha, None
+
+    if missing:
+        with ThreadPoolExecutor(min(workers, len(missing))) as pool:
+            fetched = [(sha, info) for sha, info in pool.map(fetch, missing.items()) if info is not None]
+        if fetched:
+            with _headers_lock:
+                _headers.update(fetched)
+            _save_disk_cache()
+
+    with _headers_lock:
+        return {path: _headers[sha] for path, sha in recordings.items() if sha in _headers}
@@ -0,0 +1,99 @@
+# ============= GITHUB PUSH WEBHOOK =============
+# GitHub posts every push to the data repo here (sidecar port, path
+# /github/webhook). The HMAC-SHA256 signature is checked against
+# [github] webhook_secret, the pushed paths are mapped to datasets and
+# exactly those are invalidated, which also wakes the background refresher.
+# With a webhook configured the refresher only polls as a safety net
+# (REFRESH_WEBHOOK_MAX_INTERVAL).
+#
+# Repo settings -> Webhooks: payload URL https://<host>/github/webhook
+# (proxied to SIDECAR_HOST:SIDECAR_PORT), content type application/json,
+# the same secret, "Just the push event".
+#
+#     python tools/post_webhook.py tools/webhook_payloads/push_submission.json
+
+import hashlib
+import hmac
+import logging
+import streamlit as st
+from config import *
+from sidecar import route
+from shards import LEGACY_PATHS, parse_shard_path
+from cache_control import invalidate
+
+logger = logging.getLogger(__name__)
+
+AUDIO_PREFIX = "audio/"
+
+
+def webhook_secret():
+    """[github] webhook_secret from st.secrets, None when webhooks are not set up"""
+    try:
+        return st.secrets["github"].get("webhook_secret") or None
+    except (KeyError, FileNotFoundError):
+        return None
+
+
+def sign(body, secret):
+    """X-Hub-Signature-256 header value GitHub sends for body"""
+    return "sha256=" + hmac.new(secret.encode(), body, hashlib.sha256).hexdigest()
+
+
+def verify_signature(body, signature, secret):
+    return bool(signature) and hmac.compare_digest(sign(body, secret), signature)
+
+
+def dataset_for_path(path):
+    """Dataset a repo path belongs to, None for paths no cache depends on"""
+    if path.startswith(AUDIO_PREFIX):
+        return "audio"
+    parsed = parse_shard_path(path)
+    if parsed:
+        return parsed[2] if parsed[0] == SEASON else None
+    for dataset, legacy in LEGACY_PATHS.items():
+        if path == legacy:
+            return dataset
+    return None
+
+
+def pushed_datasets(payload):
+    """Datasets touched by the commits of a push event payload"""
+    datasets = set()
+    for commit in payload.get("commits") or []:
+        for key in ("added", "modified", "removed"):
+            for path in commit.get(key) or []:
+                dataset = dataset_for_path(path)
+                if dataset:
+                    datasets.add(dataset)
+    return datasets
+
+
+def handle_push(payload, branch):
+    """(status, body) for a verified push event"""
+    if payload.get("ref") != f"refs/heads/{branch}":
+        return 202, {"ignored": f"push to {payload.get('ref')}"}
+    if payload.get("commits") is None or len(payload["commits"]) >= 20:
+        # GitHub lists at most 20 commits per push: invalidate everything
+        datasets = {"submissions", "reviews", "audio"}
+    else:
+        datasets = pushed_datasets(payload)
+    if datasets:
+        invalidate(*sorted(datasets))
+    logger.info("Push %s invalidated %s", payload.get("after"), sorted(datasets))
+    return 200, {"invalidated": sorted(datasets), "after": payload.get("after")}
+
+
+@route("/github/webhook", method="POST")
+def _github_webhook(request):
+    secret = webhook_secret()
+    if secret is None:
+        return 404, {"error": "webhook not configured"}
+    if not verify_signature(request.body, request.headers.get("X-Hub-Signature-256"), secret):
+        return 401, {"error": "bad signature"}
+
+    event = request.headers.get("X-GitHub-Event")
+    if event == "ping":
+        return 200, {"pong": True}
+    if event != "push":
+        return 202, {"ignored": event}
+    return handle_push(request.json(), st.secrets["github"].get("branch", "main"))
@@ -5,6 +5,11 @@ import re
 from datetime import datetime
 from audio_recorder_streamlit import audio_recorder
 import base64
+import sys
+
+# Locked, group-committed CSV appends shared with the main app
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "azan_app"))
+from local_store import append_rows
 
 #---------------- CONFIG ----------------
 def set_background(image_path):
@@ -287,12 +292,7 @@ if st.session_state.review:
                 "submitted_at": datetime.now().isoformat()
             }
 
-            pd.DataFrame([row]).to_csv(
-                DATA_FILE,
-                mode="a",
-                header=not os.path.exists(DATA_FILE),
-                index=False
-            )
+            append_rows(DATA_FILE, [row], list(row))
 
             st.session_state.submitted = True
             st.session_state.review = False
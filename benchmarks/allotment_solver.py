@@ -0,0 +1,87 @@
+"""
+Allotment benchmark: solve the month for N Approved reciters
+(azan_app/allotment.py), then re-solve after reciters drop out mid-month.
+
+    python benchmarks/allotment_solver.py --reciters 100 500 2000
+
+Every schedule is checked afterwards: eligibility (own masjid, role in the
+interests), per-day and monthly limits, nobody serving after they left,
+and the spread of duties within each (masjid, roles) group.
+"""
+
+import argparse
+import json
+import os
+import random
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, "azan_app"))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import corpus  # noqa: E402
+import pandas as pd  # noqa: E402
+from allotment import Allotment, allot  # noqa: E402
+
+
+def dataset(n, seed=0):
+    submissions = pd.DataFrame(corpus.submission_rows(n, seed=seed))
+    reviews = pd.DataFrame({"its": submissions["its"], "status": "Approved", "comments": "", "reviewed_at": ""})
+    return submissions, reviews
+
+
+def check(allotment: Allotment):
+    schedule = allotment.schedule()
+    filled = schedule[schedule["its"] != ""]
+    reciters = allotment.reciters
+    problems = {
+        "wrong_masjid": int((filled["masjid"] != filled["its"].map(lambda i: reciters[i].masjid)).sum()),
+        "wrong_role": int(sum(role not in reciters[i].roles for i, role in zip(filled["its"], filled["role"]))),
+        "over_day": int((filled.groupby(["its", "day"]).size() > allotment.max_per_day).sum()),
+        "over_month": int((filled.groupby("its").size() > allotment.max_duties).sum()),
+        "while_away": int(sum(day >= allotment.away.get(i, 10 ** 6) for i, day in zip(filled["its"], filled["day"]))),
+    }
+    duties = allotment.duties()
+    active = duties[duties["away_from_day"] == ""]
+    spread = active.groupby(["masjid", "roles"])["duties"].agg(lambda d: int(d.max() - d.min()))
+    return {
+        "slots": len(schedule),
+        "filled": len(filled),
+        "max_spread": int(spread.max()) if len(spread) else 0,
+        "violations": sum(problems.values()),
+        **{k: v for k, v in problems.items() if v},
+    }
+
+
+def bench(n, dropouts):
+    submissions, reviews = dataset(n)
+    started = time.perf_counter()
+    allotment = allot(submissions, reviews)
+    solve_ms = (time.perf_counter() - started) * 1000
+
+    rng = random.Random(n)
+    resolve_ms, reassigned = [], 0
+    for its in rng.sample(sorted(allotment.reciters), min(dropouts, len(allotment.reciters))):
+        started = time.perf_counter()
+        reassigned += len(allotment.mark_unavailable(its, rng.randint(1, allotment.days)))
+        resolve_ms.append((time.perf_counter() - started) * 1000)
+    return {
+        "reciters": len(allotment.reciters),
+        "solve_ms": round(solve_ms, 1),
+        "resolve_ms_mean": round(sum(resolve_ms) / len(resolve_ms), 2) if resolve_ms else None,
+        "reassigned": reassigned,
+        **check(allotment),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Ramadan allotment benchmark")
+    parser.add_argument("--reciters", type=int, nargs="+", default=[100, 500, 2000])
+    parser.add_argument("--dropouts", type=int, default=10, help="reciters leaving mid-month, one re-solve each")
+    args = parser.parse_args()
+    print(json.dumps({n: bench(n, args.dropouts) for n in args.reciters}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+"""
+Bytes sent per rerun and first-paint transfer for the background image and
+CSS: the old inline data-URI approach vs the static asset pipeline. The
+first-paint times are estimates from byte counts at --kbps, not measurements.
+
+    python benchmarks/asset_payload.py [--kbps 1600]
+
+Run from the repository root (it reads .streamlit/config.toml).
+"""
+
+import argparse
+import base64
+import json
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "azan_app"))
+
+from config import CSS_STYLES, BG_IMAGE  # noqa: E402
+import assets  # noqa: E402
+
+
+def legacy_markup():
+    """What app.py injected on every rerun before the pipeline"""
+    with open(BG_IMAGE, "rb") as f:
+        encoded = base64.b64encode(f.read()).decode()
+    background = (
+        '<style>.stApp { background-image: url("data:image/jpg;base64,'
+        f'{encoded}"); background-size: cover; }}</style>'
+    )
+    return CSS_STYLES + background
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--kbps", type=float, default=1600, help="link speed for the estimate (slow 4G: 1600)")
+    args = parser.parse_args()
+
+    old = legacy_markup().encode()
+    markup, report = assets.build_assets()
+    new = markup.encode()
+
+    variants = assets.build_background_variants()
+    smallest = variants[0]
+    # Inline CSS plus the smallest WebP, which a phone-width viewport picks
+    mobile_first_paint = len(new) + os.path.getsize(os.path.join(assets.STATIC_DIR, smallest[1]))
+
+    def ms(n):
+        return round(n * 8 / (args.kbps * 1000) * 1000)
+
+    result = {
+        "per_rerun_bytes": {"before": len(old), "after": len(new)},
+        "mobile_first_paint_bytes": {"before": len(old), "after": mobile_first_paint},
+        "mobile_first_paint_ms_estimate": {"before": ms(len(old)), "after": ms(mobile_first_paint)},
+        "link_kbps": args.kbps,
+        "pipeline": report,
+    }
+    print(json.dumps(result, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,158 @@
+"""
+Synthetic data for the benchmarks: submission and review shards in the
+app's column and storage layout (azan_app/shards.py), and small PCM WAV
+recordings.
+
+    python benchmarks/corpus.py --out /tmp/corpus --sizes 100 10000 100000
+
+writes /tmp/corpus/<size>/data/<season>/<masjid>/{submissions,reviews}.csv,
+audio/ and a submissions.csv with every row (the app's local DATA_FILE).
+Generation is seeded, so the same size always gives the same files.
+"""
+
+import argparse
+import csv
+import io
+import math
+import os
+import random
+import struct
+import sys
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "azan_app"))
+
+# Same season, masjids and review statuses as the app, so filters, triage
+# labels and the allotment see the values real data contains
+from config import SEASON, MASJID_LIST, REVIEW_STATUSES  # noqa: E402
+
+SIZES = (100, 10_000, 100_000)
+
+MASJIDS = MASJID_LIST[1:]
+STATUSES = list(REVIEW_STATUSES)
+
+SUBMISSION_COLUMNS = [
+    "name", "its", "whatsapp", "masjid", "interests",
+    "azan_file", "takbirah_file", "remarks", "submitted_at",
+]
+REVIEW_COLUMNS = ["its", "status", "comments", "reviewed_at"]
+
+FIRST = ["Huzefa", "Murtaza", "Taher", "Mustafa", "Ammar", "Hatim", "Yusuf", "Burhanuddin", "Aliasgar", "Quresh"]
+LAST = ["Husainy", "Saifee", "Ezzi", "Najmi", "Kalimi", "Vajihi", "Badri", "Zakavi", "Mohammedi", "Hakimi"]
+
+
+def submission_rows(n, seed=0):
+    """n submission dicts with unique 8-digit ITS numbers"""
+    rng = random.Random(seed)
+    start = datetime(2026, 2, 1)
+    its_numbers = rng.sample(range(10_000_000, 100_000_000), n)
+    rows = []
+    for i, its in enumerate(its_numbers):
+        azan, takbirah = rng.random() < 0.8, rng.random() < 0.5
+        if not (azan or takbirah):
+            azan = True
+        stamp = (start + timedelta(seconds=37 * i)).strftime("%Y%m%d_%H%M%S")
+        rows.append({
+            "name": f"{rng.choice(FIRST)} {rng.choice(FIRST)} {rng.choice(LAST)}",
+            "its": str(its),
+            "whatsapp": str(rng.randrange(10 ** 9, 10 ** 10)),
+            "masjid": rng.choice(MASJIDS),
+            "interests": ", ".join(label for label, on in (("Azan", azan), ("Takbirah", takbirah)) if on),
+            "azan_file": f"audio/azan/azan_{its}_{stamp}.wav" if azan else "",
+            "takbirah_file": f"audio/takbirah/takbirah_{its}_{stamp}.wav" if takbirah else "",
+            "remarks": rng.choice(["No comments", "Can give short and long Azan", "Available all days"]),
+            "submitted_at": (start + timedelta(seconds=37 * i)).isoformat(),
+        })
+    return rows
+
+
+def review_rows(submissions, fraction=0.6, seed=0):
+    """Reviews for a fraction of the submissions"""
+    rng = random.Random(seed + 1)
+    reviewed = rng.sample(submissions, int(len(submissions) * fraction))
+    return [
+        {
+            "its": row["its"],
+            "status": rng.choice(STATUSES),
+            "comments": "Clear voice, good makhraj",
+            "reviewed_at": (datetime(2026, 2, 20) + timedelta(seconds=11 * i)).isoformat(),
+        }
+        for i, row in enumerate(reviewed)
+    ]
+
+
+def to_csv(rows, columns):
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=columns, lineterminator="\n")
+    writer.writeheader()
+    writer.writerows(rows)
+    return buffer.getvalue().encode()
+
+
+def make_wav(seconds=5.0, sample_rate=16000, frequency=440.0, seed=0):
+    """16-bit mono PCM: a tone with a little noise, like a short recording"""
+    rng = random.Random(seed)
+    n = int(seconds * sample_rate)
+    samples = (
+        int(8000 * math.sin(2 * math.pi * frequency * i / sample_rate) + rng.randint(-300, 300))
+        for i in range(n)
+    )
+    data = struct.pack(f"<{n}h", *samples)
+    header = (
+        b"RIFF" + struct.pack("<I", 36 + len(data)) + b"WAVE"
+        + b"fmt " + struct.pack("<IHHIIHH", 16, 1, 1, sample_rate, sample_rate * 2, 2, 16)
+        + b"data" + struct.pack("<I", len(data))
+    )
+    return header + data
+
+
+def shard_file(directory, dataset, masjid, season=SEASON):
+    """Same layout as shards.shard_path: data/<season>/<masjid-slug>/<dataset>.csv"""
+    return os.path.join(directory, "data", season, masjid.lower().replace(" ", "-"), f"{dataset}.csv")
+
+
+def write_corpus(directory, n, audio_files=20, seed=0, season=SEASON):
+    """Write the masjid shards, the local submissions.csv and a few WAVs (named after the first rows)"""
+    os.makedirs(directory, exist_ok=True)
+    submissions = submission_rows(n, seed)
+    with open(os.path.join(directory, "submissions.csv"), "wb") as f:
+        f.write(to_csv(submissions, SUBMISSION_COLUMNS))
+
+    masjid_by_its = {row["its"]: row["masjid"] for row in submissions}
+    reviews = review_rows(submissions, seed=seed)
+    for masjid in MASJIDS:
+        for dataset, rows, columns in (
+            ("submissions", [r for r in submissions if r["masjid"] == masjid], SUBMISSION_COLUMNS),
+            ("reviews", [r for r in reviews if masjid_by_its[r["its"]] == masjid], REVIEW_COLUMNS),
+        ):
+            path = shard_file(directory, dataset, masjid, season)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path, "wb") as f:
+                f.write(to_csv(rows, columns))
+
+    wav = make_wav(seed=seed)
+    for row in submissions[:audio_files]:
+        for column in ("azan_file", "takbirah_file"):
+            if row[column]:
+                path = os.path.join(directory, *row[column].split("/"))
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                with open(path, "wb") as f:
+                    f.write(wav)
+    return submissions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate synthetic benchmark data")
+    parser.add_argument("--out", required=True)
+    parser.add_argument("--sizes", type=int, nargs="+", default=list(SIZES))
+    parser.add_argument("--audio-files", type=int, default=20, help="submissions that get WAVs written")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    for n in args.sizes:
+        write_corpus(os.path.join(args.out, str(n)), n, args.audio_files, args.seed)
+        print(f"{n} rows -> {os.path.join(args.out, str(n))}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,214 @@
+"""
+Data-layer benchmark: the app's own read/write functions against synthetic
+corpora served by the local fake GitHub API (tools/fake_github.py), with a
+configurable per-request latency.
+
+Measured for every corpus size:
+  * load_existing_its       (local submissions.csv)
+  * dashboard aggregation   (the Assessed/Pending numbers of the admin panel)
+  * save_submission         (read-modify-write of one masjid's submissions shard)
+  * save_review_to_github   (merge-and-retry write of one masjid's reviews shard)
+  * audio upload throughput (upload_audio_to_github with a 5 s WAV)
+
+    python benchmarks/data_layer.py --sizes 100 10000 100000 --latency 0.05
+    python benchmarks/data_layer.py --baseline benchmarks/results/<earlier>.json
+
+Request counts are taken from the fake server, so they include the admin
+refresher's background pulls that writes trigger (as in production).
+
+Results are written to benchmarks/results/<date>-<commit>.json; --baseline
+prints the change of every median against an earlier result file.
+"""
+
+import argparse
+import json
+import os
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+APP_DIR = os.path.join(ROOT, "azan_app")
+RESULTS_DIR = os.path.join(ROOT, "benchmarks", "results")
+sys.path.insert(0, APP_DIR)
+sys.path.insert(0, os.path.join(ROOT, "tools"))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import corpus  # noqa: E402
+from fake_github import FakeGitHub  # noqa: E402
+
+SECRETS = """ADMIN_PASSWORD = "benchmark"
+
+[github]
+token = "benchmark"
+repo = "local/benchmark"
+api_url = "{url}"
+"""
+
+
+def _summary(samples, requests=None):
+    ordered = sorted(samples)
+    result = {
+        "runs": len(samples),
+        "median_ms": round(statistics.median(ordered), 2),
+        "p95_ms": round(ordered[min(len(ordered) - 1, int(round(0.95 * (len(ordered) - 1))))], 2),
+        "min_ms": round(ordered[0], 2),
+    }
+    if requests is not None:
+        result["requests_per_call"] = round(requests / len(samples), 1)
+    return result
+
+
+def _time(func, repeat, fake=None):
+    """Run func(i) repeat times, returns (samples in ms, fake API requests made, failures)"""
+    samples, failures = [], 0
+    before = fake.request_count if fake else 0
+    for i in range(repeat):
+        started = time.perf_counter()
+        ok = func(i)
+        samples.append((time.perf_counter() - started) * 1000)
+        failures += ok is False or ok is None
+    return samples, (fake.request_count - before) if fake else None, failures
+
+
+def bench_size(n, fake, workdir, repeat):
+    import utils
+    import github_admin
+    from shards import load_shards
+
+    source = os.path.join(workdir, "corpus", str(n))
+    corpus.write_corpus(source, n)
+    fake.seed(source)
+    shutil.copy(os.path.join(source, "submissions.csv"), os.path.join(workdir, "submissions.csv"))
+    results = {}
+
+    samples, _, _ = _time(lambda i: utils.load_existing_its() is not None, repeat)
+    results["load_existing_its"] = _summary(samples)
+
+    client = utils.github_repo()
+    submissions, _ = load_shards(client, "submissions")
+    reviews, _ = load_shards(client, "reviews")
+    masjids = submissions["masjid"].dropna().unique().tolist()
+
+    def aggregate(i):
+        github_admin.count_assessed(submissions, reviews)
+        github_admin.masjid_assessment_stats(submissions, reviews, masjids)
+        return True
+
+    samples, _, _ = _time(aggregate, repeat)
+    results["dashboard_aggregation"] = _summary(samples)
+
+    row = corpus.submission_rows(1, seed=n)[0]
+
+    def submit(i):
+        return utils.save_submission({**row, "its": str(90_000_000 + n + i)})
+
+    samples, requests, failures = _time(submit, repeat, fake)
+    results["save_submission"] = {**_summary(samples, requests), "failures": failures}
+
+    reviewed = submissions[["its", "masjid"]].astype(str).to_numpy().tolist()
+
+    def review(i):
+        its, masjid = reviewed[i % len(reviewed)]
+        return github_admin.save_review_to_github(its, "Approved", f"benchmark {i}", masjid)
+
+    samples, requests, failures = _time(review, repeat, fake)
+    results["save_review_to_github"] = {**_summary(samples, requests), "failures": failures}
+
+    wav = corpus.make_wav()
+
+    def upload(i):
+        return utils.upload_audio_to_github(wav, str(80_000_000 + n + i), "azan")
+
+    samples, requests, failures = _time(upload, repeat, fake)
+    total_s = sum(samples) / 1000
+    results["audio_upload"] = {
+        **_summary(samples, requests),
+        "failures": failures,
+        "wav_bytes": len(wav),
+        "uploads_per_s": round(repeat / total_s, 2),
+        "mb_per_s": round(repeat * len(wav) / total_s / 1e6, 2),
+    }
+    return results
+
+
+def git_commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def compare(baseline, current):
+    """One line per measurement: old median, new median, change"""
+    lines = []
+    for size, measurements in current["results"].items():
+        for name, new in measurements.items():
+            old = baseline.get("results", {}).get(size, {}).get(name)
+            if not old:
+                continue
+            change = (new["median_ms"] - old["median_ms"]) / old["median_ms"] * 100 if old["median_ms"] else 0.0
+            lines.append(
+                f"{size:>7} {name:<24} {old['median_ms']:>10.2f} -> {new['median_ms']:>10.2f} ms  {change:+6.1f}%"
+            )
+    return "\n".join(lines)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Data-layer benchmark against the fake GitHub API")
+    parser.add_argument("--sizes", type=int, nargs="+", default=list(corpus.SIZES))
+    parser.add_argument("--latency", type=float, default=0.05, help="seconds added to every fake API request")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--out", default=RESULTS_DIR)
+    parser.add_argument("--baseline", help="earlier result file to compare against")
+    args = parser.parse_args()
+
+    fake = FakeGitHub(latency=args.latency)
+    url = fake.start()
+    workdir = tempfile.mkdtemp(prefix="azan-bench-")
+    try:
+        # The app reads secrets and its local CSVs relative to the working directory
+        os.makedirs(os.path.join(workdir, ".streamlit"))
+        with open(os.path.join(workdir, ".streamlit", "secrets.toml"), "w") as f:
+            f.write(SECRETS.format(url=url))
+        os.chdir(workdir)
+
+        results = {}
+        for n in args.sizes:
+            results[str(n)] = bench_size(n, fake, workdir, args.repeat)
+            print(f"{n} rows done", file=sys.stderr)
+    finally:
+        os.chdir(ROOT)
+        fake.stop()
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    commit = git_commit()
+    report = {
+        "commit": commit,
+        "date": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "latency_s": args.latency,
+        "repeat": args.repeat,
+        "results": results,
+    }
+    os.makedirs(args.out, exist_ok=True)
+    path = os.path.join(args.out, f"{datetime.now().strftime('%Y%m%d-%H%M%S')}-{commit}.json")
+    with open(path, "w") as f:
+        json.dump(report, f, indent=2)
+
+    print(json.dumps(report, indent=2))
+    print(f"Saved {path}", file=sys.stderr)
+    if args.baseline:
+        with open(args.baseline) as f:
+            print(compare(json.load(f), report))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,120 @@
+"""
+Per-interaction cost of the applicant form: a full script rerun (what every
+keystroke cost before fragments) vs re-running only the fragment that owns
+the widget.
+
+AppTest always performs full reruns, so the fragment side runs the fragment
+function alone as its own script - the same code a fragment rerun executes.
+
+    python benchmarks/form_interaction.py [--repeat 20]
+"""
+
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+
+from streamlit.testing.v1 import AppTest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+APP_DIR = os.path.join(ROOT, "azan_app")
+sys.path.insert(0, APP_DIR)
+
+SECRETS = {"ADMIN_PASSWORD": "benchmark", "github": {"token": "benchmark", "repo": "local/benchmark"}}
+
+# Minimal valid WAV header + a little silence
+FAKE_WAV = (
+    b"RIFF" + (36 + 3200).to_bytes(4, "little") + b"WAVEfmt "
+    + (16).to_bytes(4, "little") + (1).to_bytes(2, "little") + (1).to_bytes(2, "little")
+    + (16000).to_bytes(4, "little") + (32000).to_bytes(4, "little")
+    + (2).to_bytes(2, "little") + (16).to_bytes(2, "little")
+    + b"data" + (3200).to_bytes(4, "little") + bytes(3200)
+)
+
+
+def identity_fragment():
+    from utils import init_session_state
+    from user_form import show_identity_fields
+    init_session_state()
+    show_identity_fields()
+
+
+def azan_fragment():
+    from utils import init_session_state
+    from user_form import show_recorder
+    init_session_state()
+    show_recorder("azan", "Azan")
+
+
+def remarks_fragment():
+    from utils import init_session_state
+    from user_form import show_remarks
+    init_session_state()
+    show_remarks()
+
+
+def _app(source):
+    at = source
+    for key, value in SECRETS.items():
+        at.secrets[key] = value
+    at.run()
+    return at
+
+
+def _timed(at, interact, repeat):
+    samples = []
+    for i in range(repeat):
+        interact(at, i)
+        started = time.perf_counter()
+        at.run()
+        samples.append((time.perf_counter() - started) * 1000)
+    return round(statistics.median(samples), 2)
+
+
+INTERACTIONS = {
+    "type name": (
+        identity_fragment,
+        lambda at, i: at.text_input(key="input_name").input(f"Applicant Name {i}"),
+    ),
+    "type ITS": (
+        identity_fragment,
+        lambda at, i: at.text_input(key="input_its").input(f"{30000000 + i}"),
+    ),
+    "record azan": (
+        azan_fragment,
+        lambda at, i: at.session_state.__setitem__("azan_audio_recorded", FAKE_WAV + bytes([i % 256])),
+    ),
+    "edit remarks": (
+        remarks_fragment,
+        lambda at, i: at.text_area(key="textarea_remarks").input(f"remark {i}"),
+    ),
+}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Full rerun vs fragment rerun per interaction")
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    os.chdir(ROOT)
+    results = {}
+    for name, (fragment, interact) in INTERACTIONS.items():
+        full = _app(AppTest.from_file(os.path.join(APP_DIR, "app.py"), default_timeout=60))
+        full.checkbox(key="checkbox_azan").check()
+        full.run()
+        frag = _app(AppTest.from_function(fragment, default_timeout=60))
+        full_ms = _timed(full, interact, args.repeat)
+        fragment_ms = _timed(frag, interact, args.repeat)
+        results[name] = {
+            "full_rerun_ms": full_ms,
+            "fragment_rerun_ms": fragment_ms,
+            "speedup": round(full_ms / fragment_ms, 1) if fragment_ms else None,
+        }
+
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,251 @@
+"""
+Concurrent applicant load test.
+
+Simulates N applicant sessions with streamlit's AppTest, several at a time:
+each session fills in the form, injects a synthetic recording into the
+recorder's session state, reviews and submits against the local fake GitHub
+API (tools/fake_github.py).
+
+AppTest is not thread-safe (every run swaps the global Runtime instance and
+st.secrets), so concurrent sessions run in --concurrency worker processes,
+each one behaving like an app replica. They all write to the same fake
+repository, which is where concurrent submissions contend.
+
+    python benchmarks/load_test.py --sessions 200 --concurrency 50 --latency 0.05
+
+Reports throughput, per-interaction and end-to-end latency percentiles,
+worker memory, and how many submissions were duplicated, lost (the session
+was told it succeeded but the row is missing) or failed (the session saw an
+error).
+"""
+
+import argparse
+import csv
+import io
+import json
+import os
+import random
+import resource
+import statistics
+import sys
+import time
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context
+
+from streamlit.testing.v1 import AppTest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+APP_DIR = os.path.join(ROOT, "azan_app")
+APP = os.path.join(APP_DIR, "app.py")
+sys.path.insert(0, APP_DIR)
+sys.path.insert(0, os.path.join(ROOT, "tools"))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import corpus  # noqa: E402
+from fake_github import FakeGitHub  # noqa: E402
+
+
+def rss_mb():
+    """Current resident set size of this process, in MB"""
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return round(int(line.split()[1]) / 1024, 1)
+    except OSError:
+        pass
+    return None
+
+
+def percentiles(samples):
+    if not samples:
+        return {}
+    ordered = sorted(samples)
+
+    def pick(q):
+        return round(ordered[min(len(ordered) - 1, int(round(q / 100 * (len(ordered) - 1))))], 1)
+
+    return {"p50_ms": pick(50), "p90_ms": pick(90), "p95_ms": pick(95), "p99_ms": pick(99),
+            "max_ms": round(ordered[-1], 1), "mean_ms": round(statistics.mean(ordered), 1)}
+
+
+class Session:
+    """One applicant going through fill -> record -> review -> submit"""
+
+    def __init__(self, number, secrets, wav, timeout):
+        self.number = number
+        self.secrets = secrets
+        self.wav = wav
+        self.timeout = timeout
+        self.row = corpus.submission_rows(1, seed=10_000 + number)[0]
+        self.its = str(70_000_000 + number)
+        self.interactions = []  # ms per rerun
+        self.outcome = None
+        self.error = None
+
+    def _run(self, at):
+        started = time.perf_counter()
+        at.run()
+        self.interactions.append((time.perf_counter() - started) * 1000)
+        if at.exception:
+            raise RuntimeError(at.exception[0].value)
+
+    def __call__(self):
+        started = time.perf_counter()
+        try:
+            at = AppTest.from_file(APP, default_timeout=self.timeout)
+            for key, value in self.secrets.items():
+                at.secrets[key] = value
+            self._run(at)
+
+            at.text_input(key="input_name").input(self.row["name"])
+            self._run(at)
+            at.text_input(key="input_its").input(self.its)
+            self._run(at)
+            at.text_input(key="input_whatsapp").input(self.row["whatsapp"])
+            at.selectbox(key="select_masjid").select(self.row["masjid"])
+            at.checkbox(key="checkbox_azan").check()
+            self._run(at)
+
+            # What audio_recorder would have stored after a recording
+            at.session_state["azan_audio_recorded"] = self.wav
+            self._run(at)
+
+            at.button(key="btn_review").click()
+            self._run(at)
+            at.button(key="btn_submit").click()
+            self._run(at)
+
+            self.outcome = "submitted" if at.session_state["submitted"] else "failed"
+            if self.outcome == "failed":
+                self.error = "; ".join(e.value for e in at.error) or "not submitted"
+        except Exception as e:
+            self.outcome, self.error = "failed", str(e)
+        self.seconds = time.perf_counter() - started
+        return {
+            "its": self.its,
+            "outcome": self.outcome,
+            "error": self.error,
+            "seconds": self.seconds,
+            "interactions": self.interactions,
+            "pid": os.getpid(),
+            "rss_mb": rss_mb(),
+            "maxrss_mb": round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1),
+        }
+
+
+def _init_worker(workdir):
+    # The form's ITS check reads submissions.csv from the working directory
+    os.chdir(workdir)
+
+
+def _warm_up(_):
+    time.sleep(0.2)  # hold the worker so every worker gets started
+    return os.getpid()
+
+
+def _session(task):
+    number, secrets, wav, timeout, delay = task
+    # Spread arrivals over the ramp instead of a single burst
+    time.sleep(delay)
+    return Session(number, secrets, wav, timeout)()
+
+
+def run(args):
+    fake = FakeGitHub(latency=args.latency)
+    url = fake.start()
+    seed = os.path.join("/tmp", f"azan-load-{os.getpid()}")
+    corpus.write_corpus(seed, args.existing, audio_files=0)
+    fake.seed(seed)
+
+    secrets = {
+        "ADMIN_PASSWORD": "load-test",
+        "github": {"token": "load-test", "repo": "local/load-test", "api_url": url},
+    }
+    wav = corpus.make_wav(seconds=args.audio_seconds)
+    # Arrivals are only spread within the first wave; later sessions start as workers free up
+    tasks = [
+        (i, secrets, wav, args.timeout, random.uniform(0, args.ramp) if i < args.concurrency else 0.0)
+        for i in range(args.sessions)
+    ]
+
+    # Refer to the worker functions by module name: AppTest replaces __main__
+    # in the workers with the app script, so __main__.<function> cannot resolve
+    import load_test as worker
+
+    pool = ProcessPoolExecutor(
+        max_workers=args.concurrency,
+        mp_context=get_context("spawn"),
+        initializer=worker._init_worker,
+        initargs=(seed,),
+    )
+    with pool:
+        workers = set(pool.map(worker._warm_up, range(args.concurrency)))
+        before = fake.request_count
+        started = time.perf_counter()
+        finished = list(pool.map(worker._session, tasks))
+        wall = time.perf_counter() - started
+
+    # Every masjid's shard: a duplicate may land in two different shards
+    stored = Counter()
+    for path in fake.head["tree"]:
+        if path.startswith("data/") and path.endswith("/submissions.csv"):
+            content, _ = fake.read(path)
+            stored.update(row["its"] for row in csv.DictReader(io.StringIO(content.decode())))
+    submitted = [s for s in finished if s["outcome"] == "submitted"]
+    failed = [s for s in finished if s["outcome"] == "failed"]
+    lost = [s for s in submitted if stored[s["its"]] == 0]
+    duplicated = [its for its, count in stored.items() if count > 1]
+
+    # Last report of every worker: resident and peak memory per app replica
+    last = {}
+    for s in finished:
+        last[s["pid"]] = s
+    errors = Counter((s["error"] or "")[:120] for s in failed)
+    return {
+        "sessions": args.sessions,
+        "concurrency": args.concurrency,
+        "workers": len(workers),
+        "latency_s": args.latency,
+        "wall_s": round(wall, 2),
+        "throughput_submissions_per_s": round(len(submitted) / wall, 2),
+        "submitted": len(submitted),
+        "failed": len(failed),
+        "lost": len(lost),
+        "duplicated_its": len(duplicated),
+        "failure_rate": round(len(failed) / args.sessions, 3),
+        "loss_rate": round(len(lost) / max(1, len(submitted)), 3),
+        "interaction_latency": percentiles([ms for s in finished for ms in s["interactions"]]),
+        "session_latency": percentiles([s["seconds"] * 1000 for s in finished]),
+        "github_requests": fake.request_count - before,
+        "worker_memory": {
+            "rss_end_mb_max": max(s["rss_mb"] or 0 for s in last.values()),
+            "maxrss_mb_max": max(s["maxrss_mb"] for s in last.values()),
+            "rss_end_mb_total": round(sum(s["rss_mb"] or 0 for s in last.values()), 1),
+        },
+        "top_errors": errors.most_common(5),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Concurrent applicant sessions against a fake GitHub API")
+    parser.add_argument("--sessions", type=int, default=50)
+    parser.add_argument("--concurrency", type=int, default=10)
+    parser.add_argument("--latency", type=float, default=0.05, help="seconds added to every fake API request")
+    parser.add_argument("--ramp", type=float, default=2.0, help="arrivals are spread over this many seconds")
+    parser.add_argument("--existing", type=int, default=1000, help="submissions already in the repo")
+    parser.add_argument("--audio-seconds", type=float, default=5.0)
+    parser.add_argument("--timeout", type=float, default=120.0, help="per-rerun AppTest timeout")
+    parser.add_argument("--json", help="also write the report to this file")
+    args = parser.parse_args()
+
+    report = run(args)
+    print(json.dumps(report, indent=2))
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,149 @@
+"""
+Local CSV writer benchmark: concurrent appends from threads (sessions of one
+Streamlit process) and from processes (several app replicas on one disk),
+with azan_app/local_store.py group commit and, for comparison, one locked
+write + fsync per append and the unlocked pandas to_csv(mode="a").
+
+    python benchmarks/local_writes.py --threads 32 --appends 50 --processes 4
+
+Each run checks the file afterwards: every row present exactly once and no
+torn lines.
+"""
+
+import argparse
+import csv
+import json
+import os
+import shutil
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, "azan_app"))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import corpus  # noqa: E402
+import local_store  # noqa: E402
+
+COLUMNS = corpus.SUBMISSION_COLUMNS
+
+
+def _row(worker, i):
+    row = corpus.submission_rows(1, seed=worker * 100_000 + i)[0]
+    return {**row, "its": f"{worker:04d}{i:04d}", "remarks": "multi\nline, \"quoted\" remark"}
+
+
+def append_group(path, row):
+    local_store.append_rows(path, [row], COLUMNS)
+
+
+def append_locked(path, row):
+    """One locked write and fsync per append (no batching)"""
+    import io
+    with local_store.locked(path):
+        buffer = io.StringIO()
+        writer = csv.DictWriter(buffer, fieldnames=COLUMNS, lineterminator="\n")
+        if not os.path.exists(path):
+            writer.writeheader()
+        writer.writerow(row)
+        with open(path, "a") as f:
+            f.write(buffer.getvalue())
+            f.flush()
+            os.fsync(f.fileno())
+
+
+def append_pandas(path, row):
+    """What azan_form_admin.py used to do"""
+    import pandas as pd
+    pd.DataFrame([row]).to_csv(path, mode="a", header=not os.path.exists(path), index=False)
+
+
+METHODS = {"group": append_group, "locked": append_locked, "pandas": append_pandas}
+
+
+def _threads(method, path, threads, appends, worker_base=0):
+    rows = {w: [_row(worker_base + w, i) for i in range(appends)] for w in range(threads)}
+    barrier = threading.Barrier(threads)
+
+    def run(w):
+        barrier.wait()
+        for row in rows[w]:
+            METHODS[method](path, row)
+
+    workers = [threading.Thread(target=run, args=(w,)) for w in range(threads)]
+    for t in workers:
+        t.start()
+    for t in workers:
+        t.join()
+
+
+def _process(task):
+    method, path, threads, appends, base = task
+    _threads(method, path, threads, appends, base)
+    return local_store.append_stats(path) if method == "group" else None
+
+
+def check(path, expected):
+    with open(path, newline="") as f:
+        rows = list(csv.DictReader(f))
+    its = [r.get("its") for r in rows]
+    torn = sum(1 for r in rows if None in r or r.get("submitted_at") in (None, ""))
+    return {
+        "rows": len(rows),
+        "missing": len(expected - set(its)),
+        "duplicated": len(its) - len(set(its)),
+        "torn": torn,
+    }
+
+
+def bench(method, threads, appends, processes, directory):
+    path = os.path.join(directory, f"{method}.csv")
+    started = time.perf_counter()
+    stats = None
+    if processes > 1:
+        tasks = [(method, path, threads, appends, p * threads) for p in range(processes)]
+        with ProcessPoolExecutor(processes, mp_context=get_context("spawn")) as pool:
+            stats = [s for s in pool.map(_process, tasks) if s]
+    else:
+        _threads(method, path, threads, appends)
+        if method == "group":
+            stats = [local_store.append_stats(path)]
+    seconds = time.perf_counter() - started
+
+    total = threads * appends * processes
+    expected = {f"{w:04d}{i:04d}" for w in range(threads * processes) for i in range(appends)}
+    result = {
+        "appends": total,
+        "seconds": round(seconds, 3),
+        "appends_per_s": round(total / seconds, 1),
+        **check(path, expected),
+    }
+    if stats:
+        batches = sum(s["batches"] for s in stats)
+        result.update(fsyncs=sum(s["fsyncs"] for s in stats), rows_per_batch=round(total / batches, 1))
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Concurrent local CSV append benchmark")
+    parser.add_argument("--threads", type=int, default=32)
+    parser.add_argument("--appends", type=int, default=50, help="per thread")
+    parser.add_argument("--processes", type=int, default=1)
+    parser.add_argument("--methods", nargs="+", default=list(METHODS), choices=list(METHODS))
+    parser.add_argument("--dir", help="directory on the disk to test (default: a temp dir)")
+    args = parser.parse_args()
+
+    directory = tempfile.mkdtemp(prefix="azan-local-", dir=args.dir)
+    try:
+        report = {m: bench(m, args.threads, args.appends, args.processes, directory) for m in args.methods}
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
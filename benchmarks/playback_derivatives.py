@@ -0,0 +1,81 @@
+"""
+Playback derivative benchmark (azan_app/playback.py): time to make the
+skip-silence and sped-up copies of N synthetic recordings, time to serve
+them again from the on-disk cache, and the listening time each mode leaves.
+
+    python benchmarks/playback_derivatives.py --recordings 20 --seconds 90
+
+Recordings are stereo tones with a pause of PAUSE seconds every PHRASE
+seconds, roughly the rhythm of an Azan with long breaths between phrases.
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, "azan_app"))
+
+import numpy as np  # noqa: E402
+import playback  # noqa: E402
+from wav_info import parse_header, to_wav  # noqa: E402
+
+RATE = 16000
+PHRASE, PAUSE = 8.0, 3.0
+
+
+def make_recording(seconds, rng):
+    t = np.arange(int(seconds * RATE)) / RATE
+    pitch = rng.uniform(180, 260)
+    voice = sum(np.sin(2 * np.pi * pitch * k * t) / k for k in range(1, 6)) * 0.25
+    voice *= 0.6 + 0.4 * np.sin(2 * np.pi * rng.uniform(0.2, 0.5) * t)
+    voice[t % (PHRASE + PAUSE) >= PHRASE] = 0
+    voice += rng.normal(0, 0.002, len(t))
+    return to_wav(np.stack([voice, voice * 0.8], axis=1).astype(np.float32), RATE)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Playback derivative benchmark")
+    parser.add_argument("--recordings", type=int, default=20)
+    parser.add_argument("--seconds", type=float, default=90, help="length of each recording in seconds")
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    recordings = [make_recording(args.seconds, rng) for _ in range(args.recordings)]
+    shas = [hashlib.sha1(data).hexdigest() for data in recordings]
+    original = sum(parse_header(data).duration for data in recordings)
+
+    workdir = tempfile.mkdtemp(prefix="azan-playback-")
+    cwd = os.getcwd()
+    os.chdir(workdir)  # derivatives go to <workdir>/.snapshot/playback
+    results = {}
+    try:
+        for mode, settings in playback.MODES.items():
+            if settings is None:
+                continue
+            timings = {}
+            for run in ("cold_ms_per_recording", "cached_ms_per_recording"):
+                started = time.perf_counter()
+                derived = [playback.derivative(sha, lambda data=data: data, *settings)
+                           for sha, data in zip(shas, recordings)]
+                timings[run] = round((time.perf_counter() - started) * 1000 / len(recordings), 1)
+            listening = sum(parse_header(data).duration for data in derived)
+            results[mode] = {**timings, "listening_share": round(listening / original, 3)}
+    finally:
+        os.chdir(cwd)
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    print(json.dumps({
+        "recordings": len(recordings),
+        "audio_minutes": round(original / 60, 1),
+        **results,
+    }, indent=2, ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    main()
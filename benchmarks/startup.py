@@ -0,0 +1,145 @@
+"""
+Cold-start benchmark for the applicant path.
+
+Runs app.py once in a fresh interpreter through streamlit's AppTest and
+reports:
+  * import time of the app's own modules (from -X importtime),
+  * first-render time of the applicant page,
+  * which heavy / admin-only modules got loaded.
+
+Exits with status 1 when a budget is exceeded or an admin-only module is
+imported, so it can gate regressions:
+
+    python benchmarks/startup.py --import-budget-ms 150 --render-budget-ms 3000
+"""
+
+import argparse
+import ast
+import json
+import os
+import re
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+APP = os.path.join(ROOT, "azan_app", "app.py")
+
+
+def app_modules(path=APP):
+    """The app's own modules imported at the top of app.py (read from its source, so none is missed)"""
+    with open(path, encoding="utf-8") as f:
+        tree = ast.parse(f.read())
+    names = []
+    for node in tree.body:
+        if isinstance(node, ast.Import):
+            names += [alias.name for alias in node.names]
+        elif isinstance(node, ast.ImportFrom) and node.module and not node.level:
+            names.append(node.module)
+    local = os.path.dirname(path)
+    return tuple(n for n in dict.fromkeys(names) if os.path.exists(os.path.join(local, f"{n}.py")))
+
+
+APP_MODULES = app_modules()
+
+# Must not be imported before an admin logs in
+FORBIDDEN = ("pandas", "github_admin", "admin_panel", "refresher", "github_client", "search_index")
+
+MARKER = "=== app run starts ==="
+
+CHILD = r"""
+import json, os, sys, time
+from streamlit.testing.v1 import AppTest
+
+# `streamlit run` puts the script's folder on sys.path, AppTest does not
+sys.path.insert(0, os.path.dirname({app!r}))
+
+before = set(sys.modules)
+at = AppTest.from_file({app!r}, default_timeout=60)
+at.secrets["ADMIN_PASSWORD"] = "benchmark"
+at.secrets["github"] = {{"token": "benchmark", "repo": "local/benchmark"}}
+
+sys.stderr.write({marker!r} + "\n")
+sys.stderr.flush()
+started = time.perf_counter()
+at.run()
+first_render = time.perf_counter() - started
+
+started = time.perf_counter()
+at.run()
+warm_rerun = time.perf_counter() - started
+
+print(json.dumps({{
+    "first_render_ms": round(first_render * 1000, 1),
+    "warm_rerun_ms": round(warm_rerun * 1000, 1),
+    "exceptions": [str(e.value) for e in at.exception],
+    "loaded_by_app": sorted(set(sys.modules) - before),
+}}))
+"""
+
+IMPORTTIME = re.compile(r"import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)")
+
+
+def app_import_ms(stderr):
+    """Sum cumulative import time of the script's own top-level imports"""
+    lines = stderr.split(MARKER, 1)[-1].splitlines()
+    entries = []
+    for line in lines:
+        match = IMPORTTIME.match(line)
+        if match and match.group(4) in APP_MODULES:
+            entries.append((len(match.group(3)), int(match.group(2))))
+    if not entries:
+        return 0.0
+    top = min(depth for depth, _ in entries)
+    return round(sum(us for depth, us in entries if depth == top) / 1000, 1)
+
+
+def measure():
+    child = CHILD.format(app=APP, marker=MARKER)
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", child],
+        cwd=ROOT, capture_output=True, text=True,
+    )
+    if proc.returncode != 0:
+        raise RuntimeError(proc.stderr[-2000:])
+    result = json.loads(proc.stdout.strip().splitlines()[-1])
+    result["app_import_ms"] = app_import_ms(proc.stderr)
+    loaded = result.pop("loaded_by_app")
+    result["forbidden_loaded"] = [m for m in FORBIDDEN if m in loaded]
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Applicant cold-start benchmark")
+    parser.add_argument("--import-budget-ms", type=float, default=150.0)
+    parser.add_argument("--render-budget-ms", type=float, default=3000.0)
+    parser.add_argument("--runs", type=int, default=3, help="fresh interpreters; the median is reported")
+    args = parser.parse_args()
+
+    runs = [measure() for _ in range(args.runs)]
+    median = sorted(runs, key=lambda r: r["first_render_ms"])[len(runs) // 2]
+    result = {
+        "app_import_ms": sorted(r["app_import_ms"] for r in runs)[len(runs) // 2],
+        "first_render_ms": median["first_render_ms"],
+        "warm_rerun_ms": median["warm_rerun_ms"],
+        "forbidden_loaded": sorted({m for r in runs for m in r["forbidden_loaded"]}),
+        "exceptions": median["exceptions"],
+        "budgets": {"import_ms": args.import_budget_ms, "render_ms": args.render_budget_ms},
+    }
+
+    failures = []
+    if result["app_import_ms"] > args.import_budget_ms:
+        failures.append(f"app import {result['app_import_ms']} ms > {args.import_budget_ms} ms")
+    if result["first_render_ms"] > args.render_budget_ms:
+        failures.append(f"first render {result['first_render_ms']} ms > {args.render_budget_ms} ms")
+    if result["forbidden_loaded"]:
+        failures.append(f"admin-only modules loaded: {', '.join(result['forbidden_loaded'])}")
+    if result["exceptions"]:
+        failures.append("app raised: " + "; ".join(result["exceptions"]))
+    result["failures"] = failures
+
+    print(json.dumps(result, indent=2))
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,119 @@
+"""
+Triage model benchmark (azan_app/triage.py): feature extraction for N
+synthetic recordings (cold, then from the on-disk feature cache), training,
+batch scoring of the pending ones and cross-validated accuracy.
+
+    python benchmarks/triage_model.py --recordings 300 --seconds 30
+
+Recordings are tones with noise and pauses; the noise level and the amount
+of dead air depend on the status, so the accuracy shows the pipeline can
+learn a signal, not how well it judges real recitation.
+"""
+
+import argparse
+import hashlib
+import io
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+import wave
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, "azan_app"))
+
+import numpy as np  # noqa: E402
+import pandas as pd  # noqa: E402
+import triage  # noqa: E402
+
+STATUSES = ["Approved", "Needs Improvement", "Not Okay"]
+RATE = 16000
+
+
+def make_recording(status, seconds, rng):
+    level = STATUSES.index(status)
+    t = np.arange(int(seconds * RATE)) / RATE
+    pitch = rng.uniform(180, 260)
+    voice = sum(np.sin(2 * np.pi * pitch * k * t) / k for k in range(1, 6)) * 0.25
+    voice *= 0.6 + 0.4 * np.sin(2 * np.pi * rng.uniform(0.2, 0.5) * t)
+    gaps = (np.sin(2 * np.pi * rng.uniform(0.05, 0.1) * t) > 0.8 - 0.5 * level)  # more dead air for lower statuses
+    noise = rng.normal(0, 0.01 + 0.05 * level, len(t))
+    samples = np.where(gaps, 0, voice) + noise
+    buffer = io.BytesIO()
+    with wave.open(buffer, "wb") as wav:
+        wav.setnchannels(1)
+        wav.setsampwidth(2)
+        wav.setframerate(RATE)
+        wav.writeframes((np.clip(samples, -1, 1) * 32767).astype("<i2").tobytes())
+    return buffer.getvalue()
+
+
+class BlobStore:
+    """get_blob() over in-memory recordings, in place of the GitHub client"""
+
+    def __init__(self, blobs):
+        self.blobs = blobs
+
+    def get_blob(self, sha):
+        return self.blobs[sha]
+
+
+def dataset(n, seconds, reviewed=0.5, seed=0):
+    rng = np.random.default_rng(seed)
+    rows, reviews, blobs, tree = [], [], {}, {}
+    for i in range(n):
+        its = str(10_000_000 + i)
+        status = STATUSES[rng.integers(len(STATUSES))]
+        data = make_recording(status, seconds * rng.uniform(0.7, 1.3), rng)
+        sha = hashlib.sha1(data).hexdigest()
+        path = f"audio/azan/azan_{its}_20260216_000000.wav"
+        blobs[sha], tree[path] = data, {"sha": sha, "size": len(data)}
+        rows.append({"its": its, "azan_file": path, "takbirah_file": ""})
+        if i < n * reviewed:
+            reviews.append({"its": its, "status": status})
+    return pd.DataFrame(rows), pd.DataFrame(reviews), BlobStore(blobs), tree
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Triage model benchmark")
+    parser.add_argument("--recordings", type=int, default=300)
+    parser.add_argument("--seconds", type=float, default=30, help="mean recording length in seconds")
+    args = parser.parse_args()
+
+    submissions, reviews, client, tree = dataset(args.recordings, args.seconds)
+    recordings = {path: item["sha"] for path, item in tree.items()}
+    table = triage.recording_table(submissions, recordings)
+
+    workdir = tempfile.mkdtemp(prefix="azan-triage-")
+    cwd = os.getcwd()
+    os.chdir(workdir)  # feature cache goes to <workdir>/.snapshot
+    try:
+        timings = {}
+        for run in ("features_cold_s", "features_cached_s"):
+            started = time.perf_counter()
+            features = triage.extract_features(client, recordings, tree, {})
+            timings[run] = round(time.perf_counter() - started, 3)
+    finally:
+        os.chdir(cwd)
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    started = time.perf_counter()
+    ranking = triage.rank_pending(submissions, reviews, features, table)
+    timings["train_and_score_s"] = round(time.perf_counter() - started, 3)
+    started = time.perf_counter()
+    accuracy = triage.cross_validate(table, reviews, features)
+    timings["cross_validate_s"] = round(time.perf_counter() - started, 3)
+
+    print(json.dumps({
+        "recordings": len(features),
+        "audio_minutes": round(sum(len(b) for b in client.blobs.values()) / 2 / RATE / 60, 1),
+        "pending_scored": len(ranking),
+        "cv_accuracy": round(accuracy, 3) if accuracy is not None else None,
+        **timings,
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,428 @@
+"""
+Local stand-in for the parts of the GitHub REST API this app uses:
+contents (GET/PUT/DELETE), commits, compare, and the git data API (blobs,
+trees, commits and branch refs).
+
+Keeps an in-memory, linear commit history so delta sync and concurrent
+writes can be exercised without a network or a token.
+
+    python tools/fake_github.py --seed . --port 8765
+
+then point the app at it with, in .streamlit/secrets.toml:
+
+    [github]
+    token = "anything"
+    repo = "local/azan"
+    api_url = "http://127.0.0.1:8765"
+"""
+
+import argparse
+import base64
+import difflib
+import hashlib
+import json
+import os
+import threading
+import time
+from datetime import datetime, timezone
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from urllib.parse import urlparse, parse_qs, unquote
+
+SEED_FILES = ("submissions.csv", "reviews.csv")
+SEED_DIRS = ("audio", "data")
+
+
+def blob_sha(data):
+    return hashlib.sha1(b"blob %d\0" % len(data) + data).hexdigest()
+
+
+class FakeGitHub:
+    """In-memory repository with a linear history on a single branch"""
+
+    def __init__(self, branch="main", latency=0.0):
+        self.branch = branch
+        self.latency = latency
+        self.blobs = {}
+        self.commits = []  # [{"sha", "parent", "message", "date", "tree": {path: blob sha}}]
+        self.trees = {}  # tree sha -> {path: blob sha}
+        self.detached = {}  # commits created through the git data API, not yet on the branch
+        self.lock = threading.RLock()
+        self.request_count = 0
+        self._server = None
+        self._commit({}, "Initial commit")
+
+    # ----- repository state -----
+
+    @property
+    def head(self):
+        return self.commits[-1]
+
+    def _store_tree(self, tree):
+        sha = hashlib.sha1(f"tree\n{sorted(tree.items())}".encode()).hexdigest()
+        self.trees[sha] = dict(tree)
+        return sha
+
+    def _make_commit(self, tree, message, parent):
+        digest = hashlib.sha1(
+            f"{parent}\n{message}\n{time.time_ns()}\n{sorted(tree.items())}".encode()
+        ).hexdigest()
+        return {
+            "sha": digest,
+            "parent": parent,
+            "message": message,
+            "date": datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ"),
+            "tree": dict(tree),
+            "tree_sha": self._store_tree(tree),
+        }
+
+    def _commit(self, tree, message):
+        parent = self.commits[-1]["sha"] if self.commits else ""
+        commit = self._make_commit(tree, message, parent)
+        self.commits.append(commit)
+        return commit
+
+    def update_ref(self, sha, force=False):
+        """Move the branch to a detached commit, False unless it fast-forwards"""
+        with self.lock:
+            commit = self.detached.get(sha)
+            if commit is None or (commit["parent"] != self.head["sha"] and not force):
+                return False
+            del self.detached[sha]
+            self.commits.append(commit)
+            return True
+
+    def find_commit(self, ref):
+        if ref in (None, "", self.branch, "HEAD"):
+            return self.head
+        for commit in reversed(self.commits):
+            if commit["sha"] == ref or commit["sha"].startswith(ref):
+                return commit
+        return None
+
+    def read(self, path, ref=None):
+        commit = self.find_commit(ref)
+        sha = commit["tree"].get(path) if commit else None
+        return (self.blobs[sha], sha) if sha else (None, None)
+
+    def write(self, path, content, message="update"):
+        """Commit a new version of one file, returns (commit, blob sha)"""
+        with self.lock:
+            sha = blob_sha(content)
+            self.blobs[sha] = content
+            tree = dict(self.head["tree"])
+            tree[path] = sha
+            return self._commit(tree, message), sha
+
+    def delete(self, path, message="delete"):
+        with self.lock:
+            tree = dict(self.head["tree"])
+            tree.pop(path, None)
+            return self._commit(tree, message)
+
+    def seed(self, directory):
+        """Load the CSVs, data shards and audio tree of a checkout as one commit"""
+        tree = {}
+        paths = [p for p in SEED_FILES if os.path.exists(os.path.join(directory, p))]
+        for folder in SEED_DIRS:
+            for root, _, files in os.walk(os.path.join(directory, folder)):
+                for name in files:
+                    paths.append(os.path.relpath(os.path.join(root, name), directory))
+        for path in paths:
+            with open(os.path.join(directory, path), "rb") as f:
+                content = f.read()
+            sha = blob_sha(content)
+            self.blobs[sha] = content
+            tree[path.replace(os.sep, "/")] = sha
+        with self.lock:
+            self._commit(tree, f"Seed from {directory}")
+
+    # ----- API payloads -----
+
+    def compare(self, base, head):
+        old, new = self.find_commit(base), self.find_commit(head)
+        if old is None or new is None:
+            return None
+        old_index, new_index = self.commits.index(old), self.commits.index(new)
+        files = []
+        for path in sorted(set(old["tree"]) | set(new["tree"])):
+            a, b = old["tree"].get(path), new["tree"].get(path)
+            if a == b:
+                continue
+            entry = {"filename": path, "sha": b or a}
+            entry["status"] = "added" if a is None else "removed" if b is None else "modified"
+            patch = self._patch(self.blobs.get(a, b""), self.blobs.get(b, b""))
+            if patch is not None:
+                entry["patch"] = patch
+            files.append(entry)
+        return {
+            "status": "ahead" if new_index >= old_index else "behind",
+            "ahead_by": max(0, new_index - old_index),
+            "commits": [self._commit_json(c) for c in self.commits[old_index + 1:new_index + 1]],
+            "files": files,
+        }
+
+    @staticmethod
+    def _patch(old, new):
+        try:
+            a, b = old.decode(), new.decode()
+        except UnicodeDecodeError:
+            return None  # binary
+        if (a and not a.endswith("\n")) or (b and not b.endswith("\n")):
+            return None
+        diff = difflib.unified_diff(a.splitlines(), b.splitlines(), lineterm="", n=3)
+        return "\n".join(list(diff)[2:])
+
+    def _commit_json(self, commit):
+        return {
+            "sha": commit["sha"],
+            "commit": {"message": commit["message"], "author": {"date": commit["date"]}},
+            "parents": [{"sha": commit["parent"]}] if commit["parent"] else [],
+        }
+
+    # ----- HTTP server -----
+
+    def start(self, host="127.0.0.1", port=0):
+        """Serve in a background thread, returns the base URL"""
+        self._server = ThreadingHTTPServer((host, port), _make_handler(self))
+        self._server.daemon_threads = True
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+        return f"http://{host}:{self._server.server_port}"
+
+    def stop(self):
+        if self._server:
+            self._server.shutdown()
+            self._server.server_close()
+
+
+def _make_handler(repo):
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def log_message(self, *args):
+            pass
+
+        # ----- helpers -----
+
+        def _send(self, status, body=b"", content_type="application/json", headers=None):
+            if isinstance(body, (dict, list)):
+                body = json.dumps(body).encode()
+            elif isinstance(body, str):
+                body = body.encode()
+            self.send_response(status)
+            self.send_header("Content-Type", content_type)
+            self.send_header("Content-Length", str(len(body)))
+            for key, value in (headers or {}).items():
+                self.send_header(key, value)
+            self.end_headers()
+            self.wfile.write(body)
+
+        def _route(self):
+            if repo.latency:
+                time.sleep(repo.latency)
+            with repo.lock:
+                repo.request_count += 1
+            url = urlparse(self.path)
+            parts = [unquote(p) for p in url.path.strip("/").split("/")]
+            if len(parts) < 4 or parts[0] != "repos":
+                return None, None, parse_qs(url.query)
+            return parts[3], "/".join(parts[4:]), parse_qs(url.query)
+
+        def _body(self):
+            length = int(self.headers.get("Content-Length") or 0)
+            return json.loads(self.rfile.read(length) or b"{}")
+
+        # ----- verbs -----
+
+        def do_GET(self):
+            kind, rest, query = self._route()
+            ref = query.get("ref", [None])[0]
+
+            if kind == "contents":
+                content, sha = repo.read(rest, ref)
+                if content is None:
+                    return self._send(404, {"message": "Not Found"})
+                if "raw" in (self.headers.get("Accept") or ""):
+                    return self._send_range(content)
+                etag = f'"{sha}"'
+                if self.headers.get("If-None-Match") == etag:
+                    return self._send(304)
+                return self._send(200, {
+                    "path": rest, "sha": sha, "size": len(content),
+                    "encoding": "base64", "content": base64.b64encode(content).decode(),
+                }, headers={"ETag": etag})
+
+            if kind == "commits" and rest:
+                commit = repo.find_commit(rest)
+                if commit is None:
+                    return self._send(404, {"message": "No commit found"})
+                etag = f'"{commit["sha"]}"'
+                if self.headers.get("If-None-Match") == etag:
+                    return self._send(304)
+                if "sha" in (self.headers.get("Accept") or ""):
+                    return self._send(200, commit["sha"], "text/plain", {"ETag": etag})
+                return self._send(200, repo._commit_json(commit), headers={"ETag": etag})
+
+            if kind == "commits":
+                path = query.get("path", [""])[0]
+                commits = []
+                for commit in reversed(repo.commits):
+                    parent = repo.find_commit(commit["parent"]) if commit["parent"] else None
+                    before = parent["tree"] if parent else {}
+                    touched = [p for p in set(before) | set(commit["tree"])
+                               if before.get(p) != commit["tree"].get(p)]
+                    if not path or any(p == path or p.startswith(path.rstrip("/") + "/") for p in touched):
+                        commits.append(repo._commit_json(commit))
+                return self._send(200, commits)
+
+            if kind == "compare":
+                base, _, head = rest.partition("...")
+                result = repo.compare(base, head)
+                if result is None:
+                    return self._send(404, {"message": "Not Found"})
+                return self._send(200, result)
+
+            if kind == "git" and rest.startswith("trees/"):
+                commit = repo.find_commit(rest[len("trees/"):])
+                if commit is None:
+                    return self._send(404, {"message": "Not Found"})
+                tree = [
+                    {"path": p, "type": "blob", "sha": s, "size": len(repo.blobs[s])}
+                    for p, s in sorted(commit["tree"].items())
+                ]
+                return self._send(200, {"sha": commit["sha"], "tree": tree, "truncated": False})
+
+            if kind == "git" and rest.startswith("commits/"):
+                sha = rest[len("commits/"):]
+                commit = repo.detached.get(sha) or repo.find_commit(sha)
+                if commit is None:
+                    return self._send(404, {"message": "Not Found"})
+                return self._send(200, {
+                    "sha": commit["sha"],
+                    "message": commit["message"],
+                    "tree": {"sha": commit["tree_sha"]},
+                    "parents": [{"sha": commit["parent"]}] if commit["parent"] else [],
+                })
+
+            if kind == "git" and rest.startswith("blobs/"):
+                content = repo.blobs.get(rest[len("blobs/"):])
+                if content is None:
+                    return self._send(404, {"message": "Not Found"})
+                return self._send(200, content, "application/octet-stream")
+
+            return self._send(404, {"message": "Not Found"})
+
+        def _send_range(self, content):
+            header = self.headers.get("Range", "")
+            if not header.startswith("bytes="):
+                return self._send(200, content, "application/octet-stream")
+            start, _, end = header[len("bytes="):].partition("-")
+            start = int(start or 0)
+            end = min(int(end) if end else len(content) - 1, len(content) - 1)
+            return self._send(206, content[start:end + 1], "application/octet-stream", {
+                "Content-Range": f"bytes {start}-{end}/{len(content)}"
+            })
+
+        def do_PUT(self):
+            kind, path, _ = self._route()
+            if kind != "contents":
+                return self._send(404, {"message": "Not Found"})
+            body = self._body()
+            with repo.lock:
+                _, current = repo.read(path)
+                if current and body.get("sha") != current:
+                    status = 409 if body.get("sha") else 422
+                    return self._send(status, {"message": f"{path} does not match {body.get('sha')}"})
+                commit, sha = repo.write(path, base64.b64decode(body["content"]), body.get("message", ""))
+            return self._send(200 if current else 201, {
+                "content": {"path": path, "sha": sha},
+                "commit": {"sha": commit["sha"], "message": commit["message"]},
+            })
+
+        def do_POST(self):
+            kind, rest, _ = self._route()
+            if kind != "git":
+                return self._send(404, {"message": "Not Found"})
+            body = self._body()
+
+            if rest == "blobs":
+                content = base64.b64decode(body["content"]) if body.get("encoding") == "base64" \
+                    else body["content"].encode()
+                sha = blob_sha(content)
+                with repo.lock:
+                    repo.blobs[sha] = content
+                return self._send(201, {"sha": sha})
+
+            if rest == "trees":
+                with repo.lock:
+                    tree = dict(repo.trees.get(body.get("base_tree"), {}))
+                    for entry in body["tree"]:
+                        if entry.get("sha") is None:
+                            tree.pop(entry["path"], None)
+                        elif entry["sha"] not in repo.blobs:
+                            return self._send(422, {"message": f"Unknown blob {entry['sha']}"})
+                        else:
+                            tree[entry["path"]] = entry["sha"]
+                    sha = repo._store_tree(tree)
+                return self._send(201, {"sha": sha})
+
+            if rest == "commits":
+                with repo.lock:
+                    tree = repo.trees.get(body["tree"])
+                    if tree is None:
+                        return self._send(422, {"message": "Tree not found"})
+                    parents = body.get("parents") or [""]
+                    commit = repo._make_commit(tree, body.get("message", ""), parents[0])
+                    repo.detached[commit["sha"]] = commit
+                return self._send(201, {"sha": commit["sha"]})
+
+            return self._send(404, {"message": "Not Found"})
+
+        def do_PATCH(self):
+            kind, rest, _ = self._route()
+            if kind != "git" or rest != f"refs/heads/{repo.branch}":
+                return self._send(404, {"message": "Not Found"})
+            body = self._body()
+            if not repo.update_ref(body["sha"], body.get("force", False)):
+                return self._send(422, {"message": "Update is not a fast forward"})
+            return self._send(200, {"ref": f"refs/heads/{repo.branch}", "object": {"sha": body["sha"]}})
+
+        def do_DELETE(self):
+            kind, path, _ = self._route()
+            if kind != "contents":
+                return self._send(404, {"message": "Not Found"})
+            body = self._body()
+            with repo.lock:
+                _, current = repo.read(path)
+                if current is None:
+                    return self._send(404, {"message": "Not Found"})
+                if body.get("sha") != current:
+                    return self._send(409, {"message": f"{path} does not match {body.get('sha')}"})
+                commit = repo.delete(path, body.get("message", ""))
+            return self._send(200, {"content": None, "commit": {"sha": commit["sha"]}})
+
+    return Handler
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local fake of the GitHub contents API")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--seed", help="checkout to load submissions.csv, reviews.csv and audio/ from")
+    parser.add_argument("--latency", type=float, default=0.0, help="seconds added to every request")
+    args = parser.parse_args()
+
+    repo = FakeGitHub(latency=args.latency)
+    if args.seed:
+        repo.seed(args.seed)
+    url = repo.start(args.host, args.port)
+    print(f"Fake GitHub API on {url} (head {repo.head['sha'][:7]}), Ctrl+C to stop")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        repo.stop()
+
+
+if __name__ == "__main__":
+    main()
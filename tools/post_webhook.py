@@ -0,0 +1,75 @@
+"""
+Post recorded GitHub webhook payloads to the app's webhook receiver, signed
+like GitHub signs them (X-Hub-Signature-256, HMAC-SHA256 of the body).
+
+    python tools/post_webhook.py tools/webhook_payloads/push_submission.json
+    python tools/post_webhook.py tools/webhook_payloads/*.json --url http://127.0.0.1:8599/github/webhook
+    python tools/post_webhook.py tools/webhook_payloads/push_review.json --bad-signature
+
+The secret is [github] webhook_secret from .streamlit/secrets.toml unless
+--secret is given. The event type is "ping" for payloads with a "zen" field
+and "push" otherwise (override with --event).
+"""
+
+import argparse
+import hashlib
+import hmac
+import json
+import os
+import sys
+import tomllib
+import uuid
+from urllib.error import HTTPError
+from urllib.request import Request, urlopen
+
+DEFAULT_URL = "http://127.0.0.1:8599/github/webhook"
+
+
+def secret_from_file(path=os.path.join(".streamlit", "secrets.toml")):
+    with open(path, "rb") as f:
+        return tomllib.load(f)["github"]["webhook_secret"]
+
+
+def post(url, body, event, secret):
+    """(status, response body) of one delivery"""
+    signature = "sha256=" + hmac.new(secret.encode(), body, hashlib.sha256).hexdigest()
+    request = Request(url, data=body, method="POST", headers={
+        "Content-Type": "application/json",
+        "User-Agent": "GitHub-Hookshot/post_webhook",
+        "X-GitHub-Event": event,
+        "X-GitHub-Delivery": str(uuid.uuid4()),
+        "X-Hub-Signature-256": signature,
+    })
+    try:
+        with urlopen(request, timeout=10) as response:
+            return response.status, response.read().decode()
+    except HTTPError as e:
+        return e.code, e.read().decode()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay recorded GitHub webhook payloads")
+    parser.add_argument("payloads", nargs="+", help="JSON payload files")
+    parser.add_argument("--url", default=DEFAULT_URL)
+    parser.add_argument("--secret", help="defaults to [github] webhook_secret in .streamlit/secrets.toml")
+    parser.add_argument("--event", help="X-GitHub-Event (default: ping or push, from the payload)")
+    parser.add_argument("--bad-signature", action="store_true", help="sign with a wrong secret")
+    args = parser.parse_args()
+
+    secret = args.secret or secret_from_file()
+    if args.bad_signature:
+        secret += "-wrong"
+
+    failed = False
+    for path in args.payloads:
+        with open(path, "rb") as f:
+            body = f.read()
+        event = args.event or ("ping" if "zen" in json.loads(body) else "push")
+        status, response = post(args.url, body, event, secret)
+        failed |= status >= 400
+        print(f"{os.path.basename(path)} [{event}] -> {status} {response}")
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()